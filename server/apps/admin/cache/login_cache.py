@@ -10,9 +10,8 @@
 # +----------------------------------------------------------------------
 # | Author: WaitAdmin Team <2474369941@qq.com>
 # +----------------------------------------------------------------------
-import json
 from typing import List
-from common.utils.cache import RedisUtil
+from common.utils.cache import RedisUtil, SingleFlight
 from common.utils.tools import ToolsUtil
 from common.models.auth import AuthMenuModel
 from common.models.auth import AuthPermModel
@@ -45,22 +44,28 @@ class LoginCache:
             return []
 
         # 缓存中查找角色权限
-        perms = await RedisUtil.hGet(cls.perms_prefix, str(role_id))
+        perms = await RedisUtil.hget_obj(cls.perms_prefix, str(role_id))
 
-        # 如权限不存在则获取
+        # 如权限不存在则获取 (并发未命中只查询一次数据库)
         if perms is None:
-            menu_ids = await AuthPermModel.filter(role_id=role_id).all().values("menu_id")
-            menu_ids = [item["menu_id"] for item in menu_ids]
-            if menu_ids:
-                _menus = await AuthMenuModel.filter(id__in=menu_ids).all().values("perms")
-                _auths = [item["perms"] for item in _menus]
-                _perms = [item.replace("/", ":") for item in _auths]
-                # {"1": "["index:console"]", "2": []}
-                await RedisUtil.hSet(cls.perms_prefix, str(role_id), json.dumps(_perms))
-                return _perms
-            return []
+            _perms = await SingleFlight.do(f"{cls.perms_prefix}:{role_id}", lambda: cls._role_perms_load(role_id))
+            return list(_perms)
         else:
-            return json.loads(perms)
+            return perms
+
+    @classmethod
+    async def _role_perms_load(cls, role_id: int) -> List[str]:
+        """ 从数据库加载角色权限并写入缓存 """
+        menu_ids = await AuthPermModel.filter(role_id=role_id).all().values("menu_id")
+        menu_ids = [item["menu_id"] for item in menu_ids]
+        if menu_ids:
+            _menus = await AuthMenuModel.filter(id__in=menu_ids).all().values("perms")
+            _auths = [item["perms"] for item in _menus]
+            _perms = [item.replace("/", ":") for item in _auths]
+            # {"1": ["index:console"], "2": []}
+            await RedisUtil.hset_obj(cls.perms_prefix, str(role_id), _perms)
+            return _perms
+        return []
 
     @classmethod
     async def role_perms_del(cls, role_id: int = None):
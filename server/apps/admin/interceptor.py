@@ -35,7 +35,7 @@ class LoginInterceptor:
             return True
 
         token: str = bearer.credentials
-        status = await SecurityDriver.module("admin").check_login(token)
+        status = (await SecurityDriver.module("admin").resolve(request, token)).status
         if status == "invalid":
             raise AppException(
                 msg="登录失效",
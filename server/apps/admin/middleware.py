@@ -10,16 +10,15 @@
 # +----------------------------------------------------------------------
 # | Author: WaitAdmin Team <2474369941@qq.com>
 # +----------------------------------------------------------------------
-import json
 import time
 import typing
-import xmltodict
 from fastapi import FastAPI, Request
-from starlette.types import ASGIApp
-from starlette.responses import Response, JSONResponse
-from starlette.middleware.base import BaseHTTPMiddleware, RequestResponseEndpoint
+from starlette.types import ASGIApp, Scope, Receive, Send
+from starlette.responses import JSONResponse
 from config import get_settings
+from kernels.middleware import BodyCapture
 from common.utils.tools import ToolsUtil
+from common.utils.writer import BatchWriter
 from common.models.sys import SysLogModel
 from plugins.safe.driver import SecurityDriver
 
@@ -31,33 +30,31 @@ def init_middlewares(app: FastAPI):
     app.add_middleware(demo_middleware)
 
 
-class LogsMiddleware(BaseHTTPMiddleware):
+class LogsMiddleware:
     def __init__(self, app: ASGIApp):
-        super().__init__(app)
+        self.app = app
         self.STATUS_OK = 1
         self.STATUS_FAIL = 2
 
-    async def dispatch(self, request: Request, call_next: RequestResponseEndpoint) -> Response:
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
         # 模块验证
         module: str = get_settings().ROUTER_ALIAS.get("admin", "admin")
-        endpoint: any = request.scope.get("endpoint", lambda: None)
-        if request.state.module != module or endpoint.__module__ == "starlette.staticfiles":
-            return await call_next(request)
+        request: Request = Request(scope, receive)
+        if request.state.module != module:
+            return await self.app(scope, receive, send)
 
         # 登录信息
-        admin_id: int = int(await SecurityDriver.module("admin").get_login_id())
-        role_id: int = int((await SecurityDriver.module("admin").get_login_data()).get("role_id", 0))
-        request.state.admin_id = admin_id
-        request.state.role_id = role_id
+        auth = await SecurityDriver.module("admin").resolve(request)
+        admin_id: int = auth.uid
+        request.state.admin_id = auth.uid
+        request.state.role_id = auth.role_id
 
         # 忽略接口
         if request.method in ["GET", "OPTIONS"]:
-            return await call_next(request)
-
-        # 静态文件
-        endpoint: any = request.scope.get("endpoint", lambda: None)
-        if endpoint.__module__ == "starlette.staticfiles":
-            return await call_next(request)
+            return await self.app(scope, receive, send)
 
         # 异常信息
         error: str = ""
@@ -65,48 +62,35 @@ class LogsMiddleware(BaseHTTPMiddleware):
         status: int = self.STATUS_OK
         start_time: float = time.time()
 
-        # 请求参数
+        # 请求参数 (后续处理读取请求体时旁路截取, 不重复读取和解析)
+        capture: typing.Optional[BodyCapture] = None
         if request.method == "POST":
-            content_type: str = request.headers.get("content-type")
-            if content_type and content_type.startswith("multipart/form-data"):
-                args = ""
-            elif content_type and content_type.startswith("application/xml"):
-                form_params = await request.body()
-                dict_params = xmltodict.parse(form_params)
-                args = json.dumps([dict_params], ensure_ascii=False)
-            else:
-                try:
-                    form_params = await request.json()
-                    # 判断form_parmas是否存在
-                    if form_params:
-                        for key in ["password", "password_confirm", "password_old"]:
-                            if form_params.get(key):
-                                form_params[key] = "******"
-                        args = json.dumps([form_params], ensure_ascii=False)
-                    else:
-                        args = ""
-                except Exception as e:
-                    args = ""
+            content_type: str = request.headers.get("content-type", "")
+            if not content_type.startswith("multipart/form-data"):
+                capture = BodyCapture(receive)
+                receive = capture
+            args = ""
         else:
             args = str(request.query_params)
 
         # 执行方法
-        response = None
         try:
-            response = await call_next(request)
+            await self.app(scope, receive, send)
         except Exception as e:
             error = str(e)
             errno = e
             status = self.STATUS_FAIL
 
         # 请求信息
+        args = capture.text() if capture is not None else args
         end_time: float = time.time()
         task_time: float = (end_time - start_time) * 1000
-        summary: str = request.scope.get("route").summary if request.scope.get("route") else ""
+        endpoint: any = scope.get("endpoint", lambda: None)
+        summary: str = scope.get("route").summary if scope.get("route") else ""
         user_agent: str = request.headers.get("user-agent", "")
 
-        # 保存记录
-        await SysLogModel.create(
+        # 保存记录 (批量异步写入)
+        BatchWriter.of(SysLogModel).put(
             admin_id=admin_id,
             summary=summary,
             endpoint=f"{endpoint.__module__}.{endpoint.__name__}()",
@@ -128,28 +112,32 @@ class LogsMiddleware(BaseHTTPMiddleware):
         if errno:
             raise errno
 
-        # 执行完成
-        return response
 
+class DemoMiddleware:
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
 
-class DemoMiddleware(BaseHTTPMiddleware):
-    async def dispatch(self, request: Request, call_next: RequestResponseEndpoint) -> Response:
         # 模块验证
         module: str = get_settings().ROUTER_ALIAS.get("admin", "admin")
-        endpoint: any = request.scope.get("endpoint", lambda: None)
-        if request.state.module != module or endpoint.__module__ == "starlette.staticfiles":
-            return await call_next(request)
+        request: Request = Request(scope, receive)
+        if request.state.module != module:
+            return await self.app(scope, receive, send)
 
         # 允许通过
         uri: str = request.url.path.replace(f"/{module}/", "").replace("/", ":")
         if uri in ["login:check", "login:logout"]:
-            return await call_next(request)
+            return await self.app(scope, receive, send)
 
         # 演示拦截
         if get_settings().ENV_DEMO and request.method == "POST":
-            admin_id = await SecurityDriver.module("admin").get_login_id()
-            if int(admin_id) != 1:
-                return JSONResponse({"code": 1, "msg": "演示环境不支持修改数据!", "data": []})
+            auth = await SecurityDriver.module("admin").resolve(request)
+            if auth.uid != 1:
+                response = JSONResponse({"code": 1, "msg": "演示环境不支持修改数据!", "data": []})
+                return await response(scope, receive, send)
 
         # 执行逻辑
-        return await call_next(request)
+        await self.app(scope, receive, send)
@@ -10,15 +10,16 @@
 # +----------------------------------------------------------------------
 # | Author: WaitAdmin Team <2474369941@qq.com>
 # +----------------------------------------------------------------------
+from typing import Union
 from fastapi import APIRouter, Depends
-from hypertext import R, response_json
+from hypertext import R, PagingResult, CursorResult, response_json
 from apps.admin.schemas import attach_schema as schema
 from apps.admin.service.attach_service import AttachService
 
 router = APIRouter(prefix="/attach", tags=["附件管理"])
 
 
-@router.get("/album_lists", summary="附件列表", response_model=R[schema.AlbumListVo])
+@router.get("/album_lists", summary="附件列表", response_model=R[Union[PagingResult[schema.AlbumListVo], CursorResult[schema.AlbumListVo]]])
 @response_json
 async def album_lists(params: schema.AlbumSearchIn = Depends()):
     return await AttachService.album_lists(params)
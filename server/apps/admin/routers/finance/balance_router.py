@@ -10,15 +10,16 @@
 # +----------------------------------------------------------------------
 # | Author: WaitAdmin Team <2474369941@qq.com>
 # +----------------------------------------------------------------------
+from typing import Union
 from fastapi import APIRouter, Depends
-from hypertext import R, response_json
+from hypertext import R, PagingResult, CursorResult, response_json
 from apps.admin.schemas.finance import balance_schema as schema
 from apps.admin.service.finance.balance_service import BalanceService
 
 router = APIRouter(prefix="/balance", tags=["余额明细"])
 
 
-@router.get("/lists", summary="余额明细列表", response_model=R[schema.BalanceListVo])
+@router.get("/lists", summary="余额明细列表", response_model=R[Union[PagingResult[schema.BalanceListVo], CursorResult[schema.BalanceListVo]]])
 @response_json
 async def lists(params: schema.BalanceSearchIn = Depends()):
     return await BalanceService.lists(params)
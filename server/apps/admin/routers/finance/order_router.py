@@ -10,16 +10,16 @@
 # +----------------------------------------------------------------------
 # | Author: WaitAdmin Team <2474369941@qq.com>
 # +----------------------------------------------------------------------
-from typing import Dict, Any
+from typing import Dict, Any, Union
 from fastapi import APIRouter, Depends
-from hypertext import R, response_json
+from hypertext import R, PagingResult, CursorResult, response_json
 from apps.admin.service.finance.order_service import OrderService
-from apps.admin.schemas.finance.order_schema import OrderSearchIn,WorkOrderHandleIn
+from apps.admin.schemas.finance.order_schema import OrderSearchIn,WorkOrderHandleIn,OrderListVo
 
 router = APIRouter(prefix="/order", tags=["订单"])
 
 
-@router.get("/lists", summary="获取订单列表")
+@router.get("/lists", summary="获取订单列表", response_model=R[Union[PagingResult[OrderListVo], CursorResult[OrderListVo]]])
 @response_json
 async def order_lists(params: OrderSearchIn = Depends()) -> R:
     """
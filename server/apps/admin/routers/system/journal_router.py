@@ -10,15 +10,16 @@
 # +----------------------------------------------------------------------
 # | Author: WaitAdmin Team <2474369941@qq.com>
 # +----------------------------------------------------------------------
+from typing import Union
 from fastapi import APIRouter, Depends
-from hypertext import R, PagingResult, response_json
+from hypertext import R, PagingResult, CursorResult, response_json
 from apps.admin.schemas.system import journal_schema as schema
 from apps.admin.service.system.journal_service import JournalService
 
 router = APIRouter(prefix="/journal", tags=["系统日志"])
 
 
-@router.get("/lists", summary="日志列表", response_model=R[PagingResult[schema.JournalListVo]])
+@router.get("/lists", summary="日志列表", response_model=R[Union[PagingResult[schema.JournalListVo], CursorResult[schema.JournalListVo]]])
 @response_json
 async def lists(params: schema.JournalSearchIn = Depends()):
     return await JournalService.lists(params)
@@ -19,6 +19,7 @@ class AlbumSearchIn(BaseModel):
     """ 附件搜索参数 """
     page_no: int = Query(gt=0, default=1, description="当前页码")
     page_size: int = Query(gt=0, le=200, default=15, description="每页条数")
+    cursor: Union[str, None] = Query(default=None, description="分页游标: 传入时使用游标分页(首页传空), 返回next_cursor")
     cid: Union[int, None] = Query(default=None, description="所属分类")
     type: Union[int, None] = Query(default=None, description="文件类型: [10=图片, 20=视频, 30=音频, 40=压缩, 50=文件]")
     keyword: Union[str, None] = Query(default=None, description="关键词")
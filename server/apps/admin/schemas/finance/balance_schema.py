@@ -20,6 +20,7 @@ class BalanceSearchIn(BaseModel):
     """ 余额明细搜索参数 """
     page_no: int = Query(gt=0, default=1, description="当前页码")
     page_size: int = Query(gt=0, le=200, default=15, description="每页条数")
+    cursor: Union[str, None] = Query(default=None, description="分页游标: 传入时使用游标分页(首页传空), 返回next_cursor")
     user: Union[str, None] = Query(default=None, description="用户信息")
     source_type: Union[str, int, None] = Query(default=None, description="来源类型")
     start_time: Union[int, str, None] = Query(default=None, description="开始时间")
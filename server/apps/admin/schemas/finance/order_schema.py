@@ -20,6 +20,7 @@ class OrderSearchIn(BaseModel):
     """ 订单搜索参数 """
     page_no: int = Query(gt=0, default=1, description="当前页码")
     page_size: int = Query(gt=0, le=200, default=15, description="每页条数")
+    cursor: Union[str, None] = Query(default=None, description="分页游标: 传入时使用游标分页(首页传空), 返回next_cursor")
     user: Union[str, None] = Query(default=None, description="用户信息(用户ID、昵称、手机号)")
     order_sn: Union[str, None] = Query(default=None, description="订单编号")
     pay_way: Union[str, int, None] = Query(default=None, description="支付方式: [2=微信, 3=支付宝]")
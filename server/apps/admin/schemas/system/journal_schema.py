@@ -19,6 +19,7 @@ class JournalSearchIn(BaseModel):
     """ 系统日志搜索参数 """
     page_no: int = Query(gt=0, default=1, description="当前页码")
     page_size: int = Query(gt=0, le=200, default=15, description="每页条数")
+    cursor: Union[str, None] = Query(default=None, description="分页游标: 传入时使用游标分页(首页传空), 返回next_cursor")
     method: Union[str, None] = Query(default=None, description="请求方法: [GET, POST, PUT, DELETE, OPTION]")
     url: Union[str, None] = Query(default=None, description="访问地址")
     ip: Union[str, None] = Query(default=None, description="来源IP")
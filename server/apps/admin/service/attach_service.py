@@ -11,10 +11,10 @@
 # | Author: WaitAdmin Team <2474369941@qq.com>
 # +----------------------------------------------------------------------
 import time
-from typing import List
+from typing import List, Union
 from pydantic import TypeAdapter
 from tortoise.queryset import Q
-from hypertext import PagingResult
+from hypertext import PagingResult, CursorResult
 from exception import AppException
 from common.utils.urls import UrlUtil
 from apps.admin.schemas import attach_schema as schema
@@ -26,7 +26,7 @@ class AttachService:
     """ 附件服务类 """
 
     @classmethod
-    async def album_lists(cls, params: schema.AlbumSearchIn) -> PagingResult[schema.AlbumListVo]:
+    async def album_lists(cls, params: schema.AlbumSearchIn) -> Union[PagingResult[schema.AlbumListVo], CursorResult[schema.AlbumListVo]]:
         """
         附件列表。
 
@@ -34,7 +34,7 @@ class AttachService:
            params (schema.AlbumSearchIn): 附件搜索参数。
 
         Returns:
-            PagingResult[AlbumListVo]: 附件分页列表Vo。
+            Union[PagingResult, CursorResult]: 附件分页列表Vo, 传入游标时为游标分页。
 
         Author:
             zero
@@ -47,14 +47,24 @@ class AttachService:
         if params.keyword:
             where.append(Q(file_name__contains=params.keyword))
 
-        _model = AttachModel.filter(*where).order_by("-id")
-        _pager = await AttachModel.paginate(
-            model=_model,
-            page_no=params.page_no,
-            page_size=params.page_size,
-            fields=["id", "file_type", "file_size", "file_name", "file_path", "file_ext", "create_time", "update_time"],
-            datetime_field=["create_time", "update_time"]
-        )
+        _model = AttachModel.filter(*where)
+        _fields = ["id", "file_type", "file_size", "file_name", "file_path", "file_ext", "create_time", "update_time"]
+        if params.cursor is not None:
+            _pager = await AttachModel.paginate_cursor(
+                model=_model,
+                cursor=params.cursor,
+                page_size=params.page_size,
+                fields=_fields,
+                datetime_field=["create_time", "update_time"]
+            )
+        else:
+            _pager = await AttachModel.paginate(
+                model=_model.order_by("-id"),
+                page_no=params.page_no,
+                page_size=params.page_size,
+                fields=_fields,
+                datetime_field=["create_time", "update_time"]
+            )
 
         data = []
         for item in _pager.lists:
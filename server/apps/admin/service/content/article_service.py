@@ -18,6 +18,9 @@ from common.utils.urls import UrlUtil
 from common.models.article import ArticleModel
 from common.models.article import ArticleCategoryModel
 from apps.admin.schemas.content import article_schema as schema
+from common.utils.cache import ResponseCache
+from common.utils.search import SearchUtil
+from common.enums.cache import CacheTagEnum
 
 
 class ArticleService:
@@ -90,11 +93,13 @@ class ArticleService:
         if not cate:
             raise AppException("文章分类不存在")
 
-        await ArticleModel.create(
+        article = await ArticleModel.create(
             **post.dict(),
             create_time=int(time.time()),
             update_time=int(time.time())
         )
+        await SearchUtil.refresh("article", article.id)
+        await ResponseCache.purge(CacheTagEnum.ARTICLE)
 
     @classmethod
     async def edit(cls, post: schema.ArticleEditIn):
@@ -122,6 +127,8 @@ class ArticleService:
             **params,
             update_time=int(time.time())
         )
+        await SearchUtil.refresh("article", post.id)
+        await ResponseCache.purge(CacheTagEnum.ARTICLE)
 
     @classmethod
     async def delete(cls, id_: int):
@@ -139,3 +146,5 @@ class ArticleService:
             raise AppException("文章不存在")
 
         await ArticleModel.filter(id=id_).update(is_delete=1, delete_time=int(time.time()))
+        await SearchUtil.refresh("article", id_)
+        await ResponseCache.purge(CacheTagEnum.ARTICLE)
@@ -18,6 +18,8 @@ from exception import AppException
 from common.models.article import ArticleModel
 from common.models.article import ArticleCategoryModel
 from apps.admin.schemas.content import category_schema as schema
+from common.utils.cache import ResponseCache
+from common.enums.cache import CacheTagEnum
 
 
 class ArticleCateService:
@@ -110,6 +112,7 @@ class ArticleCateService:
             create_time=int(time.time()),
             update_time=int(time.time())
         )
+        await ResponseCache.purge(CacheTagEnum.ARTICLE)
 
     @classmethod
     async def edit(cls, post: schema.ArticleCateEditIn):
@@ -137,6 +140,7 @@ class ArticleCateService:
             **params,
             update_time=int(time.time())
         )
+        await ResponseCache.purge(CacheTagEnum.ARTICLE)
 
     @classmethod
     async def delete(cls, id_: int):
@@ -158,3 +162,4 @@ class ArticleCateService:
             raise AppException("文章分类已被使用不能删除")
 
         await ArticleCategoryModel.filter(id=id_).update(is_delete=1, delete_time=int(time.time()))
+        await ResponseCache.purge(CacheTagEnum.ARTICLE)
@@ -10,9 +10,10 @@
 # +----------------------------------------------------------------------
 # | Author: WaitAdmin Team <2474369941@qq.com>
 # +----------------------------------------------------------------------
+from typing import Union
 from pydantic import TypeAdapter
 from tortoise.queryset import Q
-from hypertext import PagingResult
+from hypertext import PagingResult, CursorResult
 from common.utils.urls import UrlUtil
 from common.enums.wallet import WalletEnum
 from common.models.users import UserModel
@@ -23,7 +24,7 @@ from apps.admin.schemas.finance import balance_schema as schema
 class BalanceService:
 
     @classmethod
-    async def lists(cls, params: schema.BalanceSearchIn) -> PagingResult[schema.BalanceListVo]:
+    async def lists(cls, params: schema.BalanceSearchIn) -> Union[PagingResult[schema.BalanceListVo], CursorResult[schema.BalanceListVo]]:
         """
         余额明细列表。
 
@@ -31,7 +32,7 @@ class BalanceService:
             params (schema.BalanceSearchIn): 余额明细查询参数。
 
         Returns:
-            PagingResult[schema.BalanceListVo]: 余额明细分页列表Vo。
+            Union[PagingResult, CursorResult]: 余额明细分页列表Vo, 传入游标时为游标分页。
 
         Author:
             zero
@@ -53,12 +54,19 @@ class BalanceService:
             if user_ids:
                 where.append(Q(user_id__in=list(set(user_ids))))
 
-        _model = UserWalletModel.filter(*where).order_by("-id")
-        _pager = await UserWalletModel.paginate(
-            model=_model,
-            page_no=params.page_no,
-            page_size=params.page_size,
-        )
+        _model = UserWalletModel.filter(*where)
+        if params.cursor is not None:
+            _pager = await UserWalletModel.paginate_cursor(
+                model=_model,
+                cursor=params.cursor,
+                page_size=params.page_size,
+            )
+        else:
+            _pager = await UserWalletModel.paginate(
+                model=_model.order_by("-id"),
+                page_no=params.page_no,
+                page_size=params.page_size,
+            )
 
         users = {}
         user_ids = [item["user_id"] for item in _pager.lists if item["user_id"]]
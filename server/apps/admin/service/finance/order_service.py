@@ -11,10 +11,10 @@
 # | Author: WaitAdmin Team <2474369941@qq.com>
 # +----------------------------------------------------------------------
 import time
-from typing import Dict, Any
+from typing import Dict, Any, Union
 from pydantic import TypeAdapter
 from tortoise.queryset import Q
-from hypertext import PagingResult
+from hypertext import PagingResult, CursorResult
 from common.utils.urls import UrlUtil
 from exception import AppException
 from common.enums.market import PayStatusEnum, PayWayEnum, DeliveryStatusEnum
@@ -27,7 +27,7 @@ from apps.admin.schemas.finance import order_schema as schema
 class OrderService:
 
     @classmethod
-    async def lists(cls, params: schema.OrderSearchIn) -> PagingResult[schema.OrderListVo]:
+    async def lists(cls, params: schema.OrderSearchIn) -> Union[PagingResult[schema.OrderListVo], CursorResult[schema.OrderListVo]]:
         """
         订单列表。
 
@@ -35,7 +35,7 @@ class OrderService:
             params (schema.OrderSearchIn): 订单查询参数。
 
         Returns:
-            PagingResult[schema.OrderListVo]: 订单分页列表Vo。
+            Union[PagingResult, CursorResult]: 订单分页列表Vo, 传入游标时为游标分页。
 
         Author:
             zero
@@ -67,21 +67,32 @@ class OrderService:
             if user_ids:
                 where.append(Q(user_id__in=list(set(user_ids))))
         
-        # 查询主订单总数
-        total = await MainOrderModel.filter(*where).filter(is_delete=0).count()
-        
-        # 查询主订单列表（分页）
-        main_orders = await (
-            MainOrderModel
-            .filter(*where)
-            .filter(is_delete=0)
-            .order_by("-create_time")
-            .offset((params.page_no - 1) * params.page_size)
-            .limit(params.page_size)
-            .all()
-        )
+        _model = MainOrderModel.filter(*where).filter(is_delete=0)
+        next_cursor = None
+        if params.cursor is not None:
+            # 游标分页: 按 (create_time, id) 定位, 总数按筛选条件缓存
+            total = await MainOrderModel.cached_count(_model)
+            _query, _order = MainOrderModel.keyset(_model, params.cursor, ["-create_time"])
+            main_orders = await _query.limit(params.page_size + 1).all()
+            if len(main_orders) > params.page_size:
+                main_orders = main_orders[:params.page_size]
+                next_cursor = MainOrderModel.make_cursor(main_orders[-1], _order)
+        else:
+            # 查询主订单总数
+            total = await _model.count()
+
+            # 查询主订单列表（分页）
+            main_orders = await (
+                _model
+                .order_by("-create_time")
+                .offset((params.page_no - 1) * params.page_size)
+                .limit(params.page_size)
+                .all()
+            )
         
         if not main_orders:
+            if params.cursor is not None:
+                return CursorResult.create([], total, params.page_size, None)
             return PagingResult.create([], total, params.page_no, params.page_size)
         
         # 获取所有相关的用户ID
@@ -119,6 +130,7 @@ class OrderService:
         work_order_map = {wo.sub_order_id: wo for wo in work_orders}
         
         # 构建订单列表
+        domain: str = await UrlUtil.resource_domain()
         order_list = []
         for main_order in main_orders:
             user = user_map.get(main_order.user_id)
@@ -152,18 +164,18 @@ class OrderService:
                         if hasattr(commodity, 'image') and commodity.image:
                             # 处理图片列表，转换为绝对URL
                             if isinstance(commodity.image, list):
-                                image = [await UrlUtil.to_absolute_url(url) for url in commodity.image]
+                                image = UrlUtil.absolute_with(domain, commodity.image)
                             elif isinstance(commodity.image, str):
                                 # 如果是字符串，尝试解析为列表
                                 try:
                                     import json
                                     image_list = json.loads(commodity.image)
                                     if isinstance(image_list, list):
-                                        image = [await UrlUtil.to_absolute_url(url) for url in image_list]
+                                        image = UrlUtil.absolute_with(domain, image_list)
                                     else:
-                                        image = [await UrlUtil.to_absolute_url(commodity.image)]
+                                        image = [UrlUtil.absolute_with(domain, commodity.image)]
                                 except:
-                                    image = [await UrlUtil.to_absolute_url(commodity.image)]
+                                    image = [UrlUtil.absolute_with(domain, commodity.image)]
                     except:
                         image = []
                     
@@ -207,6 +219,8 @@ class OrderService:
                 goods_list=goods_list
             ))
         
+        if params.cursor is not None:
+            return CursorResult.create(order_list, total, params.page_size, next_cursor)
         return PagingResult.create(order_list, total, params.page_no, params.page_size)
 
     @classmethod
@@ -11,9 +11,9 @@
 # | Author: WaitAdmin Team <2474369941@qq.com>
 # +----------------------------------------------------------------------
 from common.utils.urls import UrlUtil
-from common.utils.times import TimeUtil
 from common.utils.config import ConfigUtil
-from common.models.users import UserVisitorModel
+from common.utils.stats import StatsUtil
+from common.models.article import ArticleModel
 from apps.admin.schemas import common_schema as schema
 from apps.admin.config import AdminConfig
 
@@ -47,22 +47,12 @@ class IndexService:
         Author:
             zero
         """
-        visitor_list = []
-        visitor_date = TimeUtil.near_to_date()
-        for d in visitor_date:
-            start_time: int = TimeUtil.date_to_timestamp(d, "%Y-%m-%d")
-            end_time: int = start_time + 86400 - 1
-            count: int = await UserVisitorModel.filter(create_time__gte=start_time, create_time__lte=end_time).count()
-            visitor_list.append(count)
+        daily = await StatsUtil.daily(7)
+        today, yesterday = daily[-1], daily[-2]
+        totals = await StatsUtil.totals(before=today["date"])
+        article_total: int = await ArticleModel.filter(is_delete=0).count()
 
-        ua_data = []
-        for ua in ["chrome", "firefox", "ie", "safari", "wechat", "other"]:
-            count: int = await UserVisitorModel.filter(
-                create_time__gte=TimeUtil.today()[0],
-                create_time__lte=TimeUtil.today()[1],
-                ua=ua
-            ).count()
-            ua_data.append({"value": count, "name": ua.capitalize()})
+        ua_data = [{"value": today[f"ua_{ua}"], "name": ua.capitalize()} for ua in StatsUtil.UA_LIST]
 
         return schema.WorkbenchVo(
             version={
@@ -75,30 +65,30 @@ class IndexService:
                 {
                     "name": "访问量",
                     "icon": await UrlUtil.to_absolute_url("static/images/gather_001.png"),
-                    "value": 2000,
-                    "total": 33,
-                    "yesterday": 33
+                    "value": today["pv"],
+                    "total": totals["pv"] + today["pv"],
+                    "yesterday": yesterday["pv"]
                 },
                 {
                     "name": "新增用户",
                     "icon": await UrlUtil.to_absolute_url("static/images/gather_002.png"),
-                    "value": 20000,
-                    "total": 33,
-                    "yesterday": 33
+                    "value": today["new_users"],
+                    "total": totals["new_users"] + today["new_users"],
+                    "yesterday": yesterday["new_users"]
                 },
                 {
                     "name": "文章数量",
                     "icon": await UrlUtil.to_absolute_url("static/images/gather_003.png"),
-                    "value": 8000,
-                    "total": 33,
-                    "yesterday": 33
+                    "value": today["new_articles"],
+                    "total": article_total,
+                    "yesterday": yesterday["new_articles"]
                 },
                 {
                     "name": "成交额",
                     "icon": await UrlUtil.to_absolute_url("static/images/gather_004.png"),
-                    "value": 20303.00,
-                    "total": 33,
-                    "yesterday": 33
+                    "value": float(today["gmv"]),
+                    "total": float(totals["gmv"] + today["gmv"]),
+                    "yesterday": float(yesterday["gmv"])
                 }
             ],
             shortcut=[
@@ -118,8 +108,8 @@ class IndexService:
                 {"name": "待回复评论", "value": 16, "path": ""},
             ],
             echartsVisitor={
-                "date": visitor_date,
-                "list": visitor_list
+                "date": [d["date"] for d in daily],
+                "list": [d["pv"] for d in daily]
             },
             echartsWebsite=ua_data
         )
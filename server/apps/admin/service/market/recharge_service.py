@@ -17,6 +17,8 @@ from common.utils.times import TimeUtil
 from common.utils.config import ConfigUtil
 from common.models.market import RechargePackageModel
 from apps.admin.schemas.market import recharge_schema as schema
+from common.utils.cache import ResponseCache
+from common.enums.cache import CacheTagEnum
 
 
 class RechargeService:
@@ -95,6 +97,7 @@ class RechargeService:
             create_time=int(time.time()),
             update_time=int(time.time())
         )
+        await ResponseCache.purge(CacheTagEnum.RECHARGE)
 
     @classmethod
     async def edit(cls, post: schema.RechargePackageEditIn):
@@ -115,6 +118,7 @@ class RechargeService:
             is_show=post.is_show,
             update_time=int(time.time())
         )
+        await ResponseCache.purge(CacheTagEnum.RECHARGE)
 
     @classmethod
     async def delete(cls, id_: int):
@@ -132,6 +136,7 @@ class RechargeService:
             is_delete=1,
             delete_time=int(time.time())
         )
+        await ResponseCache.purge(CacheTagEnum.RECHARGE)
 
     @classmethod
     async def config(cls, post: schema.RechargeConfigIn):
@@ -19,6 +19,8 @@ from common.models.dev import DevBannerModel
 from common.enums.public import BannerEnum
 from common.utils.urls import UrlUtil
 from common.utils.times import TimeUtil
+from common.utils.cache import ResponseCache
+from common.enums.cache import CacheTagEnum
 
 
 class BannerService:
@@ -119,6 +121,7 @@ class BannerService:
             create_time=int(time.time()),
             update_time=int(time.time())
         )
+        await ResponseCache.purge(CacheTagEnum.BANNER)
 
     @classmethod
     async def edit(cls, post: schema.BannerEditIn):
@@ -140,6 +143,7 @@ class BannerService:
             **params,
             update_time=int(time.time())
         )
+        await ResponseCache.purge(CacheTagEnum.BANNER)
 
     @classmethod
     async def delete(cls, id_: int):
@@ -157,3 +161,4 @@ class BannerService:
         banner.is_delete = 1
         banner.delete_time = int(time.time())
         await banner.save()
+        await ResponseCache.purge(CacheTagEnum.BANNER)
@@ -8,6 +8,8 @@ from common.models.dev import DevFeatureModel
 from common.enums.public import FeatureEnum
 from common.utils.urls import UrlUtil
 from common.utils.times import TimeUtil
+from common.utils.cache import ResponseCache
+from common.enums.cache import CacheTagEnum
 
 class FeatureService:
     """特性服务"""
@@ -58,6 +60,7 @@ class FeatureService:
             create_time = int(time.time()),
             update_time  = int(time.time()),
         )
+        await ResponseCache.purge(CacheTagEnum.FEATURE)
         
     @classmethod
     async def edit(cls, post: schema.featureUpdateIn):
@@ -68,9 +71,11 @@ class FeatureService:
             **params,
             update_time  = int(time.time()),
         )
+        await ResponseCache.purge(CacheTagEnum.FEATURE)
     
     @classmethod
     async def delete(cls, id: schema.featureDeleteIn):
         """删除特性"""
         await DevFeatureModel.filter(id=id.id).delete()
+        await ResponseCache.purge(CacheTagEnum.FEATURE)
     
\ No newline at end of file
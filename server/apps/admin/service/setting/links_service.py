@@ -17,6 +17,8 @@ from apps.admin.schemas.setting import links_schema as schema
 from common.models.dev import DevLinksModel
 from common.utils.urls import UrlUtil
 from common.utils.times import TimeUtil
+from common.utils.cache import ResponseCache
+from common.enums.cache import CacheTagEnum
 
 
 class LinksService:
@@ -88,6 +90,7 @@ class LinksService:
             create_time=int(time.time()),
             update_time=int(time.time())
         )
+        await ResponseCache.purge(CacheTagEnum.LINKS)
 
     @classmethod
     async def edit(cls, post: schema.LinksEditIn):
@@ -108,6 +111,7 @@ class LinksService:
             create_time=int(time.time()),
             update_time=int(time.time())
         )
+        await ResponseCache.purge(CacheTagEnum.LINKS)
 
     @classmethod
     async def delete(cls, id_: int):
@@ -124,3 +128,4 @@ class LinksService:
         banner.is_delete = 1
         banner.delete_time = int(time.time())
         await banner.save()
+        await ResponseCache.purge(CacheTagEnum.LINKS)
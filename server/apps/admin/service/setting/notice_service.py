@@ -15,6 +15,8 @@ import time
 from typing import List
 from exception import AppException
 from common.models.notice import NoticeSetting
+from common.utils.cache import TieredCache
+from common.enums.cache import CacheTagEnum
 from apps.admin.schemas.setting import notice_schema as schema
 
 
@@ -126,3 +128,4 @@ class NoticeService:
             **update_data,
             update_time=int(time.time())
         )
+        await TieredCache.invalidate_tags(CacheTagEnum.NOTICE)
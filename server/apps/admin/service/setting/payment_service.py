@@ -17,6 +17,8 @@ from apps.admin.schemas.setting import payment_schema as schema
 from common.models.dev import DevPayConfigModel
 from common.enums.pay import PayEnum
 from common.utils.urls import UrlUtil
+from common.utils.cache import ResponseCache
+from common.enums.cache import CacheTagEnum
 
 
 class PaymentService:
@@ -133,3 +135,4 @@ class PaymentService:
             update_time=int(time.time()),
             params=params
         )
+        await ResponseCache.purge(CacheTagEnum.PAYMENT)
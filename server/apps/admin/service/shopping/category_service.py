@@ -14,6 +14,10 @@ from exception import AppException
 from common.models.commodity import Category, Commodity
 from apps.admin.schemas.shopping import category_schema as schema
 from apps.admin.schemas.common_schema import SelectItem
+from common.utils.cache import ResponseCache
+from common.utils.category import CategoryUtil
+from common.utils.search import SearchUtil
+from common.enums.cache import CacheTagEnum
 
 
 class CategoryService:
@@ -57,10 +61,9 @@ class CategoryService:
     async def selected(cls) -> List[SelectItem]:
         """查询分类的options列表"""
         
-        selects = await Category.filter(is_delete=0).values("id", "title", 'level')
+        nodes = sorted((await CategoryUtil.index()).nodes.values(), key=lambda n: n["id"])
         ## 将level和title拼接起来，如果level为null，则默认一级分类
-        for item in selects:
-            item["title"] = "L" + str(item["level"]) + " || " + item["title"]
+        selects = [{"id": n["id"], "title": "L" + str(n["level"]) + " || " + n["title"]} for n in nodes]
         
         results = TypeAdapter(List[SelectItem]).validate_python(selects)
 
@@ -96,6 +99,8 @@ class CategoryService:
             create_time=int(time.time()),
             update_time=int(time.time())
         )
+        await CategoryUtil.refresh(insertRes.id)
+        await ResponseCache.purge(CacheTagEnum.CATEGORY, CacheTagEnum.COMMODITY)
 
 
     @classmethod
@@ -135,6 +140,8 @@ class CategoryService:
             **params,
             update_time=int(time.time())
         )
+        await CategoryUtil.refresh(post.id)
+        await ResponseCache.purge(CacheTagEnum.CATEGORY, CacheTagEnum.COMMODITY)
 
     @classmethod
     async def delete(cls, id_: int):
@@ -159,6 +166,8 @@ class CategoryService:
             raise AppException("商品分类已被使用不能删除")
 
         await Category.filter(id=id_).update(is_delete=1, delete_time=int(time.time()))
+        await CategoryUtil.refresh(id_)
+        await ResponseCache.purge(CacheTagEnum.CATEGORY, CacheTagEnum.COMMODITY)
 
     @classmethod
     async def selected_by_level(cls, level: int = 0) -> List[SelectItem]:
@@ -171,7 +180,8 @@ class CategoryService:
             List[SelectItem]: 分类选项列表
         """
         
-        selects = await Category.filter(is_delete=0, level=level).values("id", "title")
+        nodes = sorted((await CategoryUtil.index()).level(level), key=lambda n: n["id"])
+        selects = [{"id": n["id"], "title": n["title"]} for n in nodes]
         
         results = TypeAdapter(List[SelectItem]).validate_python(selects)
 
@@ -252,6 +262,7 @@ class CategoryService:
         
         created_count = 0
         skipped_count = 0
+        created_ids: List[int] = []
         
         for item in data:
             try:
@@ -411,7 +422,7 @@ class CategoryService:
                     # 如果没有 mainImage，使用第一张图片
                     commodity_main_image = image_list[0]
                 
-                await Commodity.create(
+                commodity = await Commodity.create(
                     code=article_no if article_no else "",
                     cid=second_cat_id,
                     title=title,
@@ -432,6 +443,7 @@ class CategoryService:
                     update_time=int(time.time())
                 )
                 
+                created_ids.append(commodity.id)
                 created_count += 1
                 
             except Exception as e:
@@ -439,6 +451,10 @@ class CategoryService:
                 skipped_count += 1
                 continue
         
+        await CategoryUtil.rebuild()
+        if created_ids:
+            await SearchUtil.refresh("commodity", *created_ids)
+        await ResponseCache.purge(CacheTagEnum.CATEGORY, CacheTagEnum.COMMODITY)
         return {
             "created": created_count,
             "skipped": skipped_count,
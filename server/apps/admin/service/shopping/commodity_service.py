@@ -10,11 +10,13 @@ from common.models.commodity import Commodity
 from common.models.commodity import WarehouseCard
 from apps.admin.schemas.shopping import commodity_schema as schema
 from apps.admin.schemas.common_schema import SelectItem
-from plugins.pyTorch.embedding_extractor import EmbeddingExtractor
-from plugins.milvus.milvus_service import milvus_service
+from plugins.registry import PluginRegistry
 from PIL import Image
 import os
 from common.utils.urls import UrlUtil
+from common.utils.cache import ResponseCache
+from common.utils.search import SearchUtil
+from common.enums.cache import CacheTagEnum
 
 
 class CommodityService:
@@ -109,7 +111,7 @@ class CommodityService:
 
         # 同步到 Milvus（使用多张图片）
         try:
-            if insertRes.image and len(insertRes.image) > 0:
+            if PluginRegistry.enabled("milvus") and insertRes.image and len(insertRes.image) > 0:
                 # 处理多张图片路径
                 local_paths = []
                 for img_path in insertRes.image:
@@ -122,11 +124,12 @@ class CommodityService:
                         local_paths.append(local_path)
                 
                 if local_paths:
-                    extractor = EmbeddingExtractor()
+                    extractor = await PluginRegistry.aget("embedding")
+                    milvus = await PluginRegistry.aget("milvus")
                     # 使用多图特征提取
                     vector = extractor.extract_commodity_feature(local_paths, min_images=1)
                     
-                    milvus_service.insert_commodities([{
+                    milvus.insert_commodities([{
                         "id": insertRes.id,
                         "vector": vector,
                         "commodity_id": insertRes.id,
@@ -134,6 +137,8 @@ class CommodityService:
                     }])
         except Exception as e:
             print(f"Failed to sync to Milvus: {e}")
+        await SearchUtil.refresh("commodity", insertRes.id)
+        await ResponseCache.purge(CacheTagEnum.COMMODITY)
 
 
     @classmethod
@@ -165,7 +170,7 @@ class CommodityService:
             # 如果更新了图片或标题，需要更新向量库
             # 为了保证一致性，先查询最新数据
             current_goods = await Commodity.filter(id=post.id).first()
-            if current_goods and current_goods.image and len(current_goods.image) > 0:
+            if PluginRegistry.enabled("milvus") and current_goods and current_goods.image and len(current_goods.image) > 0:
                 # 处理多张图片路径
                 local_paths = []
                 for img_path in current_goods.image:
@@ -178,14 +183,15 @@ class CommodityService:
                         local_paths.append(local_path)
                 
                 if local_paths:
-                    extractor = EmbeddingExtractor()
+                    extractor = await PluginRegistry.aget("embedding")
+                    milvus = await PluginRegistry.aget("milvus")
                     # 使用多图特征提取
                     vector = extractor.extract_commodity_feature(local_paths, min_images=1)
                     
                     # Milvus Lite 不支持直接 Update，通常是 Delete + Insert 或者 Upsert
                     # pymilvus 的 insert 在某些模式下是 upsert，但为了安全，先 delete 再 insert
-                    milvus_service.delete_commodities([post.id])
-                    milvus_service.insert_commodities([{
+                    milvus.delete_commodities([post.id])
+                    milvus.insert_commodities([{
                         "id": post.id,
                         "vector": vector,
                         "commodity_id": post.id,
@@ -193,6 +199,8 @@ class CommodityService:
                     }])
         except Exception as e:
             print(f"Failed to sync to Milvus: {e}")
+        await SearchUtil.refresh("commodity", post.id)
+        await ResponseCache.purge(CacheTagEnum.COMMODITY)
 
     @classmethod
     async def delete(cls, id_: int):
@@ -214,19 +222,26 @@ class CommodityService:
 
         # 同步删除 Milvus
         try:
-            milvus_service.delete_commodities([id_])
+            if PluginRegistry.enabled("milvus"):
+                (await PluginRegistry.aget("milvus")).delete_commodities([id_])
         except Exception as e:
             print(f"Failed to delete from Milvus: {e}")
+        await SearchUtil.refresh("commodity", id_)
+        await ResponseCache.purge(CacheTagEnum.COMMODITY)
 
     @classmethod
     async def sync_all_to_milvus(cls):
         """
         初始化/同步所有商品到向量数据库
         """
+        if not PluginRegistry.enabled("milvus"):
+            raise AppException("以图搜图未开启")
+
         print("开始同步所有商品到 Milvus...")
         commodities = await Commodity.filter(is_delete=0).all()
         
-        extractor = EmbeddingExtractor()
+        extractor = await PluginRegistry.aget("embedding")
+        milvus = await PluginRegistry.aget("milvus")
         
         # 先清空集合（可选，或者直接覆盖）
         # milvus.client.drop_collection(milvus.collection_name)
@@ -276,7 +291,7 @@ class CommodityService:
                 })
                 
                 if len(data_to_insert) >= 100:
-                    milvus_service.insert_commodities(data_to_insert)
+                    milvus.insert_commodities(data_to_insert)
                     count += len(data_to_insert)
                     data_to_insert = []
                     print(f"Synced {count} items...")
@@ -285,7 +300,7 @@ class CommodityService:
                 print(f"Error processing goods {goods.id}: {e}")
                 
         if data_to_insert:
-            milvus_service.insert_commodities(data_to_insert)
+            milvus.insert_commodities(data_to_insert)
             count += len(data_to_insert)
             
         print(f"Sync complete. Total {count} items synced.")
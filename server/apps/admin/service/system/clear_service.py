@@ -12,6 +12,7 @@
 # +----------------------------------------------------------------------
 from apps.admin.schemas.system import clear_schema as schema
 from common.utils.cache import RedisUtil
+from common.utils.config import ConfigUtil
 
 
 class ClearService:
@@ -28,13 +29,7 @@ class ClearService:
             zero
         """
         if post.system:
-            await RedisUtil.delete("sys:config")
+            await ConfigUtil.clear()
 
         if post.login:
-            cursor = 0
-            while True:
-                cursor, keys = await RedisUtil.scan_keys("login:*", cursor)
-                for key in keys:
-                    await RedisUtil.delete(key)
-                if cursor == 0:
-                    break
+            await RedisUtil.unlink_pattern("login:*")
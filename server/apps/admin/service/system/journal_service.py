@@ -10,9 +10,9 @@
 # +----------------------------------------------------------------------
 # | Author: WaitAdmin Team <2474369941@qq.com>
 # +----------------------------------------------------------------------
-from typing import List
+from typing import List, Union
 from pydantic import TypeAdapter
-from hypertext import PagingResult
+from hypertext import PagingResult, CursorResult
 from common.utils.times import TimeUtil
 from common.models.sys import SysLogModel
 from common.models.auth import AuthAdminModel
@@ -23,7 +23,7 @@ class JournalService:
     """ 系统日志服务类 """
 
     @classmethod
-    async def lists(cls, params: schema.JournalSearchIn) -> PagingResult[schema.JournalListVo]:
+    async def lists(cls, params: schema.JournalSearchIn) -> Union[PagingResult[schema.JournalListVo], CursorResult[schema.JournalListVo]]:
         """
         系统日志列表。
 
@@ -31,7 +31,7 @@ class JournalService:
             params (schema.JournalSearchIn): 系统日志查询参数。
 
         Returns:
-            PagingResult[schema.JournalListVo]: 系统日志分页列表Vo。
+            Union[PagingResult, CursorResult]: 系统日志分页列表Vo, 传入游标时为游标分页。
 
         Author:
             zero
@@ -42,13 +42,22 @@ class JournalService:
             "datetime": ["start_time|end_time@create_time"]
         }, params.__dict__)
 
-        _model = SysLogModel.filter(*where).order_by("-id")
-        _pager = await SysLogModel.paginate(
-            model=_model,
-            page_no=params.page_no,
-            page_size=params.page_size,
-            fields=SysLogModel.without_field("params,endpoint,user_agent,start_time,end_time")
-        )
+        _model = SysLogModel.filter(*where)
+        _fields = SysLogModel.without_field("params,endpoint,user_agent,start_time,end_time")
+        if params.cursor is not None:
+            _pager = await SysLogModel.paginate_cursor(
+                model=_model,
+                cursor=params.cursor,
+                page_size=params.page_size,
+                fields=_fields
+            )
+        else:
+            _pager = await SysLogModel.paginate(
+                model=_model.order_by("-id"),
+                page_no=params.page_no,
+                page_size=params.page_size,
+                fields=_fields
+            )
 
         admin_ids: List[int] = [item["admin_id"] for item in _pager.lists if item["admin_id"]]
         admin_dict = {}
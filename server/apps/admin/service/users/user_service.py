@@ -45,16 +45,13 @@ class UserService:
         Author:
             zero
         """
-        init_sessions = await SecurityDriver.module("api").get_token_list(params.user_id)
-
-        start_index = (params.page_no - 1) * params.page_size
-        end_index = start_index + params.page_size
-        if start_index < 0:
-            start_index = 0
-        if end_index > len(init_sessions):
-            end_index = len(init_sessions)
-
-        sessions = init_sessions[start_index:end_index]
+        driver = SecurityDriver.module("api")
+        total = await driver.get_token_count(params.user_id)
+        sessions = await driver.get_token_list(
+            params.user_id,
+            offset=max((params.page_no - 1) * params.page_size, 0),
+            limit=params.page_size
+        )
 
         _data = []
         for item in sessions:
@@ -86,7 +83,7 @@ class UserService:
 
         return PagingResult.create(
             data=_data,
-            total=len(init_sessions),
+            total=total,
             page_no=params.page_no,
             page_size=params.page_size
         )
@@ -10,9 +10,16 @@
 # +----------------------------------------------------------------------
 # | Author: WaitAdmin Team <2474369941@qq.com>
 # +----------------------------------------------------------------------
-import json
 from typing import Optional
 from common.utils.cache import RedisUtil
+from common.utils.codec import CodecUtil
+
+
+RedisUtil.register_script("wechat:scan_set", """
+local ttl = redis.call('ttl', KEYS[1])
+if ttl <= 0 then ttl = 1 end
+return redis.call('set', KEYS[1], ARGV[1], 'EX', ttl)
+""")
 
 
 class WechatCache:
@@ -40,10 +47,14 @@ class WechatCache:
         Author:
             zero
         """
-        result = await RedisUtil.get(cls.prefix + state)
+        async with RedisUtil.pipeline(binary=True) as pipe:
+            pipe.get(cls.prefix + state)
+            pipe.ttl(cls.prefix + state)
+            result, ttl = await pipe.execute()
+
         if result is not None:
-            data = json.loads(result)
-            data["expire"] = await RedisUtil.ttl(cls.prefix + state)
+            data = CodecUtil.decode(result)
+            data["expire"] = ttl
             return data
         return None
 
@@ -61,15 +72,14 @@ class WechatCache:
             zero
         """
         data = {"status": status}
-        expire: int = cls.ttl
         if token:
             data["token"] = token
 
-        if status != cls.SCAN_STATUS_STAY:
-            ttl = await RedisUtil.ttl(cls.prefix + state)
-            expire = 1 if ttl <= 0 else int(ttl)
-
-        await RedisUtil.set(cls.prefix + state, json.dumps(data), expire)
+        if status == cls.SCAN_STATUS_STAY:
+            await RedisUtil.set_obj(cls.prefix + state, data, cls.ttl)
+        else:
+            # 沿用剩余的有效期 (读取TTL与写入在服务端一次完成)
+            await RedisUtil.eval_script("wechat:scan_set", [cls.prefix + state], [RedisUtil.encode(cls.prefix + state, data)])
 
     @classmethod
     async def login_scan_del(cls, state: str):
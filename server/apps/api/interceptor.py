@@ -35,7 +35,7 @@ class LoginInterceptor:
         token: str = bearer.credentials
         terminal: int = request.state.terminal
         # 不检查设备了
-        status = await SecurityDriver.module("api").check_login(token, "")
+        status = (await SecurityDriver.module("api").resolve(request, token)).status
         if status == "invalid":
             raise AppException(
                 msg="登录失效",
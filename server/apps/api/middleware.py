@@ -11,16 +11,15 @@
 # | Author: WaitAdmin Team <2474369941@qq.com>
 # +----------------------------------------------------------------------
 import time
-import json
 import typing
-import xmltodict
 from fastapi import FastAPI, Request
-from starlette.types import ASGIApp
-from starlette.responses import Response
-from starlette.middleware.base import BaseHTTPMiddleware, RequestResponseEndpoint
+from starlette.types import ASGIApp, Scope, Receive, Send
 from config import get_settings
+from kernels.middleware import BodyCapture
 from .config import ApiConfig
 from common.utils.tools import ToolsUtil
+from common.utils.writer import BatchWriter
+from common.utils.stats import StatsUtil
 from common.models.users import UserVisitorModel
 from plugins.safe.driver import SecurityDriver
 
@@ -30,27 +29,30 @@ def init_middlewares(app: FastAPI):
     app.add_middleware(logs_middleware)
 
 
-class LogsMiddleware(BaseHTTPMiddleware):
+class LogsMiddleware:
     def __init__(self, app: ASGIApp):
-        super().__init__(app)
+        self.app = app
         self.STATUS_OK = 1
         self.STATUS_FAIL = 2
 
-    async def dispatch(self, request: Request, call_next: RequestResponseEndpoint) -> Response:
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
         # 模块验证
         module: str = get_settings().ROUTER_ALIAS.get("api", "api")
-        endpoint: any = request.scope.get("endpoint", lambda: None)
-        if request.state.module != module or endpoint.__module__ == "starlette.staticfiles":
-            return await call_next(request)
+        request: Request = Request(scope, receive)
+        if request.state.module != module:
+            return await self.app(scope, receive, send)
 
         # 登录信息
-        request.state.user_id = int(await SecurityDriver.module("api").get_login_id())
+        request.state.user_id = (await SecurityDriver.module("api").resolve(request)).uid
         request.state.terminal = int(request.headers.get("Terminal") or 0)
 
         # 无需记录
         uri: str = request.url.path.replace(f"/{module}/", "").replace("/", ":")
         if ApiConfig.add_record_log and uri not in ApiConfig.add_record_log:
-            return await call_next(request)
+            return await self.app(scope, receive, send)
 
         # 异常信息
         error: str = ""
@@ -58,40 +60,39 @@ class LogsMiddleware(BaseHTTPMiddleware):
         status: int = self.STATUS_OK
         start_time: float = time.time()
 
-        # 请求参数
+        # 请求参数 (后续处理读取请求体时旁路截取, 不重复读取和解析)
+        capture: typing.Optional[BodyCapture] = None
         if request.method == "POST":
             content_type: str = request.headers.get("content-type", "")
-            if content_type.startswith("application/xml"):
-                form_params = await request.body()
-                dict_params = xmltodict.parse(form_params)
-                args = json.dumps([dict_params], ensure_ascii=False)
-            elif content_type.startswith("multipart/form-data"):
-                args = ""
-            else:
-                form_params = await request.json()
-                for key in ["password", "password_confirm", "password_old"]:
-                    if form_params.get(key):
-                        form_params[key] = "******"
-                args = json.dumps([form_params], ensure_ascii=False)
+            if not content_type.startswith("multipart/form-data"):
+                capture = BodyCapture(receive)
+                receive = capture
+            args = ""
         else:
             args = str(request.query_params)
 
         # 执行方法
-        response = None
         try:
-            response = await call_next(request)
+            await self.app(scope, receive, send)
         except Exception as e:
             errno = e
             error = str(e)
             status = self.STATUS_FAIL
 
         # 请求信息
+        args = capture.text() if capture is not None else args
         end_time: float = time.time()
         task_time: float = round(end_time - start_time, 3)
-        summary: str = request.scope.get("route").summary if request.scope.get("route") else ""
+        endpoint: any = scope.get("endpoint", lambda: None)
+        summary: str = scope.get("route").summary if scope.get("route") else ""
         user_agent: str = request.headers.get("user-agent", "")
+        ua: str = ToolsUtil.to_user_agent(user_agent)
+
+        # 访问统计
+        StatsUtil.record_visit(request.state.user_id, request.client.host, ua)
 
-        await UserVisitorModel.create(
+        # 保存记录 (批量异步写入)
+        BatchWriter.of(UserVisitorModel).put(
             user_id=request.state.user_id,
             terminal=request.state.terminal,
             summary=summary,
@@ -99,7 +100,7 @@ class LogsMiddleware(BaseHTTPMiddleware):
             method=request.method,
             url=request.url.path,
             ip=request.client.host,
-            ua=ToolsUtil.to_user_agent(user_agent),
+            ua=ua,
             user_agent=user_agent,
             params=args,
             error=error,
@@ -113,6 +114,3 @@ class LogsMiddleware(BaseHTTPMiddleware):
         # 发送异常
         if errno:
             raise errno
-
-        # 执行完成
-        return response
@@ -12,7 +12,8 @@
 # +----------------------------------------------------------------------
 from typing import List
 from fastapi import APIRouter, Request, Depends
-from hypertext import R, response_json, PagingResult
+from hypertext import R, response_json, response_cache, PagingResult
+from common.enums.cache import CacheTagEnum
 from apps.api.schemas import article_schema as schema
 from apps.api.service.article_service import ArticleService
 
@@ -49,6 +50,7 @@ async def detail(request: Request, params: schema.ArticleDetailIn = Depends()):
 
 
 @router.get("/pages", summary="文章页面", response_model=schema.ArticlePagesVo)
+@response_cache(CacheTagEnum.ARTICLE, CacheTagEnum.BANNER, CacheTagEnum.CONFIG)
 @response_json
 async def pages():
     return await ArticleService.pages()
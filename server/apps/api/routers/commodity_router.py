@@ -12,7 +12,9 @@
 # +----------------------------------------------------------------------
 from typing import List
 from fastapi import APIRouter, Request, Depends, UploadFile, File
-from hypertext import R, response_json, PagingResult
+from hypertext import R, response_json, response_cache, PagingResult
+from common.enums.cache import CacheTagEnum
+from common.utils.sampler import SamplerUtil
 from apps.api.schemas import commodity_schema as schema
 from apps.api.schemas.commodity_schema import CommodityCategoryVo
 from apps.api.schemas.index_schema import BannerListVo
@@ -23,6 +25,7 @@ router = APIRouter(prefix="/commodity", tags=["商品管理"])
 
 
 @router.get("/category", summary="商品分类列表", response_model=R[List[CommodityCategoryVo]])
+@response_cache(CacheTagEnum.CATEGORY)
 @response_json
 async def category():
     """
@@ -33,14 +36,15 @@ async def category():
 
 @router.get("/lists", summary="商品列表", response_model=R[PagingResult[schema.CommodityListsVo]])
 @response_json
-async def lists(params: schema.CommoditySearchIn = Depends()):
+async def lists(request: Request, params: schema.CommoditySearchIn = Depends()):
     """
     商品列表
     """
-    return await CommodityService.lists(params)
+    return await CommodityService.lists(params, SamplerUtil.session_seed(request, params.seed))
 
 
 @router.get("/pages", summary="商品页面", response_model=R[schema.CommodityPagesVo])
+@response_cache(CacheTagEnum.COMMODITY, CacheTagEnum.BANNER, CacheTagEnum.CONFIG)
 @response_json
 async def pages():
     """
@@ -11,7 +11,8 @@
 # | Author: WaitAdmin Team <2474369941@qq.com>
 # +----------------------------------------------------------------------
 from fastapi import APIRouter, Depends
-from hypertext import R, response_json
+from hypertext import R, response_json, response_cache
+from common.enums.cache import CacheTagEnum
 from apps.api.schemas import index_schema as schema
 from apps.api.service.index_service import IndexService
 
@@ -19,12 +20,14 @@ router = APIRouter(prefix="/index", tags=["公共接口"])
 
 
 @router.get("/homing", summary="主页数据", response_model=R[schema.ConfigVo])
+@response_cache(CacheTagEnum.BANNER, CacheTagEnum.FEATURE, CacheTagEnum.ARTICLE, CacheTagEnum.CATEGORY, CacheTagEnum.CONFIG)
 @response_json
 async def homing():
     return await IndexService.homing()
 
 
 @router.get("/config", summary="全局配置", response_model=R[schema.ConfigVo])
+@response_cache(CacheTagEnum.CONFIG, CacheTagEnum.LINKS)
 @response_json
 async def config():
     return await IndexService.config()
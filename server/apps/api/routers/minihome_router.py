@@ -11,8 +11,10 @@
 # | Author: WaitAdmin Team <2474369941@qq.com>
 # +----------------------------------------------------------------------
 from typing import List
-from fastapi import APIRouter, Query, Depends
-from hypertext import R, response_json
+from fastapi import APIRouter, Request, Query, Depends
+from hypertext import R, response_json, response_cache
+from common.enums.cache import CacheTagEnum
+from common.utils.sampler import SamplerUtil
 from apps.api.schemas import minihome_schema as schema
 from apps.api.service.minihome_service import MiniHomeService
 
@@ -20,6 +22,7 @@ router = APIRouter(prefix="/minihome", tags=["MiniHome接口"])
 
 
 @router.get("/pages", summary="MiniHome页面数据", response_model=R[schema.MiniHomePagesVo])
+@response_cache(CacheTagEnum.BANNER, CacheTagEnum.CONFIG)
 @response_json
 async def pages():
     """
@@ -33,7 +36,7 @@ async def pages():
 
 @router.get("/goods", summary="推荐商品列表", response_model=R[schema.PagingResult[schema.CommodityListsVo]])
 @response_json
-async def goods(params: schema.GoodsListIn = Depends()):
+async def goods(request: Request, params: schema.GoodsListIn = Depends()):
     """
     获取推荐商品列表，支持分页和类型筛选
     
@@ -43,7 +46,7 @@ async def goods(params: schema.GoodsListIn = Depends()):
     Returns:
         R[schema.GoodsListVo]: 商品列表响应
     """
-    return await MiniHomeService.goods_list(params)
+    return await MiniHomeService.goods_list(params, SamplerUtil.session_seed(request, params.seed))
 
 
 @router.get("/search", summary="搜索商品", response_model=R[schema.PagingResult[schema.CommodityListsVo]])
@@ -77,6 +80,7 @@ async def guess_categories(limit: int = Query(default=10, ge=1, le=50, descripti
 
 
 @router.get("/categories", summary="商品分类列表", response_model=R[List[schema.CategoryVo]])
+@response_cache(CacheTagEnum.CATEGORY, CacheTagEnum.CONFIG)
 @response_json
 async def categories():
     """
@@ -14,7 +14,8 @@ import json
 from typing import List
 from fastapi import APIRouter, Request, Depends
 from fastapi.responses import JSONResponse
-from hypertext import R, response_json
+from hypertext import R, response_json, response_cache
+from common.enums.cache import CacheTagEnum
 from apps.api.schemas import payment_schema as schema
 from apps.api.service.payment_service import PaymentService
 from apps.api.service.payNotify_service import PayNotifyService
@@ -28,6 +29,7 @@ router = APIRouter(prefix="/payment", tags=["支付管理"])
 
 
 @router.get("/pay_way", summary="支付方式", response_model=R[List[schema.PayWayListVo]])
+@response_cache(CacheTagEnum.PAYMENT, CacheTagEnum.CONFIG)
 @response_json
 async def pay_way():
     return await PaymentService.pay_way()
@@ -11,7 +11,8 @@
 # | Author: WaitAdmin Team <2474369941@qq.com>
 # +----------------------------------------------------------------------
 from fastapi import APIRouter, Request
-from hypertext import R, response_json
+from hypertext import R, response_json, response_cache
+from common.enums.cache import CacheTagEnum
 from apps.api.schemas import recharge_schema as schema
 from apps.api.service.recharge_service import RechargeService
 
@@ -19,6 +20,7 @@ router = APIRouter(prefix="/recharge", tags=["充值管理"])
 
 
 @router.get("/package", summary="充值套餐", response_model=R[schema.RechargePackageVo])
+@response_cache(CacheTagEnum.RECHARGE)
 @response_json
 async def package():
     return await RechargeService.package()
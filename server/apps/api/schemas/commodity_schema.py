@@ -23,6 +23,7 @@ class CommoditySearchIn(BaseModel):
     keyword: Union[str, None] = Query(default=None, description="搜索关键词")
     minPrice: Union[int, None] = Query(default=None, description="最低价格")
     maxPrice: Union[int, None] = Query(default=None, description="最高价格")
+    seed: Union[int, None] = Query(default=None, description="随机种子(无筛选条件时的随机排列, 默认按访客生成)")
 
 
 class CommodityDetailIn(BaseModel):
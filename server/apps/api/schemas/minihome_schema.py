@@ -78,6 +78,7 @@ class GoodsListIn(BaseModel):
     size: int = Query(default=10, gt=0, description="每页条数")
     sort: Optional[int] = Query(default=0, description="排序: [0=默认, 1=销量]")
     type: Optional[str] = Query(default="recommend", description="推荐类型: [recommend=推荐, topping=置顶, ranking=排行]")
+    seed: Optional[int] = Query(default=None, description="随机种子(推荐模式的随机排列, 默认按访客生成)")
 
     class Config:
         json_schema_extra = {
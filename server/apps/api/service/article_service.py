@@ -24,6 +24,7 @@ from ..schemas.index_schema import BannerListVo
 from common.enums.public import BannerEnum
 from common.utils.times import TimeUtil
 from common.utils.urls import UrlUtil
+from common.utils.search import SearchUtil
 
 
 class ArticleService:
@@ -89,17 +90,27 @@ class ArticleService:
         """
         order = ["-update_time", "-id"]
         where = ArticleModel.build_search({
-            "=": ["cid"],
-            "%like%": ["keyword@title"]
+            "=": ["cid"]
         }, params.__dict__)
 
-        _model = ArticleModel.filter(*where).filter(is_delete=0).order_by(*order)
-        _pager = await ArticleModel.paginate(
-            model=_model,
-            page_no=params.page,
-            page_size=10,
-            fields=["id", "cid", "image", "title", "intro", "browse", "create_time", "update_time"]
-        )
+        _model = ArticleModel.filter(*where).filter(is_delete=0)
+        _fields = ["id", "cid", "image", "title", "intro", "browse", "create_time", "update_time"]
+        if params.keyword:
+            # 关键词搜索: 按相关度排序
+            _pager = await ArticleModel.paginate_ids(
+                model=_model,
+                ids=await SearchUtil.search("article", params.keyword, cid=params.cid),
+                page_no=params.page,
+                page_size=10,
+                fields=_fields
+            )
+        else:
+            _pager = await ArticleModel.paginate(
+                model=_model.order_by(*order),
+                page_no=params.page,
+                page_size=10,
+                fields=_fields
+            )
 
         _category = {}
         cid_ids = [item["cid"] for item in _pager.lists if item["cid"]]
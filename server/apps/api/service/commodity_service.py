@@ -12,17 +12,18 @@
 # +----------------------------------------------------------------------
 from typing import List, Dict, Any, Union, Optional
 import json
-from tortoise.expressions import Q
+from tortoise.expressions import Q, F
 from tortoise.functions import Count
-from tortoise.contrib.mysql.functions import Rand
 from fastapi import Depends
 from pydantic import TypeAdapter
-from common.models.commodity import (
-    Commodity as CommodityModel,
-    Category as CommodityCategoryModel)
+from common.models.commodity import Commodity as CommodityModel
 from common.models.dev import DevBannerModel
 from common.models.users import UserModel
 from common.utils.urls import UrlUtil
+from common.utils.category import CategoryUtil
+from common.utils.cache import SingleFlight
+from common.utils.sampler import SamplerUtil
+from common.utils.search import SearchUtil
 from common.utils.times import TimeUtil
 from apps.api.schemas.commodity_schema import (
     CommoditySearchIn, CommodityDetailIn,
@@ -38,8 +39,8 @@ from fastapi import UploadFile
 from PIL import Image
 import io
 import os
-from plugins.pyTorch.embedding_extractor import EmbeddingExtractor
-from plugins.milvus.milvus_service import milvus_service
+from exception import AppException
+from plugins.registry import PluginRegistry
 
 
 class CommodityService:
@@ -56,47 +57,31 @@ class CommodityService:
         Returns:
             List[CommodityCategoryVo]: 结构化的分类列表
         """
-        # 查询并转换原始分类数据
-        categories = await CommodityCategoryModel.filter(
-            is_show=1,
-            is_delete=0
-        ).order_by("-sort", "-id").values('id', 'title', 'parent_id', 'image')
-        
-        # 转换字段格式并处理图片URL（移除无效的校验逻辑）
-        processed_cats = [
-            {
-                **item,
-                "name": item["title"],
-                "image": item["image"],
-                "children": []  # 预先初始化子分类列表
+        index = await CategoryUtil.index()
+
+        def build(node: Dict) -> Dict:
+            return {
+                "id": node["id"],
+                "name": node["title"],
+                "image": node["image"],
+                "parent_id": node["parent_id"],
+                "children": [build(child) for child in index.children_of(node["id"], visible=True)]
             }
-            for item in categories  # 直接遍历，ORM返回的结果本身是可靠的
-        ]
-        
-        # 创建ID到分类的映射，便于快速查找
-        cat_map: Dict[int, Dict] = {cat["id"]: cat for cat in processed_cats}
-        
-        # 构建分类树
-        root_cats: List[Dict] = []
-        for cat in processed_cats:
-            parent_id = cat.get("parent_id")
-            if parent_id in [0, None]:
-                root_cats.append(cat)
-            elif parent_id in cat_map:
-                cat_map[parent_id]["children"].append(cat)
-            # 忽略无效的父ID，可根据需求添加日志
-        
+
+        root_cats: List[Dict] = [build(node) for node in index.roots(visible=True)]
+
         # 验证并转换为VO对象
         adapter = TypeAdapter(CommodityCategoryVo)
         return [adapter.validate_python(cat) for cat in root_cats]
 
     @classmethod
-    async def lists(cls, params: CommoditySearchIn) -> PagingResult[CommodityListsVo]:
+    async def lists(cls, params: CommoditySearchIn, seed: int = 0) -> PagingResult[CommodityListsVo]:
         """
         获取商品列表
         
         Args:
             params (CommoditySearchIn): 搜索参数
+            seed (int): 随机种子, 无筛选条件时按该种子随机排列
         
         Returns:
             PagingResult[CommodityListsVo]: 商品列表和分页信息
@@ -104,10 +89,9 @@ class CommodityService:
         Author:
             WaitAdmin Team
         """
-        # 构建搜索条件
+        # 构建搜索条件 (关键词走全文检索)
         where = CommodityModel.build_search({
             "=": ["categoryId@cid"],
-            "%like%": ["keyword@title"],
             ">=": ["minPrice@price"],
             "<=": ["maxPrice@price"]
         }, params.__dict__)
@@ -115,37 +99,48 @@ class CommodityService:
         # 添加基础条件
         where.append(Q(is_show=1, is_delete=0))
         
-        # 排序规则
-        order_by = []
-        if params.categoryId or params.keyword:
+        # 查询商品列表并分页
+        fields = ["id", "cid", "main_image", "image", "title", "intro", "price", "fee", "stock", "sales", "browse", "collect", "is_recommend", "is_topping", "create_time", "update_time"]
+        page_size = params.size if params.size else 10
+        if params.keyword:
+            # 关键词搜索: 按相关度排序
+            ids = await SearchUtil.search(
+                "commodity", params.keyword,
+                cid=params.categoryId,
+                min_price=params.minPrice,
+                max_price=params.maxPrice
+            )
+            _pager = await CommodityModel.paginate_ids(
+                model=CommodityModel.filter(*where),
+                ids=ids,
+                page_no=params.page,
+                page_size=page_size,
+                fields=fields
+            )
+        elif any(v is not None for v in (params.categoryId, params.minPrice, params.maxPrice)):
             # 有筛选条件时，按照销量和浏览量排序
-            order_by = ['-sales', '-browse', '-id', 'Rand']
+            _model = CommodityModel.filter(*where).order_by('-sales', '-browse', '-id')
+            _pager = await CommodityModel.paginate(
+                model=_model,
+                page_no=params.page,
+                page_size=page_size,
+                fields=fields
+            )
         else:
-            # 无筛选条件时，按照是否置顶、是否推荐排序
-            order_by = ['Rand']
-        
-        # 查询商品列表并分页
-        _model = CommodityModel.annotate(Rand=Rand()).filter(*where).order_by(*order_by)
-        _pager = await CommodityModel.paginate(
-            model=_model,
-            page_no=params.page,
-            page_size=params.size if params.size else 10,
-            fields=["id", "cid", "main_image", "image", "title", "intro", "price", "fee", "stock", "sales", "browse", "collect", "is_recommend", "is_topping", "create_time", "update_time"]
-        )
+            # 无筛选条件时，按种子随机排列（翻页不重复）
+            _pager = await SamplerUtil.paginate(SamplerUtil.ALL, seed, params.page, page_size, fields)
         
         # 查询分类信息
         cid_ids = [item["cid"] for item in _pager.lists if item["cid"]]
         _category = {}
         if cid_ids:
-            categories = await CommodityCategoryModel.filter(id__in=list(set(cid_ids))).all().values_list("id", "title")
-            _category = {k: v for k, v in categories}
+            _category = (await CategoryUtil.index()).titles(set(cid_ids))
         
         # 格式化商品数据
+        await UrlUtil.to_absolute_urls(_pager.lists, ["main_image", "image"])
         _results = []
         for item in _pager.lists:
             item["category"] = _category.get(item["cid"], "")
-            item["main_image"] = await UrlUtil.to_absolute_url(item["main_image"])
-            item["image"] = [await UrlUtil.to_absolute_url(url) for url in item["image"]]
             item["create_time"] = item["create_time"]
             item["update_time"] = item["update_time"]
             vo = TypeAdapter(CommodityListsVo).validate_python(item)
@@ -167,7 +162,7 @@ class CommodityService:
             List[CommodityListsVo]: 推荐商品列表
         """
         where = [Q(is_show=1, is_delete=0)]
-        order = ['-sort', '-id', 'Rand']
+        order = ['-sort', '-id']
         
         if type_ == "recommend":
             where.append(Q(is_recommend=1))
@@ -178,7 +173,6 @@ class CommodityService:
         
         # 查询推荐商品
         items = (await CommodityModel
-                        .annotate(Rand=Rand())
                         .filter(*where)
                         .filter(is_show=1, is_delete=0)
                         .order_by(*order)
@@ -189,19 +183,13 @@ class CommodityService:
         _category = {}
         cid_ids = [item["cid"] for item in items if item["cid"]]
         if cid_ids:
-            category_ = await CommodityCategoryModel.filter(id__in=list(set(cid_ids))).all().values_list("id", "title")
-            _category = {k: v for k, v in category_}
+            _category = (await CategoryUtil.index()).titles(set(cid_ids))
         
         # 格式化商品数据
+        await UrlUtil.to_absolute_urls(items, ["main_image", "image"])
         formatted_items = []
         for item in items:
             item["category"] = _category.get(item["cid"], "")
-            item["main_image"] = await UrlUtil.to_absolute_url(item["main_image"])
-            ## 处理图片列表URL
-            if item["image"]:
-                # 循环处理每个图片URL
-                item["image"] = [await UrlUtil.to_absolute_url(url) for url in item["image"]]
-            
             item["create_time"] = TimeUtil.timestamp_to_date(item["create_time"])
             item["update_time"] = TimeUtil.timestamp_to_date(item["update_time"])
             vo = TypeAdapter(CommodityListsVo).validate_python(item)
@@ -220,7 +208,19 @@ class CommodityService:
         Returns:
             CommodityDetailVo: 商品详情
         """
-        # 查询商品详情
+        # 热门商品的并发请求合并为一次加载 (只合并与域名无关的数据库查询)
+        loaded = await SingleFlight.do(f"commodity:detail:{goods_id}", lambda: cls._load_detail(goods_id))
+        
+        # 图片地址按各自请求的域名转换
+        detail = await UrlUtil.to_absolute_urls(dict(loaded), ["main_image", "image"])
+        
+        # 浏览量+1
+        await CommodityModel.filter(id=goods_id).update(browse=F("browse") + 1)
+        return TypeAdapter(CommodityDetailVo).validate_python(detail)
+
+    @classmethod
+    async def _load_detail(cls, goods_id: int) -> dict:
+        """ 加载商品详情 (图片为相对地址, 由调用方转换) """
         commodity = await CommodityModel.get_or_none(
             id=goods_id,
             is_show=1,
@@ -230,13 +230,9 @@ class CommodityService:
         if not commodity:
             raise Exception("商品不存在或已下架")
         
-        # 浏览量+1
-        commodity.browse += 1
-        await commodity.save(update_fields=['browse'])
-        
         # 查询分类信息
-        category = await CommodityCategoryModel.get_or_none(id=commodity.cid)
-        category_name = category.title if category else ''
+        category = (await CategoryUtil.index()).get(commodity.cid)
+        category_name = category["title"] if category else ''
         
         # 查询收藏状态
         is_collect = 0
@@ -245,8 +241,8 @@ class CommodityService:
         formatted_detail = {
             'id': commodity.id,
             'category': category_name,
-            'main_image': await UrlUtil.to_absolute_url(commodity.main_image),
-            'image': [await UrlUtil.to_absolute_url(url) for url in commodity.image],
+            'main_image': commodity.main_image,
+            'image': commodity.image,
             'title': commodity.title,
             'intro': commodity.intro,
             'price': commodity.price,
@@ -254,7 +250,7 @@ class CommodityService:
             'stock': commodity.stock,
             'sales': commodity.sales,
             'deliveryType': commodity.deliveryType,
-            'browse': commodity.browse,
+            'browse': commodity.browse + 1,
             'collect': commodity.collect,
             'is_collect': is_collect,
             'config': commodity.config,
@@ -265,7 +261,7 @@ class CommodityService:
             'update_time': TimeUtil.timestamp_to_date(commodity.update_time)
         }
         
-        return TypeAdapter(CommodityDetailVo).validate_python(formatted_detail)
+        return formatted_detail
     
     @classmethod
     async def pages(cls) -> CommodityPagesVo:
@@ -288,8 +284,7 @@ class CommodityService:
                            .order_by("-sort", "-id")
                            .all().values("title", "image", "target", "url", "desc"))
 
-        for adv in adv_lists:
-            adv["image"] = await UrlUtil.to_absolute_url(adv["image"])
+        await UrlUtil.to_absolute_urls(adv_lists, ["image"])
         
         # 返回综合数据（根据CommodityPagesVo的结构返回）
         return CommodityPagesVo(
@@ -314,26 +309,23 @@ class CommodityService:
         if not current:
             return []
         
-        # 查询同分类的其他商品
-        items = await CommodityModel.filter(
-            cid=current.cid,
-            id__not=goods_id,
-            is_show=1,
-            is_delete=0
-        ).annotate(Rand=Rand()).order_by('Rand').limit(20)
+        # 随机抽取同分类的其他商品
+        ids = await SamplerUtil.sample(SamplerUtil.category(current.cid), 20, exclude=[goods_id])
+        items = await CommodityModel.filter(id__in=ids, is_show=1, is_delete=0)
+        position = {id_: i for i, id_ in enumerate(ids)}
+        items.sort(key=lambda item: position[item.id])
         
         # 查询分类信息
         category_ids = list(set(item.cid for item in items))
-        categories = await CommodityCategoryModel.filter(id__in=category_ids).values('id', 'title')
-        category_map = {c['id']: c['title'] for c in categories}
+        category_map = (await CategoryUtil.index()).titles(category_ids)
         
         # 格式化商品数据
+        domain: str = await UrlUtil.resource_domain()
         formatted_items = []
         for item in items:
             item_dict = item.__dict__
             item_dict['category'] = category_map.get(item.cid, '')
-            item_dict['main_image'] = await UrlUtil.to_absolute_url(item.main_image)
-            item_dict['image'] = [await UrlUtil.to_absolute_url(url) for url in item.image]
+            UrlUtil.absolute_with(domain, item_dict, ['main_image', 'image'])
             item_dict['create_time'] = TimeUtil.timestamp_to_date(item.create_time)
             item_dict['update_time'] = TimeUtil.timestamp_to_date(item.update_time)
             formatted_items.append(item_dict)
@@ -377,17 +369,21 @@ class CommodityService:
         Returns:
             PagingResult[CommodityListsVo]: 与lists接口一致的分页返回结构
         """
+        if not PluginRegistry.enabled("milvus"):
+            raise AppException("以图搜图未开启")
+
         try:
             # 1. 读取图片
             content = await file.read()
             image = Image.open(io.BytesIO(content))
             
             # 2. 提取特征
-            extractor = EmbeddingExtractor()
+            extractor = await PluginRegistry.aget("embedding")
             vector = extractor.extract_feature(image)
             
             # 3. 搜索 Milvus，限制为25条
-            results = milvus_service.search_similar(vector, top_k=min(limit, 25))
+            milvus = await PluginRegistry.aget("milvus")
+            results = milvus.search_similar(vector, top_k=min(limit, 25))
             
             if not results:
                 # 返回空分页结构
@@ -412,11 +408,11 @@ class CommodityService:
             cid_ids = list(set(c.cid for c in commodities if c.cid))
             _category = {}
             if cid_ids:
-                categories = await CommodityCategoryModel.filter(id__in=cid_ids).all().values_list("id", "title")
-                _category = {k: v for k, v in categories}
+                _category = (await CategoryUtil.index()).titles(cid_ids)
             
             # 7. 保持搜索结果顺序并格式化为CommodityListsVo
             commodity_map = {c.id: c for c in commodities}
+            domain: str = await UrlUtil.resource_domain()
             formatted_items = []
             
             for hit in results:
@@ -427,8 +423,8 @@ class CommodityService:
                         "id": c.id,
                         "code": c.code if hasattr(c, 'code') else "",
                         "category": _category.get(c.cid, ""),
-                        "main_image": await UrlUtil.to_absolute_url(c.main_image),
-                        "image": [await UrlUtil.to_absolute_url(url) for url in c.image],
+                        "main_image": UrlUtil.absolute_with(domain, c.main_image),
+                        "image": UrlUtil.absolute_with(domain, c.image),
                         "title": c.title,
                         "intro": c.intro,
                         "price": c.price,
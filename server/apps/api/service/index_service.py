@@ -15,13 +15,14 @@ from exception import AppException
 from apps.api.schemas import index_schema as schema, links_schema
 from apps.api.service.article_service import ArticleService
 from common.models.dev import DevBannerModel, DevFeatureModel, DevLinksModel
-from common.models.commodity import Category, Commodity
+from common.models.commodity import Commodity
 from common.enums.public import BannerEnum, FeatureEnum
 from common.utils.config import ConfigUtil
 from common.utils.tools import ToolsUtil
 from common.utils.urls import UrlUtil
+from common.utils.category import CategoryUtil
+from common.utils.sampler import SamplerUtil
 from plugins.msg.driver import MsgDriver
-from tortoise.contrib.mysql.functions import Rand
 from typing import List
 
 
@@ -89,8 +90,9 @@ class IndexService:
             topping=await ArticleService.recommend("topping"),
             everyday=await ArticleService.recommend("everyday"),
             product_categories=[
-                schema.ProductCategoryVo(id=c.id, title=c.title)
-                for c in await Category.filter(is_show=1, is_delete=0, level=0).order_by("-sort", "id").limit(8)
+                schema.ProductCategoryVo(id=c["id"], title=c["title"])
+                for c in sorted((await CategoryUtil.index()).level(0, visible=True),
+                                key=lambda c: (-c["sort"], c["id"]))[:8]
             ]
         )
 
@@ -109,15 +111,15 @@ class IndexService:
             zero
         """
         # 查询一级分类下面的二级分类
-        _category = await Category.filter(parent_id=category_id).values_list('id', flat=True)
+        _category = [c["id"] for c in (await CategoryUtil.index()).children_of(category_id)]
         if _category is None:
             raise AppException("分类不存在")
             
-        products = await Commodity.annotate(Rand=Rand()).filter(
-            cid__in=_category,
-            is_show=1,
-            is_delete=0
-        ).order_by("Rand").limit(8).all()
+        # 从各二级分类的ID池中随机抽取
+        ids = await SamplerUtil.sample([SamplerUtil.category(c) for c in _category], 8)
+        products = await Commodity.filter(id__in=ids, is_show=1, is_delete=0).all()
+        position = {id_: i for i, id_ in enumerate(ids)}
+        products.sort(key=lambda p: position[p.id])
 
         return [
             schema.ProductVo(
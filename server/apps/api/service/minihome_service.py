@@ -15,15 +15,15 @@ from typing import List
 from pydantic import TypeAdapter
 from tortoise.expressions import Q
 from tortoise.functions import Count
-from tortoise.contrib.mysql.functions import Rand
 from hypertext import PagingResult
-from common.models.commodity import (
-    Commodity as CommodityModel,
-    Category as CommodityCategoryModel)
+from common.models.commodity import Commodity as CommodityModel
 from common.models.dev import DevBannerModel
 from common.enums.public import BannerEnum
 from common.utils.urls import UrlUtil
+from common.utils.category import CategoryUtil
 from common.utils.times import TimeUtil
+from common.utils.sampler import SamplerUtil
+from common.utils.search import SearchUtil
 from apps.api.schemas.minihome_schema import (
     MiniHomePagesVo, BannerListVo,
     GoodsListIn, GuessCategoryVo,
@@ -51,17 +51,9 @@ class MiniHomeService:
         Author:
             zero
         """
-        # 查询所有可见且未删除的分类
-        categories = await CommodityCategoryModel.filter(
-            is_show=1,
-            is_delete=0
-        ).all().values('id', 'title')
-        
-        # 随机排序分类
-        random.shuffle(categories)
-        
-        # 限制返回数量
-        categories = categories[:limit]
+        # 从分类索引中随机抽取可见分类
+        categories = (await CategoryUtil.index()).ordered(visible=True)
+        categories = random.sample(categories, min(limit, len(categories)))
         
         # 格式化分类数据
         formatted_categories = []
@@ -124,12 +116,13 @@ class MiniHomeService:
         )
 
     @classmethod
-    async def goods_list(cls, params: GoodsListIn) -> PagingResult[CommodityListsVo]:
+    async def goods_list(cls, params: GoodsListIn, seed: int = 0) -> PagingResult[CommodityListsVo]:
         """
         获取推荐商品列表
 
         Args:
             params (GoodsListIn): 请求参数
+            seed (int): 随机种子, 推荐模式下按该种子随机排列
 
         Returns:
             GoodsListVo: 商品列表数据
@@ -144,47 +137,42 @@ class MiniHomeService:
         if params.type == "recommend":
             # 推荐模式:随机推荐商品,不限于is_recommend=1的商品
             # 使用随机排序,让所有商品都有机会被推荐
-            order = ['Rand']
+            order = None
         elif params.type == "topping":
             where.append(Q(is_topping=1))
         elif params.type == "ranking":
             order = ['-sales', '-browse', '-collect', '-id']
 
-        # 使用标准分页查询
-        _model = CommodityModel.annotate(Rand=Rand()).filter(*where).order_by(*order)
-        _pager = await CommodityModel.paginate(
-            model=_model,
-            page_no=params.page,
-            page_size=params.size,
-            fields=[
-                "id", "cid", "title", "main_image", "image", "intro", 
-                "price", "fee", "stock", "sales", 
-                "browse", "collect", "is_recommend", 
-                "is_topping", "create_time", "update_time"
-            ]
-        )
+        fields = [
+            "id", "cid", "title", "main_image", "image", "intro", 
+            "price", "fee", "stock", "sales", 
+            "browse", "collect", "is_recommend", 
+            "is_topping", "create_time", "update_time"
+        ]
+        if order is None:
+            # 随机模式: 从ID池按种子取页, 翻页不重复
+            _pager = await SamplerUtil.paginate(SamplerUtil.ALL, seed, params.page, params.size, fields)
+        else:
+            # 使用标准分页查询
+            _model = CommodityModel.filter(*where).order_by(*order)
+            _pager = await CommodityModel.paginate(
+                model=_model,
+                page_no=params.page,
+                page_size=params.size,
+                fields=fields
+            )
 
         # 查询分类信息
         _category = {}
         cid_ids = [item["cid"] for item in _pager.lists if item["cid"]]
         if cid_ids:
-            category_ = await (
-                CommodityCategoryModel
-                .filter(id__in=list(set(cid_ids)))
-                .all()
-                .values_list("id", "title")
-            )
-            _category = {k: v for k, v in category_}
+            _category = (await CategoryUtil.index()).titles(set(cid_ids))
 
         # 格式化商品数据
+        await UrlUtil.to_absolute_urls(_pager.lists, ["main_image", "image"])
         formatted_items = []
         for item in _pager.lists:
             item["category"] = _category.get(item["cid"], "")
-            item["main_image"] = await UrlUtil.to_absolute_url(item["main_image"])
-            # 处理图片列表URL
-            if item["image"]:
-                # 循环处理每个图片URL
-                item["image"] = [await UrlUtil.to_absolute_url(url) for url in item["image"]]
 
             # 转换时间字段为字符串
             if item.get("create_time"):
@@ -214,55 +202,64 @@ class MiniHomeService:
         Author:
             zero
         """
-        # 构建搜索条件
+        # 构建搜索条件 (关键词走全文检索)
         where_map = {
             "=": ["cid@cid"],
-            "%like%": ["keyword@title"],
             ">=": ["min_price@price"],
             "<=": ["max_price@price"]
         }
         
         where = CommodityModel.build_search(where_map, params.__dict__)
         
-        # 排序规则, 0=默认, 1=销量
+        # 排序规则, 0=默认(有关键词时按相关度), 1=销量
         order_by = ['-sales', '-browse', '-id'] if params.sort == 1 else ['-sort', '-id']
-        
+        fields = [
+            "id", "cid", "title", "main_image", "image", "intro", 
+            "price", "fee", "stock", "sales", 
+            "browse", "collect", "is_recommend", 
+            "is_topping", "create_time", "update_time"
+        ]
         
         # 查询商品列表并分页
-        _model = CommodityModel.filter(*where).filter(Q(is_show=1, is_delete=0)).order_by(*order_by)
-        _pager = await CommodityModel.paginate(
-            model=_model,
-            page_no=params.page,
-            page_size=params.size,
-            fields=[
-                "id", "cid", "title", "main_image", "image", "intro", 
-                "price", "fee", "stock", "sales", 
-                "browse", "collect", "is_recommend", 
-                "is_topping", "create_time", "update_time"
-            ]
-        )
+        _model = CommodityModel.filter(*where).filter(Q(is_show=1, is_delete=0))
+        ids = None
+        if params.keyword:
+            ids = await SearchUtil.search(
+                "commodity", params.keyword,
+                cid=params.cid,
+                min_price=params.min_price,
+                max_price=params.max_price
+            )
+        if ids is not None and params.sort != 1:
+            # 关键词搜索默认按相关度排序
+            _pager = await CommodityModel.paginate_ids(
+                model=_model,
+                ids=ids,
+                page_no=params.page,
+                page_size=params.size,
+                fields=fields
+            )
+        else:
+            if ids is not None:
+                _model = _model.filter(id__in=ids)
+            _pager = await CommodityModel.paginate(
+                model=_model.order_by(*order_by),
+                page_no=params.page,
+                page_size=params.size,
+                fields=fields
+            )
         
         # 查询分类信息
         _category = {}
         cid_ids = [item["cid"] for item in _pager.lists if item["cid"]]
         if cid_ids:
-            category_ = await (
-                CommodityCategoryModel
-                .filter(id__in=list(set(cid_ids)))
-                .all()
-                .values_list("id", "title")
-            )
-            _category = {k: v for k, v in category_}
+            _category = (await CategoryUtil.index()).titles(set(cid_ids))
         
         # 格式化商品数据
+        await UrlUtil.to_absolute_urls(_pager.lists, ["main_image", "image"])
         formatted_items = []
         for item in _pager.lists:
             item["category"] = _category.get(item["cid"], "")
-            item["main_image"] = await UrlUtil.to_absolute_url(item["main_image"])
-            # 处理图片列表URL
-            if item["image"]:
-                # 循环处理每个图片URL
-                item["image"] = [await UrlUtil.to_absolute_url(url) for url in item["image"]]
             
             # 转换时间字段为字符串
             if item.get("create_time"):
@@ -289,42 +286,39 @@ class MiniHomeService:
         Author:
             zero
         """
-        # 查询分类信息
-        categories = await (
-            CommodityCategoryModel
-            .filter(is_show=1, is_delete=0)
-            .order_by("sort", "id")
-            .all()
-        )
+        # 分类索引按 (-sort, -id) 排序, 反转即为 (sort, id)
+        index = await CategoryUtil.index()
+        categories = index.ordered(visible=True)[::-1]
         
         # 先将所有分类转换为字典并建立ID映射
         category_dict = {}
         for item in categories:
             category = {
-                "catId": item.id,
-                "catName": item.title,
-                "backImg": await UrlUtil.to_absolute_url(item.image),
-                "showPic": item.level == 0,
-                "catLevel": 1 if item.level == 0 else 3,
+                "catId": item["id"],
+                "catName": item["title"],
+                "backImg": item["image"],
+                "showPic": item["level"] == 0,
+                "catLevel": 1 if item["level"] == 0 else 3,
                 "showVideo": False,
                 "children": []
             }
-            if item.level == 0:
+            if item["level"] == 0:
                 category["children"].append({
                     "catId": random.randint(999, 9999),
                     "catName": "全部",
                     "catLevel": 1,
                     "children": []
                 })
-            category_dict[item.id] = category
+            category_dict[item["id"]] = category
+        await UrlUtil.to_absolute_urls(list(category_dict.values()), ["backImg"])
         
         # 构建树形结构
         result = []
         for item in categories:
-            current = category_dict[item.id]
-            if item.parent_id and item.parent_id in category_dict:
+            current = category_dict[item["id"]]
+            if item["parent_id"] and item["parent_id"] in category_dict:
                 # 有父分类且父分类存在，添加到父分类的children中
-                category_dict[item.parent_id]["children"][0]["children"].append(current)
+                category_dict[item["parent_id"]]["children"][0]["children"].append(current)
             else:
                 # 没有父分类或父分类不存在，作为顶级分类
                 result.append(current)
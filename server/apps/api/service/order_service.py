@@ -413,6 +413,7 @@ class OrderService:
         work_order_map = {wo.sub_order_id: wo for wo in work_orders}
 
         # 构建订单列表
+        domain: str = await UrlUtil.resource_domain()
         order_list = []
         for main_order in main_orders:
             order_sub_orders = sub_orders_by_main.get(main_order.id, [])
@@ -431,7 +432,7 @@ class OrderService:
                     goods_list.append(schema.OrderGoodsItem(
                         commodity_id=sub_order.source_id,
                         title=sub_order.product_name,
-                        image=await UrlUtil.to_absolute_url(commodity.main_image),
+                        image=UrlUtil.absolute_with(domain, commodity.main_image),
                         price=float(sub_order.unit_price),
                         fee=commodity.fee if hasattr(commodity, 'fee') else None,
                         quantity=sub_order.quantity,
@@ -0,0 +1,26 @@
+# +----------------------------------------------------------------------
+# | WaitAdmin(fastapi)快速开发后台管理系统
+# +----------------------------------------------------------------------
+# | 欢迎阅读学习程序代码,建议反馈是我们前进的动力
+# | 程序完全开源可支持商用,允许去除界面版权信息
+# | gitee:   https://gitee.com/wafts/waitadmin-python
+# | github:  https://github.com/topwait/waitadmin-python
+# | 官方网站: https://www.waitadmin.cn
+# | WaitAdmin团队版权所有并拥有最终解释权
+# +----------------------------------------------------------------------
+# | Author: WaitAdmin Team <2474369941@qq.com>
+# +----------------------------------------------------------------------
+
+
+class CacheTagEnum:
+    """ 响应缓存标签 """
+    COMMODITY = "commodity"  # 商品
+    CATEGORY = "category"    # 商品分类
+    BANNER = "banner"        # 轮播广告
+    FEATURE = "feature"      # 特性/常见问题
+    LINKS = "links"          # 友情链接
+    ARTICLE = "article"      # 文章及分类
+    RECHARGE = "recharge"    # 充值套餐
+    PAYMENT = "payment"      # 支付方式
+    NOTICE = "notice"        # 通知设置
+    CONFIG = "config"        # 系统配置
@@ -0,0 +1,40 @@
+# +----------------------------------------------------------------------
+# | WaitAdmin(fastapi)快速开发后台管理系统
+# +----------------------------------------------------------------------
+# | 欢迎阅读学习程序代码,建议反馈是我们前进的动力
+# | 程序完全开源可支持商用,允许去除界面版权信息
+# | gitee:   https://gitee.com/wafts/waitadmin-python
+# | github:  https://github.com/topwait/waitadmin-python
+# | 官方网站: https://www.waitadmin.cn
+# | WaitAdmin团队版权所有并拥有最终解释权
+# +----------------------------------------------------------------------
+# | Author: WaitAdmin Team <2474369941@qq.com>
+# +----------------------------------------------------------------------
+"""
+数据库迁移 (见 kernels.migrate)
+
+迁移文件命名为 v{版本}_{名称}.py, 按版本号顺序执行, 每个文件定义 operations 列表。
+hot_queries 为 `python -m kernels.migrate explain` 检查执行计划的热点查询。
+"""
+from typing import Dict
+from tortoise.queryset import QuerySet
+
+
+def hot_queries() -> Dict[str, QuerySet]:
+    """ 热点查询 (与服务中的查询条件一致, 参数为示例值) """
+    from common.models.commodity import Commodity, WarehouseCard, ShoppingCart
+    from common.models.market import MainOrderModel, SubOrderModel, WorkOrderModel
+    from common.models.notice import NoticeRecord
+    from common.models.users import UserVisitorModel
+
+    return {
+        "商品列表": Commodity.filter(is_show=1, is_delete=0, cid=1).order_by("-sort", "-id").limit(15),
+        "我的订单": MainOrderModel.filter(user_id=1, is_delete=0).order_by("-id").limit(15),
+        "订单编号": MainOrderModel.filter(order_sn="202401010000000001").limit(1),
+        "子订单": SubOrderModel.filter(main_order_id=1),
+        "售后工单": WorkOrderModel.filter(sub_order_id=1).limit(1),
+        "购物车": ShoppingCart.filter(user_id=1, is_delete=0),
+        "验证码": NoticeRecord.filter(code="123456", scene=102).order_by("-id").limit(1),
+        "当日访问": UserVisitorModel.filter(create_time__gte=1704038400, create_time__lte=1704124799, ua="chrome"),
+        "可用卡密": WarehouseCard.filter(commodity_id=1, is_used=0, is_delete=0).limit(1),
+    }
@@ -0,0 +1,18 @@
+""" 热点查询的二级索引 """
+from kernels.migrate import AddIndex
+from common.models.commodity import Commodity, WarehouseCard, ShoppingCart
+from common.models.market import MainOrderModel, SubOrderModel, WorkOrderModel
+from common.models.notice import NoticeRecord
+from common.models.users import UserVisitorModel
+
+operations = [
+    AddIndex(Commodity, ("is_show", "is_delete", "cid", "sort")),
+    AddIndex(MainOrderModel, ("user_id", "is_delete", "id")),
+    AddIndex(MainOrderModel, ("order_sn",)),
+    AddIndex(SubOrderModel, ("main_order_id",)),
+    AddIndex(WorkOrderModel, ("sub_order_id",)),
+    AddIndex(ShoppingCart, ("user_id", "is_delete")),
+    AddIndex(NoticeRecord, ("code", "scene")),
+    AddIndex(UserVisitorModel, ("create_time", "ua")),
+    AddIndex(WarehouseCard, ("commodity_id", "is_used")),
+]
@@ -0,0 +1,35 @@
+""" 每日统计: 汇总查询的索引, 登记汇总任务 """
+import json
+import time
+from kernels.migrate import AddIndex, RunPython
+from common.models.article import ArticleModel
+from common.models.market import MainOrderModel
+from common.models.sys import SysCrontabModel
+from common.models.users import UserModel
+
+
+async def register_stats_crontab(_client):
+    """ 登记每10分钟执行的访问统计汇总任务 (已登记时跳过) """
+    if await SysCrontabModel.filter(command="crontab.stats", is_delete=0).exists():
+        return False
+    now = int(time.time())
+    await SysCrontabModel.create(
+        name="访问统计汇总",
+        command="crontab.stats",
+        params="",
+        trigger="interval",
+        rules=json.dumps([{"key": "minutes", "value": "10"}]),
+        concurrent=1,
+        remarks="汇总每日统计行(控制台数据), 并补齐历史日期",
+        status=1,
+        create_time=now,
+        update_time=now
+    )
+
+
+operations = [
+    AddIndex(UserModel, ("create_time",)),
+    AddIndex(ArticleModel, ("create_time",)),
+    AddIndex(MainOrderModel, ("pay_status", "pay_time")),
+    RunPython(register_stats_crontab),
+]
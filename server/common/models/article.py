@@ -35,6 +35,7 @@ class ArticleModel(DbModel):
     class Meta:
         table_description = "文章内容表"
         table = DbModel.table_prefix("article")
+        indexes = (("create_time",),)
 
 
 class ArticleCategoryModel(DbModel):
@@ -55,6 +55,7 @@ class Commodity(DbModel):
     class Meta:
         table_description = "商品表"
         table = DbModel.table_prefix("commodity")
+        indexes = (("is_show", "is_delete", "cid", "sort"),)
 
 
 class WarehouseCard(DbModel):
@@ -79,6 +80,7 @@ class WarehouseCard(DbModel):
     class Meta:
         table = DbModel.table_prefix("warehouse_card")
         table_description = "虚拟卡密表（支持唯一码、共享库存、无限库存）"
+        indexes = (("commodity_id", "is_used"),)
 
 
 class ShoppingCart(DbModel):
@@ -96,5 +98,6 @@ class ShoppingCart(DbModel):
     class Meta:
         table = DbModel.table_prefix("shopping_cart")
         table_description = "购物车表"
+        indexes = (("user_id", "is_delete"),)
     
         
\ No newline at end of file
@@ -63,6 +63,7 @@ class MainOrderModel(DbModel):
     class Meta:
         table_description = "主订单表（记录整笔订单的汇总信息）"
         table = DbModel.table_prefix("main_order")
+        indexes = (("user_id", "is_delete", "id"), ("order_sn",), ("pay_status", "pay_time"))
 
 class SubOrderModel(DbModel):
     """子订单表（记录每个商品的订单信息）"""
@@ -96,6 +97,7 @@ class SubOrderModel(DbModel):
     class Meta:
         table_description = "子订单表（记录每个商品的订单信息）"
         table = DbModel.table_prefix("sub_order")
+        indexes = (("main_order_id",),)
 
 
 class RechargePackageModel(DbModel):
@@ -146,3 +148,4 @@ class WorkOrderModel(DbModel):
     class Meta:
         table_description = "售后工单表"
         table = DbModel.table_prefix("work_order")
+        indexes = (("sub_order_id",),)
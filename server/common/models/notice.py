@@ -58,3 +58,4 @@ class NoticeRecord(DbModel):
     class Meta:
         table_description = "通知记录表"
         table = DbModel.table_prefix("notice_record")
+        indexes = (("code", "scene"),)
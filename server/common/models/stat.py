@@ -0,0 +1,37 @@
+# +----------------------------------------------------------------------
+# | WaitAdmin(fastapi)快速开发后台管理系统
+# +----------------------------------------------------------------------
+# | 欢迎阅读学习程序代码,建议反馈是我们前进的动力
+# | 程序完全开源可支持商用,允许去除界面版权信息
+# | gitee:   https://gitee.com/wafts/waitadmin-python
+# | github:  https://github.com/topwait/waitadmin-python
+# | 官方网站: https://www.waitadmin.cn
+# | WaitAdmin团队版权所有并拥有最终解释权
+# +----------------------------------------------------------------------
+# | Author: WaitAdmin Team <2474369941@qq.com>
+# +----------------------------------------------------------------------
+from tortoise import fields
+from kernels.model import DbModel
+
+
+class StatDailyModel(DbModel):
+    id = fields.IntField(pk=True, unsigned=True, description="主键")
+    date = fields.CharField(null=False, max_length=10, unique=True, description="统计日期: [Y-m-d]")
+    pv = fields.IntField(null=False, default=0, description="访问量")
+    uv = fields.IntField(null=False, default=0, description="访客数")
+    ua_chrome = fields.IntField(null=False, default=0, description="Chrome访问量")
+    ua_firefox = fields.IntField(null=False, default=0, description="Firefox访问量")
+    ua_ie = fields.IntField(null=False, default=0, description="IE访问量")
+    ua_safari = fields.IntField(null=False, default=0, description="Safari访问量")
+    ua_wechat = fields.IntField(null=False, default=0, description="微信访问量")
+    ua_other = fields.IntField(null=False, default=0, description="其它访问量")
+    new_users = fields.IntField(null=False, default=0, description="新增用户")
+    new_articles = fields.IntField(null=False, default=0, description="新增文章")
+    orders = fields.IntField(null=False, default=0, description="支付订单数")
+    gmv = fields.DecimalField(null=False, max_digits=12, decimal_places=2, default=0, description="成交额")
+    create_time = fields.IntField(null=False, default=0, description="创建时间")
+    update_time = fields.IntField(null=False, default=0, description="更新时间")
+
+    class Meta:
+        table_description = "每日统计表"
+        table = DbModel.table_prefix("stat_daily")
@@ -41,6 +41,7 @@ class UserModel(DbModel):
     class Meta:
         table_description = "用户管理表"
         table = DbModel.table_prefix("user")
+        indexes = (("create_time",),)
 
 
 class UserAuthModel(DbModel):
@@ -152,3 +153,4 @@ class UserVisitorModel(DbModel):
     class Meta:
         table_description = "用户浏览表"
         table = DbModel.table_prefix("user_visitor")
+        indexes = (("create_time", "ua"),)
@@ -11,22 +11,78 @@
 # | Author: WaitAdmin Team <2474369941@qq.com>
 # +----------------------------------------------------------------------
 import json
-from typing import Union, List, Dict, Tuple, Set, Optional, Mapping
+import time
+import uuid
+import random
+import asyncio
+import inspect
+import logging
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from functools import wraps
+from typing import Union, List, Dict, Tuple, Set, Optional, Mapping, Callable, Awaitable, TypeVar, Any, Iterable, \
+    AsyncIterator
+from pydantic import TypeAdapter
 from redis import Redis
-from kernels.cache import redis_be
+from redis.commands.core import AsyncScript
+from fastapi_cache.backends.redis import RedisBackend
+from kernels.cache import redis_be, redis_raw
 from redis.exceptions import DataError
+from common.utils.codec import CodecUtil, MsgpackCodec
 from config import get_settings
 
-__all__ = ["RedisUtil"]
+logger = logging.getLogger(__name__)
+
+__all__ = [
+    "RedisUtil", "RedisPipe", "ResponseCache", "SingleFlight",
+    "TieredCache", "JsonSerializer", "ModelSerializer", "cached"
+]
 
 
 FieldT = Union[int, float, str]
+T = TypeVar("T")
+
+
+class RedisPipe:
+    """
+    自动为键名加前缀的管道
+
+    命令与 redis-py 的 Pipeline 一致, 首个参数(多键命令为全部键)会加上前缀;
+    调用 execute() 一次性发送, 按顺序返回各命令的结果。
+    """
+
+    MULTI_KEY_COMMANDS = {"delete", "unlink", "exists", "touch", "mget", "watch"}
+    RAW_COMMANDS = {"execute", "multi", "reset", "unwatch", "discard", "immediate_execute_command"}
+
+    def __init__(self, pipe):
+        self.raw = pipe
+
+    def __len__(self) -> int:
+        return len(self.raw)
+
+    def __getattr__(self, name: str):
+        attr = getattr(self.raw, name)
+        if name in self.RAW_COMMANDS or name.startswith("_") or not callable(attr):
+            return attr
+
+        def command(*args, **kwargs):
+            if name in self.MULTI_KEY_COMMANDS:
+                if len(args) == 1 and isinstance(args[0], (list, tuple)):
+                    args = ([RedisUtil.get_key(k) for k in args[0]],)
+                else:
+                    args = tuple(RedisUtil.get_key(k) for k in args)
+            elif args:
+                args = (RedisUtil.get_key(args[0]), *args[1:])
+            return attr(*args, **kwargs)
+
+        return command
 
 
 class RedisUtil:
     """ 缓存工具 """
 
     redis: Redis = redis_be.redis
+    raw: Redis = redis_raw
     prefix: str = get_settings().REDIS.get("prefix", "wait:")
 
     @classmethod
@@ -183,6 +239,274 @@ class RedisUtil:
         """
         return await cls.redis.delete(*(cls.get_key(key) for key in keys))
 
+    @classmethod
+    async def unlink(cls, *keys: str) -> int:
+        """
+        从Redis数据库中异步删除一个或多个键(内存在后台回收, 不阻塞Redis)。
+
+        Args:
+            *keys (str): 一个或多个要删除的键名。
+
+        Returns:
+            int: 成功删除的键的数量。
+        """
+        if not keys:
+            return 0
+        return await cls.redis.unlink(*(cls.get_key(key) for key in keys))
+
+    @classmethod
+    async def scan_iter(cls, pattern: str, count: int = 500) -> AsyncIterator[str]:
+        """
+        迭代所有符合给定模式的键。
+
+        Args:
+            pattern (str): 用于匹配键的模式字符串(不含前缀)。
+            count (int): 每次SCAN的建议数量。
+
+        Returns:
+            AsyncIterator[str]: 匹配到的完整键名(含前缀)。
+        """
+        async for key in cls.redis.scan_iter(match=cls.get_key(pattern), count=count):
+            yield key
+
+    @classmethod
+    async def unlink_pattern(cls, pattern: str, batch: int = 500) -> int:
+        """
+        删除所有符合给定模式的键, 按批次UNLINK, 每批一次往返。
+
+        Args:
+            pattern (str): 用于匹配键的模式字符串(不含前缀)。
+            batch (int): 每批删除的键数量。
+
+        Returns:
+            int: 删除的键的数量。
+        """
+        total: int = 0
+        keys: List[str] = []
+        async for key in cls.scan_iter(pattern, batch):
+            keys.append(key)
+            if len(keys) >= batch:
+                total += await cls.redis.unlink(*keys)
+                keys = []
+        if keys:
+            total += await cls.redis.unlink(*keys)
+        return total
+
+    @classmethod
+    @asynccontextmanager
+    async def pipeline(cls, transaction: bool = False, binary: bool = False) -> AsyncIterator[RedisPipe]:
+        """
+        管道上下文, 多条命令一次往返。
+
+        Args:
+            transaction (bool): 是否以 MULTI/EXEC 事务执行。
+            binary (bool): 是否返回未解码的bytes (读取编码值时使用)。
+
+        Returns:
+            RedisPipe: 自动加前缀的管道。
+
+        Example:
+            async with RedisUtil.pipeline() as pipe:
+                pipe.get("login:scan_xxx")
+                pipe.ttl("login:scan_xxx")
+                value, ttl = await pipe.execute()
+        """
+        client = cls.raw if binary else cls.redis
+        async with client.pipeline(transaction=transaction) as pipe:
+            yield RedisPipe(pipe)
+
+    @classmethod
+    async def mget(cls, keys: List[str]) -> List[Optional[str]]:
+        """
+        一次获取多个键的值。
+
+        Args:
+            keys (List[str]): 键名列表。
+
+        Returns:
+            List[Optional[str]]: 与键名顺序一致的值列表, 不存在的键为None。
+        """
+        if not keys:
+            return []
+        return await cls.redis.mget([cls.get_key(k) for k in keys])
+
+    @classmethod
+    async def mset(cls, mapping: Mapping[str, any], time: int = None) -> bool:
+        """
+        一次设置多个键值对。
+
+        Args:
+            mapping (Mapping[str, any]): 键值对。
+            time (int): 过期时间(秒), 默认为None, 表示不过期。
+
+        Returns:
+            bool: 如果设置成功则返回True。
+        """
+        if not mapping:
+            return True
+        if time is None:
+            return await cls.redis.mset({cls.get_key(k): v for k, v in mapping.items()})
+
+        async with cls.redis.pipeline(transaction=True) as pipe:
+            for k, v in mapping.items():
+                pipe.set(cls.get_key(k), v, ex=time)
+            return all(await pipe.execute())
+
+    _scripts: Dict[str, AsyncScript] = {}
+    _raw_scripts: Dict[str, AsyncScript] = {}
+
+    @classmethod
+    def register_script(cls, name: str, lua: str) -> AsyncScript:
+        """
+        注册Lua脚本, 执行时优先使用EVALSHA, 服务端缓存缺失时自动回退EVAL。
+
+        Args:
+            name (str): 脚本名称。
+            lua (str): 脚本内容。
+
+        Returns:
+            AsyncScript: 脚本对象。
+        """
+        script = cls._scripts.get(name)
+        if script is None or script.script != lua or script.registered_client is not cls.redis:
+            script = cls.redis.register_script(lua)
+            cls._scripts[name] = script
+        return script
+
+    @classmethod
+    async def eval_script(cls,
+                          name: str,
+                          keys: List[str] = None,
+                          args: List[any] = None,
+                          binary: bool = False) -> any:
+        """
+        执行已注册的Lua脚本。
+
+        Args:
+            name (str): 脚本名称。
+            keys (List[str]): 脚本使用的键名(自动加前缀)。
+            args (List[any]): 脚本参数。
+            binary (bool): 是否返回未解码的bytes (读取编码值时使用)。
+
+        Returns:
+            any: 脚本返回值。
+
+        Raises:
+            KeyError: 如果脚本未注册。
+        """
+        script = cls._scripts[name]
+        if script.registered_client is not cls.redis:
+            script = cls.register_script(name, script.script)
+        if binary:
+            raw = cls._raw_scripts.get(name)
+            if raw is None or raw.script != script.script or raw.registered_client is not cls.raw:
+                raw = cls.raw.register_script(script.script)
+                cls._raw_scripts[name] = raw
+            script = raw
+        return await script(keys=[cls.get_key(k) for k in keys or []], args=args or [])
+
+    # =============== 【编码读写】  ===============
+
+    codecs: Dict[str, Any] = {}
+
+    @classmethod
+    def register_codec(cls, family: str, codec: Any):
+        """
+        为一类键指定编码器 (按最长前缀匹配, 未指定的键使用MsgpackCodec)
+
+        Args:
+            family (str): 键名前缀, 如 "login:api_user_"。
+            codec (Any): 编码器, 见 common.utils.codec。
+        """
+        cls.codecs[family] = codec
+
+    @classmethod
+    def codec_for(cls, key: str) -> Any:
+        """ 获取键对应的编码器 """
+        family = max((f for f in cls.codecs if key.startswith(f)), key=len, default=None)
+        return cls.codecs[family] if family is not None else MsgpackCodec
+
+    @classmethod
+    def encode(cls, key: str, value: any) -> bytes:
+        """ 按键名编码值 """
+        return CodecUtil.encode(value, cls.codec_for(key))
+
+    @classmethod
+    async def get_obj(cls, key: str) -> any:
+        """
+        获取编码存储的值 (兼容旧版JSON文本)。
+
+        Args:
+            key (str): 要获取的键名。
+
+        Returns:
+            any: 解码后的值, 键不存在时返回None。
+        """
+        return CodecUtil.decode(await cls.raw.get(cls.get_key(key)))
+
+    @classmethod
+    async def set_obj(cls, key: str, value: any, time: int = None) -> bool:
+        """
+        编码后写入值。
+
+        Args:
+            key (str): 要设置的键名。
+            value (any): 要设置的值, 须能被编码器序列化。
+            time (int): 过期时间(秒), 默认为None, 表示不过期。
+
+        Returns:
+            bool: 如果设置成功则返回True。
+        """
+        return await cls.raw.set(cls.get_key(key), cls.encode(key, value), ex=time)
+
+    @classmethod
+    async def mget_obj(cls, keys: List[str]) -> List[any]:
+        """
+        一次获取多个编码存储的值。
+
+        Args:
+            keys (List[str]): 键名列表。
+
+        Returns:
+            List[any]: 与键名顺序一致的值列表, 不存在的键为None。
+        """
+        if not keys:
+            return []
+        return [CodecUtil.decode(v) for v in await cls.raw.mget([cls.get_key(k) for k in keys])]
+
+    @classmethod
+    async def hget_obj(cls, key: str, field: str) -> any:
+        """
+        获取哈希表中编码存储的字段值 (兼容旧版JSON文本)。
+
+        Args:
+            key (str): 哈希表的键名。
+            field (str): 字段名。
+
+        Returns:
+            any: 解码后的值, 字段不存在时返回None。
+        """
+        return CodecUtil.decode(await cls.raw.hget(cls.get_key(key), field))
+
+    @classmethod
+    async def hset_obj(cls, key: str, field: str, value: any, time: int = None) -> int:
+        """
+        编码后写入哈希表字段。
+
+        Args:
+            key (str): 哈希表的键名。
+            field (str): 字段名。
+            value (any): 要设置的值, 须能被编码器序列化。
+            time (int): 哈希表的过期时间(秒), 默认为None, 表示不修改。
+
+        Returns:
+            int: 新增的字段数量。
+        """
+        result = await cls.raw.hset(cls.get_key(key), field, cls.encode(key, value))
+        if time is not None:
+            await cls.raw.expire(cls.get_key(key), time)
+        return result
+
     # =============== 【基础指令】  ===============
 
     @classmethod
@@ -1039,3 +1363,487 @@ class RedisUtil:
         args.extend(["COUNT", count])
 
         return await cls.redis.execute_command("BZM_POP".replace("_", ""), *args)
+
+
+class ResponseCache:
+    """
+    响应缓存
+
+    缓存结构:
+        cache:tag:{tag}              = Int      标签版本号, 写操作时自增
+        cache:resp:{sha1}            = String   响应体, 键中包含所属标签的当前版本号
+
+    标签版本自增后旧版本的响应不会再被命中, 由过期时间自然回收。
+    在构建响应期间发生的失效同样安全: 构建结果写入的是旧版本的键。
+    """
+
+    backend: RedisBackend = redis_be
+
+    @classmethod
+    async def versions(cls, tags: Tuple[str, ...]) -> str:
+        """
+        获取标签的当前版本号
+
+        Args:
+            tags (Tuple[str, ...]): 缓存标签。
+
+        Returns:
+            str: 以"."拼接的版本号, 未写过的标签为0。
+
+        Author:
+            zero
+        """
+        if not tags:
+            return ""
+        values = await cls.backend.redis.mget([RedisUtil.get_key(f"cache:tag:{t}") for t in tags])
+        return ".".join(str(v or 0) for v in values)
+
+    @classmethod
+    async def get(cls, key: str) -> Optional[str]:
+        """
+        读取缓存的响应体
+
+        Args:
+            key (str): 缓存键(不含前缀)。
+
+        Returns:
+            Optional[str]: 响应体, 未命中返回None。
+
+        Author:
+            zero
+        """
+        return await cls.backend.get(RedisUtil.get_key(f"cache:resp:{key}"))
+
+    @classmethod
+    async def set(cls, key: str, body: str, expire: int):
+        """
+        写入响应体
+
+        Args:
+            key (str): 缓存键(不含前缀)。
+            body (str): 响应体。
+            expire (int): 过期时间(秒)。
+
+        Author:
+            zero
+        """
+        await cls.backend.set(RedisUtil.get_key(f"cache:resp:{key}"), body, expire)
+
+    @classmethod
+    async def purge(cls, *tags: str):
+        """
+        按标签失效响应缓存 (以及 TieredCache 中带相同标签的数据)
+
+        Args:
+            tags (str): 缓存标签。
+
+        Author:
+            zero
+        """
+        if not tags:
+            return
+        async with cls.backend.redis.pipeline(transaction=False) as pipe:
+            for tag in tags:
+                pipe.incr(RedisUtil.get_key(f"cache:tag:{tag}"))
+            await pipe.execute()
+        await TieredCache.forget_tags(*tags)
+
+
+class SingleFlight:
+    """
+    并发合并 (single-flight)
+
+    同一个键的并发调用只执行一次加载, 其余调用等待并共享结果(或异常)。
+    加载在独立任务中运行, 发起者被取消不会影响其他等待者。
+
+    distributed=True 时额外使用Redis锁在多个进程间合并:
+    拿到锁的进程执行加载, 其余进程等待锁释放后再执行 fn,
+    因此 fn 应当是"先读缓存, 未命中再加载并回写"的幂等函数。
+    """
+
+    lock_prefix: str = "lock:flight:"
+    poll_interval: float = 0.05
+
+    _calls: Dict[str, asyncio.Future] = {}
+
+    @classmethod
+    async def do(cls,
+                 key: str,
+                 fn: Callable[[], Awaitable[T]],
+                 distributed: bool = False,
+                 ttl: float = 10) -> T:
+        """
+        合并执行
+
+        Args:
+            key (str): 合并键。
+            fn (Callable[[], Awaitable[T]]): 加载函数。
+            distributed (bool): 是否跨进程合并。
+            ttl (float): 跨进程锁的最长持有时间(秒), 也是等待的上限。
+
+        Returns:
+            T: 加载结果, 所有并发调用者共享同一个对象, 不要修改。
+
+        Author:
+            zero
+        """
+        task = cls._calls.get(key)
+        if task is None:
+            task = asyncio.ensure_future(cls._locked(key, fn, ttl) if distributed else fn())
+            cls._calls[key] = task
+            task.add_done_callback(lambda t: cls._done(key, t))
+        return await asyncio.shield(task)
+
+    @classmethod
+    def _done(cls, key: str, task: asyncio.Future):
+        """ 加载结束: 移除记录, 并标记异常已读取(避免无人等待时告警) """
+        if cls._calls.get(key) is task:
+            del cls._calls[key]
+        if not task.cancelled():
+            task.exception()
+
+    @classmethod
+    async def _locked(cls, key: str, fn: Callable[[], Awaitable[T]], ttl: float) -> T:
+        """ 持有Redis锁执行加载 """
+        redis = RedisUtil.redis
+        lock_key: str = RedisUtil.get_key(cls.lock_prefix + key)
+        token: str = uuid.uuid4().hex
+
+        if not await redis.set(lock_key, token, nx=True, px=int(ttl * 1000)):
+            # 其他进程正在加载: 等待锁释放(或超时)后再执行 fn, 此时通常已能命中缓存
+            deadline = asyncio.get_running_loop().time() + ttl
+            while await redis.exists(lock_key) and asyncio.get_running_loop().time() < deadline:
+                await asyncio.sleep(cls.poll_interval)
+            return await fn()
+
+        try:
+            return await fn()
+        finally:
+            await RedisUtil.eval_script("flight:release", [cls.lock_prefix + key], [token])
+
+
+# 仅当锁仍由自己持有时才释放
+RedisUtil.register_script("flight:release", """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('del', KEYS[1])
+end
+return 0
+""")
+
+
+class JsonSerializer:
+    """ JSON序列化 (默认) """
+
+    @staticmethod
+    def dumps(value: Any) -> str:
+        return json.dumps(value, ensure_ascii=False, separators=(",", ":"), default=str)
+
+    @staticmethod
+    def loads(payload: str) -> Any:
+        return json.loads(payload)
+
+
+class ModelSerializer:
+    """ 按类型序列化 (Pydantic模型、List[Vo]等任意TypeAdapter支持的类型) """
+
+    def __init__(self, type_: Any):
+        self.adapter = TypeAdapter(type_)
+
+    def dumps(self, value: Any) -> str:
+        return self.adapter.dump_json(value).decode("utf-8")
+
+    def loads(self, payload: str) -> Any:
+        return self.adapter.validate_json(payload)
+
+
+class TieredCache:
+    """
+    二级缓存
+
+    L1: 进程内LRU, 按条目TTL与总字节数淘汰, 保存序列化后的数据(每次命中都反序列化出新对象)。
+    L2: Redis, 值为 "标签版本|标记+数据", 读取时与标签当前版本比对, 不一致视为未命中。
+
+    标签版本与 ResponseCache 共用(cache:tag:{tag}), 按标签失效时响应缓存一并失效;
+    失效消息通过 cache:channel 广播给其他进程丢弃L1。未订阅时L1最长只保留 fallback_ttl 秒。
+    """
+
+    DATA_PREFIX: str = "cache:data:"
+    CHANNEL_KEY: str = "cache:channel"
+    NONE_FLAG: str = "0"
+    VALUE_FLAG: str = "1"
+
+    l1_max_bytes: int = 16 * 1024 * 1024
+    fallback_ttl: int = 5
+
+    stats: Dict[str, int] = {"l1_hit": 0, "l2_hit": 0, "miss": 0, "negative_hit": 0, "evict": 0}
+
+    # {key: (过期时间, 数据, 标签)}, 数据为 None 表示负缓存
+    _l1: "OrderedDict[str, Tuple[float, Optional[str], Tuple[str, ...]]]" = OrderedDict()
+    _l1_bytes: int = 0
+    _listener: Optional[asyncio.Task] = None
+    _subscribed: bool = False
+
+    @classmethod
+    async def fetch(cls,
+                    key: str,
+                    loader: Callable[[], Awaitable[Any]],
+                    ttl: int = 300,
+                    tags: Iterable[str] = (),
+                    l1_ttl: int = 60,
+                    negative_ttl: int = 30,
+                    jitter: float = 0.1,
+                    serializer: Any = JsonSerializer) -> Any:
+        """
+        读取缓存, 未命中时调用 loader 加载并回写两级缓存
+
+        Args:
+            key (str): 缓存键(不含前缀)。
+            loader (Callable[[], Awaitable[Any]]): 加载函数。
+            ttl (int): L2过期时间(秒)。
+            tags (Iterable[str]): 缓存标签。
+            l1_ttl (int): L1过期时间(秒), 为0时不使用L1。
+            negative_ttl (int): 加载结果为None时的缓存时间(秒), 为0时不缓存None。
+            jitter (float): 过期时间随机浮动比例, 避免同时过期。
+            serializer (Any): 序列化器, 需提供 dumps/loads。
+
+        Returns:
+            Any: 缓存的值。
+
+        Author:
+            zero
+        """
+        tags = tuple(tags)
+        hit, payload = cls._l1_get(key)
+        if hit:
+            cls.stats["l1_hit" if payload is not None else "negative_hit"] += 1
+            return None if payload is None else serializer.loads(payload)
+
+        async def load() -> Optional[str]:
+            found, data = await cls._l2_get(key, tags)
+            if found:
+                cls.stats["l2_hit" if data is not None else "negative_hit"] += 1
+                cls._l1_set(key, data, tags, l1_ttl)
+                return data
+
+            cls.stats["miss"] += 1
+            versions = await ResponseCache.versions(tags)
+            value = await loader()
+            if value is None and not negative_ttl:
+                return None
+
+            data = None if value is None else serializer.dumps(value)
+            expire = cls._jitter(ttl if data is not None else negative_ttl, jitter)
+            flag = cls.NONE_FLAG if data is None else cls.VALUE_FLAG
+            await RedisUtil.redis.set(RedisUtil.get_key(cls.DATA_PREFIX + key),
+                                      f"{versions}|{flag}{data or ''}", ex=expire)
+            cls._l1_set(key, data, tags, min(l1_ttl, expire))
+            return data
+
+        # 并发未命中合并为一次加载, 每个调用者各自反序列化出独立的对象
+        payload = await SingleFlight.do(cls.DATA_PREFIX + key, load)
+        return None if payload is None else serializer.loads(payload)
+
+    @classmethod
+    async def invalidate(cls, *keys: str):
+        """
+        按键失效
+
+        Args:
+            keys (str): 缓存键(不含前缀)。
+
+        Author:
+            zero
+        """
+        if not keys:
+            return
+        await RedisUtil.redis.delete(*[RedisUtil.get_key(cls.DATA_PREFIX + k) for k in keys])
+        for k in keys:
+            cls._l1_pop(k)
+        await cls._publish(*[f"k:{k}" for k in keys])
+
+    @classmethod
+    async def invalidate_tags(cls, *tags: str):
+        """
+        按标签失效 (同 ResponseCache.purge, 响应缓存一并失效)
+
+        Args:
+            tags (str): 缓存标签。
+
+        Author:
+            zero
+        """
+        await ResponseCache.purge(*tags)
+
+    @classmethod
+    async def forget_tags(cls, *tags: str):
+        """ 标签版本已推进后, 丢弃本进程及其他进程L1中带这些标签的数据 """
+        cls._l1_drop_tags(set(tags))
+        await cls._publish(*[f"t:{t}" for t in tags])
+
+    @classmethod
+    async def subscribe(cls):
+        """ 启动失效广播订阅 """
+        if cls._listener is None or cls._listener.done():
+            cls._listener = asyncio.create_task(cls._listen())
+
+    @classmethod
+    async def unsubscribe(cls):
+        """ 停止失效广播订阅 """
+        if cls._listener is not None:
+            cls._listener.cancel()
+            try:
+                await cls._listener
+            except asyncio.CancelledError:
+                pass
+            cls._listener = None
+        cls._subscribed = False
+
+    @classmethod
+    def _jitter(cls, ttl: int, jitter: float) -> int:
+        return max(1, int(ttl * (1 + random.uniform(-jitter, jitter))))
+
+    @classmethod
+    async def _l2_get(cls, key: str, tags: Tuple[str, ...]) -> Tuple[bool, Optional[str]]:
+        """ 读取L2, 标签版本不一致视为未命中 """
+        async with RedisUtil.redis.pipeline(transaction=False) as pipe:
+            pipe.get(RedisUtil.get_key(cls.DATA_PREFIX + key))
+            if tags:
+                pipe.mget([RedisUtil.get_key(f"cache:tag:{t}") for t in tags])
+            results = await pipe.execute()
+
+        raw: Optional[str] = results[0]
+        if raw is None:
+            return False, None
+        versions = ".".join(str(v or 0) for v in results[1]) if tags else ""
+        stored, _, body = raw.partition("|")
+        if stored != versions:
+            return False, None
+        return True, (body[1:] if body[:1] == cls.VALUE_FLAG else None)
+
+    @classmethod
+    def _l1_get(cls, key: str) -> Tuple[bool, Optional[str]]:
+        entry = cls._l1.get(key)
+        if entry is None:
+            return False, None
+        if entry[0] <= time.monotonic():
+            cls._l1_pop(key)
+            return False, None
+        cls._l1.move_to_end(key)
+        return True, entry[1]
+
+    @classmethod
+    def _l1_set(cls, key: str, payload: Optional[str], tags: Tuple[str, ...], ttl: int):
+        if ttl <= 0:
+            return
+        if not cls._subscribed:
+            ttl = min(ttl, cls.fallback_ttl)
+        size = len(payload or "") + len(key)
+        if size > cls.l1_max_bytes:
+            return
+
+        cls._l1_pop(key)
+        cls._l1[key] = (time.monotonic() + ttl, payload, tags)
+        cls._l1_bytes += size
+        while cls._l1_bytes > cls.l1_max_bytes and cls._l1:
+            cls._l1_pop(next(iter(cls._l1)))
+            cls.stats["evict"] += 1
+
+    @classmethod
+    def _l1_pop(cls, key: str):
+        entry = cls._l1.pop(key, None)
+        if entry is not None:
+            cls._l1_bytes -= len(entry[1] or "") + len(key)
+
+    @classmethod
+    def _l1_drop_tags(cls, tags: Set[str]):
+        for key in [k for k, v in cls._l1.items() if tags.intersection(v[2])]:
+            cls._l1_pop(key)
+
+    @classmethod
+    async def _publish(cls, *messages: str):
+        """ 广播失效消息 """
+        try:
+            for message in messages:
+                await RedisUtil.redis.publish(RedisUtil.get_key(cls.CHANNEL_KEY), message)
+        except Exception as e:
+            logger.warning("TieredCache publish failed: %s", e)
+
+    @classmethod
+    async def _listen(cls):
+        """ 订阅失效广播, 断线后自动重连 """
+        while True:
+            pubsub = RedisUtil.redis.pubsub()
+            try:
+                await pubsub.subscribe(RedisUtil.get_key(cls.CHANNEL_KEY))
+                # 订阅前的失效消息可能已错过, 重新订阅后清空L1
+                cls._l1.clear()
+                cls._l1_bytes = 0
+                cls._subscribed = True
+                async for message in pubsub.listen():
+                    if message.get("type") != "message":
+                        continue
+                    data = message.get("data")
+                    data = data.decode() if isinstance(data, bytes) else str(data)
+                    kind, _, name = data.partition(":")
+                    if kind == "k":
+                        cls._l1_pop(name)
+                    elif kind == "t":
+                        cls._l1_drop_tags({name})
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning("TieredCache subscribe interrupted: %s", e)
+                await asyncio.sleep(1)
+            finally:
+                cls._subscribed = False
+                try:
+                    await pubsub.aclose()
+                except Exception:
+                    pass
+
+
+def cached(key: str,
+           ttl: int = 300,
+           tags: Iterable[str] = (),
+           l1_ttl: int = 60,
+           negative_ttl: int = 30,
+           jitter: float = 0.1,
+           serializer: Any = JsonSerializer):
+    """
+    二级缓存装饰器
+
+    键与标签可引用函数参数, 如: @cached("notice:scene:{scene}", tags=["notice"])
+    用于类方法时置于 @classmethod 之下。
+
+    Args:
+        key (str): 缓存键模板。
+        ttl (int): L2过期时间(秒)。
+        tags (Iterable[str]): 缓存标签模板。
+        l1_ttl (int): L1过期时间(秒)。
+        negative_ttl (int): 结果为None时的缓存时间(秒)。
+        jitter (float): 过期时间随机浮动比例。
+        serializer (Any): 序列化器, 需提供 dumps/loads。
+    """
+    tags = tuple(tags)
+
+    def decorator(func: Callable[..., Awaitable[T]]) -> Callable[..., Awaitable[T]]:
+        sig = inspect.signature(func)
+
+        @wraps(func)
+        async def wrapper(*args, **kwargs) -> T:
+            bound = sig.bind(*args, **kwargs)
+            bound.apply_defaults()
+            return await TieredCache.fetch(
+                key.format(**bound.arguments),
+                lambda: func(*args, **kwargs),
+                ttl=ttl,
+                tags=[t.format(**bound.arguments) for t in tags],
+                l1_ttl=l1_ttl,
+                negative_ttl=negative_ttl,
+                jitter=jitter,
+                serializer=serializer
+            )
+
+        return wrapper
+
+    return decorator
@@ -0,0 +1,302 @@
+# +----------------------------------------------------------------------
+# | WaitAdmin(fastapi)快速开发后台管理系统
+# +----------------------------------------------------------------------
+# | 欢迎阅读学习程序代码,建议反馈是我们前进的动力
+# | 程序完全开源可支持商用,允许去除界面版权信息
+# | gitee:   https://gitee.com/wafts/waitadmin-python
+# | github:  https://github.com/topwait/waitadmin-python
+# | 官方网站: https://www.waitadmin.cn
+# | WaitAdmin团队版权所有并拥有最终解释权
+# +----------------------------------------------------------------------
+# | Author: WaitAdmin Team <2474369941@qq.com>
+# +----------------------------------------------------------------------
+import json
+import time
+import bisect
+import asyncio
+import logging
+from typing import Dict, List, Iterable, Optional
+from redis.exceptions import WatchError
+from common.utils.cache import RedisUtil
+from common.models.commodity import Category
+
+logger = logging.getLogger(__name__)
+
+
+class CategoryIndex:
+    """
+    商品分类索引
+
+    nodes:    {id: node}                 全部未删除的分类
+    children: {parent_id: [id, ...]}     顶级分类的父ID为0
+    levels:   {level: [id, ...]}
+
+    children/levels 中的ID均按 (-sort, -id) 预先排好序。
+    """
+
+    def __init__(self, version: int, rows: Iterable[dict]):
+        self.version: int = version
+        self.nodes: Dict[int, dict] = {}
+        self.children: Dict[int, List[int]] = {}
+        self.levels: Dict[int, List[int]] = {}
+        self._paths: Dict[int, List[dict]] = {}
+
+        for row in rows:
+            node = CategoryUtil.normalize(row)
+            self.nodes[node["id"]] = node
+        for node in sorted(self.nodes.values(), key=lambda n: (-n["sort"], -n["id"])):
+            self.children.setdefault(node["parent_id"], []).append(node["id"])
+            self.levels.setdefault(node["level"], []).append(node["id"])
+
+    def _order(self, id_: int):
+        return -self.nodes[id_]["sort"], -id_
+
+    def apply(self, id_: int, row: Optional[dict]):
+        """
+        增量更新单个分类
+
+        Args:
+            id_ (int): 分类ID。
+            row (Optional[dict]): 分类数据, 为None表示已删除。
+        """
+        old = self.nodes.pop(id_, None)
+        if old is not None:
+            self.children.get(old["parent_id"], []).remove(id_)
+            self.levels.get(old["level"], []).remove(id_)
+
+        if row is not None:
+            node = CategoryUtil.normalize(row)
+            self.nodes[id_] = node
+            bisect.insort(self.children.setdefault(node["parent_id"], []), id_, key=self._order)
+            bisect.insort(self.levels.setdefault(node["level"], []), id_, key=self._order)
+
+        self._paths.clear()
+
+    def get(self, id_: int) -> Optional[dict]:
+        """ 获取分类节点 """
+        return self.nodes.get(id_)
+
+    def roots(self, visible: bool = False) -> List[dict]:
+        """ 顶级分类 """
+        return self.children_of(0, visible)
+
+    def children_of(self, parent_id: int, visible: bool = False) -> List[dict]:
+        """ 直接子分类 """
+        nodes = [self.nodes[i] for i in self.children.get(parent_id, [])]
+        return [n for n in nodes if n["is_show"]] if visible else nodes
+
+    def level(self, level: int, visible: bool = False) -> List[dict]:
+        """ 指定层级的分类 """
+        nodes = [self.nodes[i] for i in self.levels.get(level, [])]
+        return [n for n in nodes if n["is_show"]] if visible else nodes
+
+    def ordered(self, visible: bool = False) -> List[dict]:
+        """ 全部分类, 按 (-sort, -id) 排序 """
+        nodes = sorted(self.nodes.values(), key=lambda n: (-n["sort"], -n["id"]))
+        return [n for n in nodes if n["is_show"]] if visible else nodes
+
+    def path(self, id_: int) -> List[dict]:
+        """ 从顶级分类到当前分类的路径 """
+        if id_ not in self._paths:
+            path = []
+            node = self.nodes.get(id_)
+            while node is not None and len(path) <= len(self.nodes):
+                path.append(node)
+                node = self.nodes.get(node["parent_id"])
+            self._paths[id_] = path[::-1]
+        return self._paths[id_]
+
+    def titles(self, ids: Iterable[int]) -> Dict[int, str]:
+        """ 分类ID到名称的映射 """
+        return {i: self.nodes[i]["title"] for i in ids if i in self.nodes}
+
+
+class CategoryUtil:
+    """
+    商品分类索引工具
+
+    缓存结构:
+        commodity:category:nodes    = Hash{id: json}     全部未删除的分类, 字段"*"标记已构建
+        commodity:category:version  = Int                索引版本号, 每次变更自增
+        commodity:category:changes  = List["版本:ID"]     最近的变更记录, 用于增量追赶
+
+    每个进程持有一份内存索引, 按 check_interval 检查版本号:
+    落后时按变更记录增量追赶, 记录不连续时从Redis整体加载, 缓存缺失时才查询数据库。
+    """
+
+    NODES_KEY: str = "commodity:category:nodes"
+    VERSION_KEY: str = "commodity:category:version"
+    CHANGES_KEY: str = "commodity:category:changes"
+    FIELDS = ("id", "title", "parent_id", "level", "image", "sort", "is_show")
+
+    check_interval: float = 1.0
+    changes_limit: int = 200
+
+    _index: Optional[CategoryIndex] = None
+    _checked_at: float = 0
+    _lock: asyncio.Lock = asyncio.Lock()
+
+    @classmethod
+    async def index(cls) -> CategoryIndex:
+        """
+        获取当前的分类索引
+
+        Returns:
+            CategoryIndex: 分类索引(只读, 不要修改其中的节点)。
+
+        Author:
+            zero
+        """
+        if cls._index is not None and time.monotonic() - cls._checked_at < cls.check_interval:
+            return cls._index
+
+        async with cls._lock:
+            if cls._index is None or time.monotonic() - cls._checked_at >= cls.check_interval:
+                cls._index = await cls._sync(cls._index)
+                cls._checked_at = time.monotonic()
+        return cls._index
+
+    @classmethod
+    async def refresh(cls, id_: int):
+        """
+        分类变更后增量更新索引
+
+        Args:
+            id_ (int): 变更的分类ID。
+
+        Author:
+            zero
+        """
+        version_key: str = RedisUtil.get_key(cls.VERSION_KEY)
+        nodes_key: str = RedisUtil.get_key(cls.NODES_KEY)
+        for _ in range(3):
+            async with RedisUtil.redis.pipeline(transaction=True) as pipe:
+                try:
+                    await pipe.watch(version_key)
+                    row = await Category.filter(id=id_, is_delete=0).first().values(*cls.FIELDS)
+                    built: bool = await pipe.hexists(nodes_key, "*")
+                    version: int = int(await pipe.get(version_key) or 0) + 1
+
+                    pipe.multi()
+                    pipe.set(version_key, version)
+                    # 缓存尚未构建时只推进版本号, 等待下次读取时整体构建
+                    if built:
+                        if row:
+                            pipe.hset(nodes_key, str(id_), json.dumps(cls.normalize(row), ensure_ascii=False))
+                        else:
+                            pipe.hdel(nodes_key, str(id_))
+                        pipe.rpush(RedisUtil.get_key(cls.CHANGES_KEY), f"{version}:{id_}")
+                        pipe.ltrim(RedisUtil.get_key(cls.CHANGES_KEY), -cls.changes_limit, -1)
+                    await pipe.execute()
+                except WatchError:
+                    continue
+
+            index = cls._index
+            if built and index is not None and index.version == version - 1:
+                index.apply(id_, row)
+                index.version = version
+            else:
+                cls._checked_at = 0
+            return
+
+        # 持续冲突: 作废缓存, 由下次读取从数据库重建
+        await RedisUtil.delete(cls.NODES_KEY)
+        cls._checked_at = 0
+
+    @classmethod
+    async def rebuild(cls) -> CategoryIndex:
+        """
+        从数据库整体重建索引 (批量导入分类后使用)
+
+        Returns:
+            CategoryIndex: 新的分类索引。
+
+        Author:
+            zero
+        """
+        async with cls._lock:
+            cls._index = await cls._build()
+            cls._checked_at = time.monotonic()
+        return cls._index
+
+    @classmethod
+    def normalize(cls, row: dict) -> dict:
+        """ 统一节点字段 """
+        return {
+            "id": int(row["id"]),
+            "title": row.get("title") or "",
+            "parent_id": int(row.get("parent_id") or 0),
+            "level": int(row.get("level") or 0),
+            "image": row.get("image") or "",
+            "sort": int(row.get("sort") or 0),
+            "is_show": int(row.get("is_show") or 0),
+        }
+
+    @classmethod
+    async def _sync(cls, index: Optional[CategoryIndex]) -> CategoryIndex:
+        """ 与Redis中的版本对齐 """
+        version: Optional[int] = await RedisUtil.get_int(cls.VERSION_KEY)
+        if index is not None and version == index.version:
+            return index
+
+        if index is not None and version is not None and version > index.version:
+            if await cls._catch_up(index, version):
+                return index
+
+        async with RedisUtil.redis.pipeline(transaction=True) as pipe:
+            pipe.get(RedisUtil.get_key(cls.VERSION_KEY))
+            pipe.hgetall(RedisUtil.get_key(cls.NODES_KEY))
+            version, mapping = await pipe.execute()
+
+        if mapping.pop("*", None) is None:
+            return await cls._build()
+        return CategoryIndex(int(version or 0), [json.loads(v) for v in mapping.values()])
+
+    @classmethod
+    async def _catch_up(cls, index: CategoryIndex, version: int) -> bool:
+        """ 按变更记录增量追赶, 记录不连续时返回False """
+        entries = await RedisUtil.redis.lrange(RedisUtil.get_key(cls.CHANGES_KEY), 0, -1)
+        changes: Dict[int, int] = {}
+        for entry in entries:
+            v, id_ = entry.split(":", 1)
+            if index.version < int(v) <= version:
+                changes[int(v)] = int(id_)
+
+        if sorted(changes) != list(range(index.version + 1, version + 1)):
+            return False
+
+        ids = list(dict.fromkeys(changes.values()))
+        values = await RedisUtil.redis.hmget(RedisUtil.get_key(cls.NODES_KEY), [str(i) for i in ids])
+        for id_, value in zip(ids, values):
+            index.apply(id_, json.loads(value) if value else None)
+        index.version = version
+        return True
+
+    @classmethod
+    async def _build(cls) -> CategoryIndex:
+        """ 从数据库构建索引并写入Redis """
+        version_key: str = RedisUtil.get_key(cls.VERSION_KEY)
+        nodes_key: str = RedisUtil.get_key(cls.NODES_KEY)
+        rows: List[dict] = []
+        version: int = 0
+        for _ in range(3):
+            async with RedisUtil.redis.pipeline(transaction=True) as pipe:
+                try:
+                    await pipe.watch(version_key)
+                    version = int(await pipe.get(version_key) or 0) + 1
+                    rows = [cls.normalize(r) for r in await Category.filter(is_delete=0).values(*cls.FIELDS)]
+
+                    mapping = {str(r["id"]): json.dumps(r, ensure_ascii=False) for r in rows}
+                    mapping["*"] = str(int(time.time()))
+                    pipe.multi()
+                    pipe.delete(nodes_key, RedisUtil.get_key(cls.CHANGES_KEY))
+                    pipe.hset(nodes_key, mapping=mapping)
+                    pipe.set(version_key, version)
+                    await pipe.execute()
+                    return CategoryIndex(version, rows)
+                except WatchError:
+                    continue
+
+        # 构建期间持续有写入: 本次直接使用数据库结果, 不写缓存
+        logger.warning("CategoryUtil build conflicted, serving uncached index")
+        return CategoryIndex(version - 1, rows)
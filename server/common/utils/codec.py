@@ -0,0 +1,151 @@
+# +----------------------------------------------------------------------
+# | WaitAdmin(fastapi)快速开发后台管理系统
+# +----------------------------------------------------------------------
+# | 欢迎阅读学习程序代码,建议反馈是我们前进的动力
+# | 程序完全开源可支持商用,允许去除界面版权信息
+# | gitee:   https://gitee.com/wafts/waitadmin-python
+# | github:  https://github.com/topwait/waitadmin-python
+# | 官方网站: https://www.waitadmin.cn
+# | WaitAdmin团队版权所有并拥有最终解释权
+# +----------------------------------------------------------------------
+# | Author: WaitAdmin Team <2474369941@qq.com>
+# +----------------------------------------------------------------------
+import json
+from typing import Any, Dict, Union, Optional
+import msgpack
+
+__all__ = ["JsonCodec", "MsgpackCodec", "CodecUtil"]
+
+
+class JsonCodec:
+    """ 紧凑JSON编码 """
+    VERSION: int = 0x02
+
+    @staticmethod
+    def dumps(value: Any) -> bytes:
+        return json.dumps(value, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+    @staticmethod
+    def loads(data: bytes) -> Any:
+        return json.loads(data)
+
+
+class MsgpackCodec:
+    """ MessagePack二进制编码 """
+    VERSION: int = 0x01
+
+    @staticmethod
+    def dumps(value: Any) -> bytes:
+        return msgpack.packb(value, use_bin_type=True)
+
+    @staticmethod
+    def loads(data: bytes) -> Any:
+        return msgpack.unpackb(data, raw=False, strict_map_key=False)
+
+
+class CodecUtil:
+    """
+    缓存值编解码
+
+    编码格式: 1个字节的版本号 + 编码数据。
+    旧版数据是没有版本号的JSON文本, 首字节总是可见字符或空白(>= 0x09),
+    与版本号(0x01 ~ 0x08)不会冲突, 读取时按JSON文本兼容解析。
+    """
+
+    codecs: Dict[int, Any] = {
+        MsgpackCodec.VERSION: MsgpackCodec,
+        JsonCodec.VERSION: JsonCodec,
+    }
+
+    @classmethod
+    def encode(cls, value: Any, codec: Any = MsgpackCodec) -> bytes:
+        """
+        编码缓存值
+
+        Args:
+            value (Any): 要编码的值。
+            codec (Any): 编码器, 默认为MsgpackCodec。
+
+        Returns:
+            bytes: 带版本号的编码数据。
+
+        Author:
+            zero
+        """
+        return bytes((codec.VERSION,)) + codec.dumps(value)
+
+    @classmethod
+    def decode(cls, data: Optional[Union[bytes, str]]) -> Any:
+        """
+        解码缓存值 (兼容旧版JSON文本)
+
+        Args:
+            data (Optional[Union[bytes, str]]): 缓存中读取的原始数据。
+
+        Returns:
+            Any: 解码后的值, 数据为None时返回None。
+
+        Author:
+            zero
+        """
+        if data is None:
+            return None
+        if isinstance(data, str):
+            return json.loads(data)
+        codec = cls.codecs.get(data[0]) if data else None
+        if codec is None:
+            return json.loads(data)
+        return codec.loads(data[1:])
+
+
+if __name__ == "__main__":
+    # 微基准: python -m common.utils.codec
+    import time
+    import timeit
+
+    now = int(time.time())
+    _token = {
+        "uid": 10086,
+        "key": "7c9e6679-7425-40de-944b-e07fc1f90ae7",
+        "value": "c95622552786c5a1b0f1e2d3c4b5a697Ab3x",
+        "device": "mnp",
+        "kick_out": 0,
+        "login_host": "203.0.113.15",
+        "expire_time": now + 7200,
+        "create_time": now,
+        "last_op_time": now,
+        "last_ip_address": "203.0.113.15",
+        "last_ua_browser": "Mozilla/5.0 (iPhone; CPU iPhone OS 17_0 like Mac OS X) MicroMessenger/8.0.42"
+    }
+    shapes = {
+        "session(1 token)": {
+            "id": 10086, "data": {"role_id": 1}, "create_time": now, "update_time": now,
+            "token_lists": [_token]
+        },
+        "session(10 tokens)": {
+            "id": 10086, "data": {"role_id": 1}, "create_time": now, "update_time": now,
+            "token_lists": [dict(_token, value=f"{i:032x}Ab3x") for i in range(10)]
+        },
+        "config(website)": {
+            "pc_logo": "static/images/logo.png", "pc_ico": "static/images/favicon.ico",
+            "pc_title": "MoqAdmin", "pc_keywords": "商城,卡密,自动发货", "copyright": "©2025 MoqAdmin",
+            "icp": "粤ICP备00000000号", "pcp": "粤公网安备00000000000000号", "analyse": "",
+            "domain": "https://www.example.com"
+        },
+        "perms(role)": [f"system:menu:{op}" for op in ("lists", "detail", "add", "edit", "delete")] * 8,
+    }
+
+    print(f"{'shape':<20}{'codec':<10}{'bytes':>8}{'encode µs':>12}{'decode µs':>12}")
+    for name, value in shapes.items():
+        legacy = json.dumps(value).encode("utf-8")
+        rows = [("json(old)", legacy, lambda v=value: json.dumps(v).encode("utf-8"), lambda b=legacy: json.loads(b))]
+        for codec in (JsonCodec, MsgpackCodec):
+            data = CodecUtil.encode(value, codec)
+            rows.append((codec.__name__.replace("Codec", "").lower(), data,
+                         lambda v=value, c=codec: CodecUtil.encode(v, c),
+                         lambda b=data: CodecUtil.decode(b)))
+        for label, data, enc, dec in rows:
+            n = 20000
+            enc_us = timeit.timeit(enc, number=n) / n * 1e6
+            dec_us = timeit.timeit(dec, number=n) / n * 1e6
+            print(f"{name:<20}{label:<10}{len(data):>8}{enc_us:>12.2f}{dec_us:>12.2f}")
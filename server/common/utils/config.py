@@ -12,15 +12,47 @@
 # +----------------------------------------------------------------------
 import json
 import time
-
-from common.utils.cache import RedisUtil
+import asyncio
+import logging
+from typing import Dict, Tuple, Optional
+from redis.exceptions import WatchError
+from common.utils.cache import RedisUtil, ResponseCache, SingleFlight
+from common.enums.cache import CacheTagEnum
 from common.models.sys import SysConfigModel
 
+logger = logging.getLogger(__name__)
+
 
 class ConfigUtil:
-    """ 配置工具 """
+    """
+    配置工具
+
+    缓存结构:
+        sys:config:{type}    = Hash{key: value}   每个配置类型一个哈希
+        sys:config:version   = Hash{type: int}    每个配置类型的版本号
+        sys:config:channel   = Pub/Sub            配置变更广播通道
+
+    进程内持有已解码的配置快照, 由广播通道驱动失效, 正常读取不访问Redis。
+    """
 
     SYSTEM_CONFIG_KEY: str = "sys:config"
+    VERSION_KEY: str = "sys:config:version"
+    CHANNEL_KEY: str = "sys:config:channel"
+
+    # 未订阅广播时快照的有效时长(秒)
+    fallback_ttl: int = 5
+
+    # 进程内快照: {type: {key: (原始值, 解码值)}}
+    _snapshot: Dict[str, Dict[str, Tuple[str, any]]] = {}
+    # 快照版本: {type: version}
+    _versions: Dict[str, int] = {}
+    # 快照加载时间: {type: timestamp}
+    _loaded_at: Dict[str, float] = {}
+    # 快照代数: 每次失效递增, 用于丢弃失效期间读到的旧数据
+    _generation: int = 0
+    # 广播订阅任务
+    _listener: Optional[asyncio.Task] = None
+    _subscribed: bool = False
 
     @classmethod
     async def get(cls, type_: str, key: str = "", default_: any = None):
@@ -38,54 +70,31 @@ class ConfigUtil:
         Author:
             zero
         """
-        cache_data = await RedisUtil.get(cls.SYSTEM_CONFIG_KEY)
-
-        if not cache_data:
-            lists = await SysConfigModel.all().values("type", "key", "value")
-
-            results = {}
-            for item in lists:
-                if item["type"] not in results:
-                    results[item["type"]] = {}
-                results[item["type"]][item["key"]] = item["value"]
-
-            cache_data = results
-            await RedisUtil.set(cls.SYSTEM_CONFIG_KEY, json.dumps(results))
-        else:
-            cache_data = json.loads(str(cache_data))
+        section = await cls._section(type_)
 
         if key:
-            value = cache_data.get(type_, {}).get(key)
-
-            if value is not None and value != "":
-                try:
-                    json_value = json.loads(value)
-                    if isinstance(json_value, dict):
-                        value = json_value
-                except json.JSONDecodeError:
-                    pass
+            entry = section.get(key) if section is not None else None
+            value = None
+            if entry is not None:
+                raw, decoded = entry
+                value = dict(decoded) if isinstance(decoded, dict) else raw
 
             if value is None and default_ is not None:
                 return default_
 
             return value
 
-        data = cache_data.get(type_)
-        if isinstance(data, dict):
-            for k, v in data.items():
-                if v is None:
-                    continue
-
-                try:
-                    json_value = json.loads(v)
-                    if isinstance(json_value, (dict, list)):
-                        data[k] = json_value
-                except json.JSONDecodeError:
-                    pass
-
-        if data is None and default_ is not None:
+        if section is None:
             return default_
 
+        data = {}
+        for k, (raw, decoded) in section.items():
+            if isinstance(decoded, dict):
+                data[k] = dict(decoded)
+            elif isinstance(decoded, list):
+                data[k] = list(decoded)
+            else:
+                data[k] = raw
         return data
 
     @classmethod
@@ -105,9 +114,6 @@ class ConfigUtil:
         Author:
             zero
         """
-
-        await RedisUtil.delete(cls.SYSTEM_CONFIG_KEY)
-
         if isinstance(value, (list, dict, tuple, set)):
             value = json.dumps(value)
 
@@ -132,3 +138,218 @@ class ConfigUtil:
 
             await SysConfigModel.filter(type=type_, key=key).update(**_data)
 
+        await cls.refresh(type_)
+
+    @classmethod
+    async def refresh(cls, type_: str):
+        """
+        从数据库重建指定类型的缓存并广播变更
+
+        Args:
+            type_ (str): 配置类型。
+
+        Author:
+            zero
+        """
+        lists = await SysConfigModel.filter(type=type_).values("key", "value")
+        mapping = {item["key"]: item["value"] for item in lists if item["value"] is not None}
+
+        version_key: str = RedisUtil.get_key(cls.VERSION_KEY)
+        async with RedisUtil.redis.pipeline(transaction=True) as pipe:
+            try:
+                await pipe.watch(version_key)
+                # 缓存尚未构建: 不写入残缺的缓存, 等待下次读取时整体重建
+                if not await pipe.exists(version_key):
+                    await pipe.unwatch()
+                    cls._drop(type_)
+                    await cls._publish(f"{type_}:0")
+                    return
+
+                pipe.multi()
+                pipe.delete(cls._section_key(type_))
+                if mapping:
+                    pipe.hset(cls._section_key(type_), mapping=mapping)
+                pipe.hincrby(version_key, type_, 1)
+                results = await pipe.execute()
+            except WatchError:
+                # 并发清除了缓存, 同上
+                cls._drop(type_)
+                await cls._publish(f"{type_}:0")
+                return
+
+        version = int(results[-1])
+        cls._drop(type_, version)
+        cls._store(type_, cls._decode(mapping), version)
+        await cls._publish(f"{type_}:{version}")
+
+    @classmethod
+    async def clear(cls):
+        """
+        清除全部配置缓存并通知所有进程丢弃快照
+
+        Author:
+            zero
+        """
+        await RedisUtil.unlink_pattern(cls.SYSTEM_CONFIG_KEY + ":*")
+        # 同时清除旧版整块JSON缓存
+        await RedisUtil.unlink(cls.SYSTEM_CONFIG_KEY)
+
+        cls._drop()
+        await cls._publish("*")
+
+    @classmethod
+    async def subscribe(cls):
+        """ 启动配置变更订阅 """
+        if cls._listener is None or cls._listener.done():
+            cls._listener = asyncio.create_task(cls._listen())
+
+    @classmethod
+    async def unsubscribe(cls):
+        """ 停止配置变更订阅 """
+        if cls._listener is not None:
+            cls._listener.cancel()
+            try:
+                await cls._listener
+            except asyncio.CancelledError:
+                pass
+            cls._listener = None
+        cls._subscribed = False
+
+    @classmethod
+    async def _section(cls, type_: str) -> Optional[Dict[str, Tuple[str, any]]]:
+        """ 读取指定类型的快照, 失效时从Redis刷新 """
+        if type_ in cls._versions:
+            if cls._subscribed or time.time() - cls._loaded_at.get(type_, 0) < cls.fallback_ttl:
+                return cls._snapshot.get(type_)
+
+        generation: int = cls._generation
+        built, version, mapping = 0, None, {}
+        for _ in range(2):
+            pipe = RedisUtil.redis.pipeline(transaction=False)
+            pipe.exists(RedisUtil.get_key(cls.VERSION_KEY))
+            pipe.hget(RedisUtil.get_key(cls.VERSION_KEY), type_)
+            pipe.hgetall(cls._section_key(type_))
+            built, version, mapping = await pipe.execute()
+            if built:
+                break
+
+            # 缓存缺失: 所有进程的并发请求合并为一次重建
+            sections = await SingleFlight.do(cls.VERSION_KEY, cls._ensure_built, distributed=True)
+            if sections is not None:
+                return sections.get(type_)
+
+        section = cls._decode(mapping)
+        # 读取期间收到了变更广播, 本次结果不写入快照
+        if built and generation == cls._generation:
+            cls._store(type_, section, int(version or 0))
+        return section
+
+    @classmethod
+    async def _ensure_built(cls) -> Optional[Dict[str, Dict[str, Tuple[str, any]]]]:
+        """ 缓存仍缺失时重建, 已被其他进程重建则返回None """
+        if await RedisUtil.redis.exists(RedisUtil.get_key(cls.VERSION_KEY)):
+            return None
+        return await cls._rebuild()
+
+    @classmethod
+    async def _rebuild(cls) -> Dict[str, Dict[str, Tuple[str, any]]]:
+        """ 从数据库重建全部配置缓存 """
+        lists = await SysConfigModel.all().values("type", "key", "value")
+
+        results: Dict[str, Dict[str, str]] = {}
+        for item in lists:
+            if item["value"] is None:
+                continue
+            results.setdefault(item["type"], {})[item["key"]] = item["value"]
+
+        pipe = RedisUtil.redis.pipeline(transaction=True)
+        for type_, mapping in results.items():
+            pipe.delete(cls._section_key(type_))
+            pipe.hset(cls._section_key(type_), mapping=mapping)
+        # 占位字段: 标记缓存已构建(即使没有任何配置)
+        pipe.hset(RedisUtil.get_key(cls.VERSION_KEY), "*", int(time.time()))
+        await pipe.execute()
+
+        cls._drop()
+        await cls._publish("*")
+        return {type_: cls._decode(mapping) for type_, mapping in results.items()}
+
+    @classmethod
+    def _decode(cls, mapping: Dict[str, str]) -> Optional[Dict[str, Tuple[str, any]]]:
+        """ 预解码配置值: {key: (原始值, 解码值)} """
+        section: Dict[str, Tuple[str, any]] = {}
+        for k, v in (mapping or {}).items():
+            decoded = v
+            if v != "":
+                try:
+                    decoded = json.loads(v)
+                except (json.JSONDecodeError, TypeError):
+                    pass
+            section[k] = (v, decoded)
+        return section or None
+
+    @classmethod
+    def _store(cls, type_: str, section: Optional[Dict[str, Tuple[str, any]]], version: int):
+        """ 写入进程内快照 """
+        cls._snapshot[type_] = section
+        cls._versions[type_] = version
+        cls._loaded_at[type_] = time.time()
+
+    @classmethod
+    def _drop(cls, type_: str = None, version: int = 0):
+        """ 丢弃进程内快照 """
+        if type_ is None:
+            cls._generation += 1
+            cls._snapshot.clear()
+            cls._versions.clear()
+            cls._loaded_at.clear()
+        elif not version or cls._versions.get(type_, 0) < version:
+            cls._generation += 1
+            cls._snapshot.pop(type_, None)
+            cls._versions.pop(type_, None)
+            cls._loaded_at.pop(type_, None)
+
+    @classmethod
+    async def _publish(cls, message: str):
+        """ 广播配置变更 (同时失效依赖配置的响应缓存) """
+        try:
+            await ResponseCache.purge(CacheTagEnum.CONFIG)
+            await RedisUtil.redis.publish(RedisUtil.get_key(cls.CHANNEL_KEY), message)
+        except Exception as e:
+            logger.warning("ConfigUtil publish failed: %s", e)
+
+    @classmethod
+    async def _listen(cls):
+        """ 订阅配置变更广播, 断线后自动重连 """
+        while True:
+            pubsub = RedisUtil.redis.pubsub()
+            try:
+                await pubsub.subscribe(RedisUtil.get_key(cls.CHANNEL_KEY))
+                # 订阅前的变更可能已错过, 重新订阅后丢弃全部快照
+                cls._drop()
+                cls._subscribed = True
+                async for message in pubsub.listen():
+                    if message.get("type") != "message":
+                        continue
+                    data = message.get("data")
+                    data = data.decode() if isinstance(data, bytes) else str(data)
+                    if data == "*":
+                        cls._drop()
+                        continue
+                    type_, _, version = data.rpartition(":")
+                    cls._drop(type_, int(version) if version.isdigit() else 0)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning("ConfigUtil subscribe interrupted: %s", e)
+                await asyncio.sleep(1)
+            finally:
+                cls._subscribed = False
+                try:
+                    await pubsub.aclose()
+                except Exception:
+                    pass
+
+    @classmethod
+    def _section_key(cls, type_: str) -> str:
+        return RedisUtil.get_key(f"{cls.SYSTEM_CONFIG_KEY}:{type_}")
@@ -0,0 +1,309 @@
+# +----------------------------------------------------------------------
+# | WaitAdmin(fastapi)快速开发后台管理系统
+# +----------------------------------------------------------------------
+# | 欢迎阅读学习程序代码,建议反馈是我们前进的动力
+# | 程序完全开源可支持商用,允许去除界面版权信息
+# | gitee:   https://gitee.com/wafts/waitadmin-python
+# | github:  https://github.com/topwait/waitadmin-python
+# | 官方网站: https://www.waitadmin.cn
+# | WaitAdmin团队版权所有并拥有最终解释权
+# +----------------------------------------------------------------------
+# | Author: WaitAdmin Team <2474369941@qq.com>
+# +----------------------------------------------------------------------
+import os
+import time
+import socket
+import asyncio
+import logging
+from bisect import bisect_left
+from typing import Dict, List, Tuple, Optional
+from tortoise import connections
+from config import get_settings
+from common.utils.cache import RedisUtil, TieredCache
+from common.utils.codec import CodecUtil
+from common.utils.writer import BatchWriter
+
+logger = logging.getLogger(__name__)
+
+__all__ = ["Histogram", "MetricsUtil"]
+
+
+class Histogram:
+    """
+    延迟直方图 (固定对数刻度分桶)
+
+    记录时只做一次二分查找和两次加法; 分桶是累积前的计数, 输出时再累加成Prometheus的le桶。
+    """
+
+    __slots__ = ("counts", "total", "count")
+
+    def __init__(self, size: int):
+        self.counts: List[int] = [0] * (size + 1)  # 最后一个为 +Inf
+        self.total: float = 0.0
+        self.count: int = 0
+
+    def observe(self, buckets: Tuple[float, ...], value: float):
+        self.counts[bisect_left(buckets, value)] += 1
+        self.total += value
+        self.count += 1
+
+    def dump(self) -> list:
+        return [self.counts, self.total, self.count]
+
+
+class MetricsUtil:
+    """
+    请求指标
+
+    每个进程在内存中按 (方法, 路由模板, 状态码) 记录延迟直方图, 并记录各模块的处理中请求数;
+    每 push_interval 秒把快照写入Redis哈希 metrics:workers (字段为进程标识),
+    /metrics 接口读取全部未过期的进程快照合并后, 以Prometheus文本格式输出。
+    """
+
+    WORKERS_KEY: str = "metrics:workers"
+
+    buckets: Tuple[float, ...] = (
+        0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+        0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0
+    )
+    push_interval: float = 5.0
+
+    worker: str = f"{socket.gethostname()}:{os.getpid()}"
+    histograms: Dict[Tuple[str, str, str], Histogram] = {}
+    inflight: Dict[str, int] = {}
+    _task: Optional[asyncio.Task] = None
+
+    @classmethod
+    def observe(cls, method: str, route: str, status: int, seconds: float):
+        """
+        记录一次请求
+
+        Args:
+            method (str): 请求方法。
+            route (str): 路由模板 (如 /api/article/detail), 未匹配路由时为 other。
+            status (int): 响应状态码。
+            seconds (float): 处理耗时(秒)。
+
+        Author:
+            zero
+        """
+        key = (method, route, str(status))
+        histogram = cls.histograms.get(key)
+        if histogram is None:
+            histogram = cls.histograms[key] = Histogram(len(cls.buckets))
+        histogram.observe(cls.buckets, seconds)
+
+    @classmethod
+    def snapshot(cls) -> dict:
+        """ 当前进程的指标快照 """
+        return {
+            "time": time.time(),
+            "histograms": [[*key, *h.dump()] for key, h in cls.histograms.items()],
+            "inflight": dict(cls.inflight),
+            "gauges": cls._gauges(),
+            "counters": cls._counters()
+        }
+
+    @classmethod
+    async def push(cls):
+        """ 当前进程的快照写入Redis """
+        ttl: int = int(cls.push_interval * 3) + 1
+        await RedisUtil.hset_obj(cls.WORKERS_KEY, cls.worker, cls.snapshot(), time=ttl)
+
+    @classmethod
+    def start(cls):
+        """ 启动定时推送 (应用启动时调用) """
+        if cls._task is None or cls._task.done():
+            cls._task = asyncio.create_task(cls._run())
+
+    @classmethod
+    async def stop(cls):
+        """ 停止定时推送并移除当前进程的快照 """
+        if cls._task is not None and not cls._task.done():
+            cls._task.cancel()
+            try:
+                await cls._task
+            except asyncio.CancelledError:
+                pass
+        cls._task = None
+        try:
+            await RedisUtil.hDel(cls.WORKERS_KEY, cls.worker)
+        except Exception as e:
+            logger.warning("MetricsUtil stop failed: %s", e)
+
+    @classmethod
+    async def collect(cls) -> List[dict]:
+        """
+        读取全部进程的快照 (当前进程使用实时数据)
+
+        Returns:
+            List[dict]: 快照列表, 已过期(超过3个推送周期未更新)的进程被忽略并从哈希中删除
+                (异常退出或重新部署的进程不会自行删除)。
+
+        Author:
+            zero
+        """
+        snapshots: List[dict] = [cls.snapshot()]
+        key: str = RedisUtil.get_key(cls.WORKERS_KEY)
+        try:
+            rows = await RedisUtil.raw.hgetall(key)
+        except Exception as e:
+            logger.warning("MetricsUtil collect failed: %s", e)
+            return snapshots
+
+        expired: float = time.time() - cls.push_interval * 3
+        stale: List[bytes] = []
+        for worker, data in rows.items():
+            if worker.decode() == cls.worker:
+                continue
+            try:
+                snap = CodecUtil.decode(data)
+            except ValueError:
+                snap = None
+            if snap and snap.get("time", 0) >= expired:
+                snapshots.append(snap)
+            else:
+                stale.append(worker)
+
+        if stale:
+            try:
+                await RedisUtil.raw.hdel(key, *stale)
+            except Exception as e:
+                logger.warning("MetricsUtil prune failed: %s", e)
+        return snapshots
+
+    @classmethod
+    async def render(cls) -> str:
+        """
+        合并全部进程的指标, 输出Prometheus文本格式
+
+        Returns:
+            str: text/plain; version=0.0.4 格式的指标。
+
+        Author:
+            zero
+        """
+        snapshots: List[dict] = await cls.collect()
+        size: int = len(cls.buckets) + 1
+
+        histograms: Dict[Tuple[str, str, str], list] = {}
+        inflight: Dict[str, int] = {}
+        gauges: Dict[Tuple[str, Tuple[Tuple[str, str], ...]], float] = {}
+        counters: Dict[Tuple[str, Tuple[Tuple[str, str], ...]], float] = {}
+        for snap in snapshots:
+            for method, route, status, counts, total, count in snap["histograms"]:
+                if len(counts) != size:
+                    continue  # 分桶配置不同的旧进程
+                merged = histograms.setdefault((method, route, status), [[0] * size, 0.0, 0])
+                merged[0] = [a + b for a, b in zip(merged[0], counts)]
+                merged[1] += total
+                merged[2] += count
+            for module, value in snap["inflight"].items():
+                inflight[module] = inflight.get(module, 0) + value
+            for target, source in ((gauges, snap["gauges"]), (counters, snap["counters"])):
+                for name, labels, value in source:
+                    key = (name, tuple(tuple(p) for p in labels))
+                    target[key] = target.get(key, 0) + value
+
+        lines: List[str] = [
+            "# HELP http_request_duration_seconds Request latency by route template and status.",
+            "# TYPE http_request_duration_seconds histogram"
+        ]
+        for (method, route, status), (counts, total, count) in sorted(histograms.items()):
+            labels = f'method="{method}",route="{cls._escape(route)}",status="{status}"'
+            cumulative: int = 0
+            for le, n in zip((*cls.buckets, "+Inf"), counts):
+                cumulative += n
+                lines.append(f'http_request_duration_seconds_bucket{{{labels},le="{le}"}} {cumulative}')
+            lines.append(f"http_request_duration_seconds_sum{{{labels}}} {total:.6f}")
+            lines.append(f"http_request_duration_seconds_count{{{labels}}} {count}")
+
+        lines.append("# HELP http_requests_in_flight Requests currently being handled.")
+        lines.append("# TYPE http_requests_in_flight gauge")
+        for module, value in sorted(inflight.items()):
+            lines.append(f'http_requests_in_flight{{module="{cls._escape(module)}"}} {value}')
+
+        lines.append("# HELP app_workers Workers included in this scrape.")
+        lines.append("# TYPE app_workers gauge")
+        lines.append(f"app_workers {len(snapshots)}")
+
+        for kind, values in (("gauge", gauges), ("counter", counters)):
+            typed: set = set()
+            for (name, labels), value in sorted(values.items()):
+                if name not in typed:
+                    typed.add(name)
+                    lines.append(f"# TYPE {name} {kind}")
+                text = ",".join(f'{k}="{cls._escape(str(v))}"' for k, v in labels)
+                lines.append(f"{name}{{{text}}} {value}")
+        return "\n".join(lines) + "\n"
+
+    @classmethod
+    def module_of(cls, path: str) -> str:
+        """ 请求路径所属的模块 (只区分路由别名, 避免标签过多) """
+        module: str = path.strip("/").split("/", 1)[0]
+        return module if module in get_settings().ROUTER_ALIAS.values() else "other"
+
+    @classmethod
+    async def _run(cls):
+        while True:
+            await asyncio.sleep(cls.push_interval)
+            try:
+                await cls.push()
+            except Exception as e:
+                logger.warning("MetricsUtil push failed: %s", e)
+
+    @classmethod
+    def _gauges(cls) -> List[list]:
+        """ 数据库和Redis连接池的状态, 批量写入器的队列长度 """
+        gauges: List[list] = []
+        try:
+            clients = connections.all()
+        except Exception:
+            clients = []
+        for client in clients:
+            pool = getattr(client, "_pool", None)
+            if pool is None:
+                continue
+            name: str = getattr(client, "connection_name", "default")
+            if hasattr(pool, "get_size"):
+                # asyncpg
+                size, free, maxsize = pool.get_size(), pool.get_idle_size(), pool.get_max_size()
+            else:
+                # aiomysql
+                size, free, maxsize = pool.size, pool.freesize, pool.maxsize
+            gauges.append(["db_pool_connections", [["db", name], ["state", "open"]], size])
+            gauges.append(["db_pool_connections", [["db", name], ["state", "idle"]], free])
+            gauges.append(["db_pool_connections", [["db", name], ["state", "max"]], maxsize])
+
+        for name, client in (("decode", RedisUtil.redis), ("raw", RedisUtil.raw)):
+            pool = getattr(client, "connection_pool", None)
+            if pool is None or not hasattr(pool, "_in_use_connections"):
+                continue
+            gauges.append(["redis_pool_connections", [["client", name], ["state", "in_use"]],
+                           len(pool._in_use_connections)])
+            gauges.append(["redis_pool_connections", [["client", name], ["state", "idle"]],
+                           len(pool._available_connections)])
+            gauges.append(["redis_pool_connections", [["client", name], ["state", "max"]],
+                           pool.max_connections])
+
+        for model, stats in BatchWriter.all_stats().items():
+            gauges.append(["batch_writer_pending", [["model", model]], stats["pending"]])
+        return gauges
+
+    @classmethod
+    def _counters(cls) -> List[list]:
+        """ 二级缓存和批量写入器的计数 """
+        counters: List[list] = [
+            ["tiered_cache_events_total", [["event", event]], value]
+            for event, value in TieredCache.stats.items()
+        ]
+        for model, stats in BatchWriter.all_stats().items():
+            for result, value in stats.items():
+                if result == "pending":
+                    continue
+                counters.append(["batch_writer_rows_total", [["model", model], ["result", result]], value])
+        return counters
+
+    @staticmethod
+    def _escape(value: str) -> str:
+        return value.replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
@@ -0,0 +1,165 @@
+# +----------------------------------------------------------------------
+# | WaitAdmin(fastapi)快速开发后台管理系统
+# +----------------------------------------------------------------------
+# | 欢迎阅读学习程序代码,建议反馈是我们前进的动力
+# | 程序完全开源可支持商用,允许去除界面版权信息
+# | gitee:   https://gitee.com/wafts/waitadmin-python
+# | github:  https://github.com/topwait/waitadmin-python
+# | 官方网站: https://www.waitadmin.cn
+# | WaitAdmin团队版权所有并拥有最终解释权
+# +----------------------------------------------------------------------
+# | Author: WaitAdmin Team <2474369941@qq.com>
+# +----------------------------------------------------------------------
+import re
+import sys
+import time
+import logging
+import functools
+import importlib
+from collections import Counter, deque
+from contextvars import ContextVar, Token
+from typing import List, Deque, Optional, Iterable
+
+logger = logging.getLogger(__name__)
+
+__all__ = ["QueryProfile", "QueryProfiler"]
+
+
+class QueryProfile:
+    """ 单个请求的查询统计 """
+
+    __slots__ = ("method", "path", "route", "count", "elapsed", "shapes", "closed")
+
+    def __init__(self, method: str, path: str):
+        self.method: str = method
+        self.path: str = path
+        self.route: str = path
+        self.count: int = 0
+        self.elapsed: float = 0.0
+        self.shapes: Counter = Counter()
+        self.closed: bool = False
+
+    def repeated(self, threshold: int) -> List[dict]:
+        """ 重复执行次数达到阈值的查询结构 (疑似N+1) """
+        return [{"sql": sql, "times": n} for sql, n in self.shapes.most_common() if n >= threshold]
+
+    def summary(self, threshold: int) -> dict:
+        return {
+            "method": self.method,
+            "path": self.path,
+            "route": self.route,
+            "queries": self.count,
+            "db_ms": round(self.elapsed * 1000, 3),
+            "repeated": self.repeated(threshold)
+        }
+
+
+class QueryProfiler:
+    """
+    ORM查询分析 (按需开启, 见配置 PROFILER)
+
+    在数据库客户端的 execute_* 方法外包一层计时, 查询计入当前请求的 QueryProfile:
+    记录查询次数、数据库总耗时和每种查询结构(去掉字面量和IN列表长度)的次数。
+    请求结束时查询次数超过 query_budget, 或同一结构重复 repeat_threshold 次以上(疑似N+1)时输出警告。
+    """
+
+    METHODS = ("execute_query", "execute_query_dict", "execute_insert", "execute_many", "execute_script")
+
+    query_budget: int = 30
+    repeat_threshold: int = 5
+    history: Deque[dict] = deque(maxlen=50)
+
+    _current: ContextVar[Optional[QueryProfile]] = ContextVar("query_profile", default=None)
+    _nested: ContextVar[bool] = ContextVar("query_profile_nested", default=False)
+
+    _literals = re.compile(r"'(?:[^'\\]|\\.)*'|\b\d+(?:\.\d+)?\b")
+    _in_lists = re.compile(r"\bIN\s*\((?:\s*(?:\?|%s|\$\d+)\s*,?)+\)", re.I)
+
+    @classmethod
+    def install(cls, engines: Iterable[str]):
+        """
+        给数据库客户端类的查询方法加上计时 (重复调用无影响)
+
+        Args:
+            engines (Iterable[str]): Tortoise引擎模块, 如 tortoise.backends.mysql。
+
+        Author:
+            zero
+        """
+        for engine in engines:
+            client_class = getattr(importlib.import_module(engine), "client_class", None)
+            if client_class is None:
+                continue
+            wrapper_class = getattr(sys.modules[client_class.__module__], "TransactionWrapper", None)
+            for clz in (client_class, wrapper_class):
+                for name in cls.METHODS:
+                    func = clz.__dict__.get(name) if clz else None
+                    if func is not None and not getattr(func, "__profiled__", False):
+                        setattr(clz, name, cls._wrap(func))
+
+    @classmethod
+    def begin(cls, method: str, path: str) -> Token:
+        """ 开始记录当前请求 """
+        return cls._current.set(QueryProfile(method, path))
+
+    @classmethod
+    def end(cls, token: Token, route: str = None) -> QueryProfile:
+        """
+        结束记录当前请求, 超出预算或疑似N+1时输出警告
+
+        Args:
+            token (Token): begin() 的返回值。
+            route (str): 路由模板, 用于警告信息。
+
+        Returns:
+            QueryProfile: 当前请求的查询统计。
+
+        Author:
+            zero
+        """
+        profile: QueryProfile = cls._current.get()
+        cls._current.reset(token)
+        profile.closed = True
+        profile.route = route or profile.path
+
+        repeated: List[dict] = profile.repeated(cls.repeat_threshold)
+        if profile.count > cls.query_budget or repeated:
+            logger.warning(
+                "%s %s: %d queries in %.1fms (budget %d)%s",
+                profile.method, profile.route, profile.count, profile.elapsed * 1000, cls.query_budget,
+                "".join(f"\n    x{r['times']} {r['sql']}" for r in repeated)
+            )
+        if profile.count:
+            cls.history.append(profile.summary(cls.repeat_threshold))
+        return profile
+
+    @classmethod
+    def current(cls) -> Optional[QueryProfile]:
+        return cls._current.get()
+
+    @classmethod
+    def shape(cls, sql: str) -> str:
+        """ 查询结构: 字面量替换为?, IN列表合并为 IN (...) """
+        sql = cls._literals.sub("?", sql)
+        return cls._in_lists.sub("IN (...)", sql)
+
+    @classmethod
+    def _wrap(cls, func):
+        @functools.wraps(func)
+        async def wrapper(self, query: str, *args, **kwargs):
+            profile: Optional[QueryProfile] = cls._current.get()
+            if profile is None or profile.closed or cls._nested.get():
+                return await func(self, query, *args, **kwargs)
+
+            token = cls._nested.set(True)
+            start: float = time.perf_counter()
+            try:
+                return await func(self, query, *args, **kwargs)
+            finally:
+                profile.elapsed += time.perf_counter() - start
+                profile.count += 1
+                profile.shapes[cls.shape(query)] += 1
+                cls._nested.reset(token)
+
+        wrapper.__profiled__ = True
+        return wrapper
@@ -0,0 +1,284 @@
+# +----------------------------------------------------------------------
+# | WaitAdmin(fastapi)快速开发后台管理系统
+# +----------------------------------------------------------------------
+# | 欢迎阅读学习程序代码,建议反馈是我们前进的动力
+# | 程序完全开源可支持商用,允许去除界面版权信息
+# | gitee:   https://gitee.com/wafts/waitadmin-python
+# | github:  https://github.com/topwait/waitadmin-python
+# | 官方网站: https://www.waitadmin.cn
+# | WaitAdmin团队版权所有并拥有最终解释权
+# +----------------------------------------------------------------------
+# | Author: WaitAdmin Team <2474369941@qq.com>
+# +----------------------------------------------------------------------
+import time
+import zlib
+import bisect
+import random
+import asyncio
+import logging
+from typing import Dict, List, Tuple, Union, Iterable, Optional, Sequence
+from fastapi import Request
+from hypertext import PagingResult
+from common.enums.cache import CacheTagEnum
+from common.models.commodity import Commodity as CommodityModel
+from common.utils.cache import ResponseCache
+
+logger = logging.getLogger(__name__)
+
+__all__ = ["SamplerUtil"]
+
+_MASK64 = (1 << 64) - 1
+
+
+def _mix(x: int, seed: int, rnd: int) -> int:
+    """ splitmix64 混合函数 (跨进程稳定, 不使用内置hash) """
+    z = (x * 0x9E3779B97F4A7C15 + seed * 0xBF58476D1CE4E5B9 + rnd) & _MASK64
+    z = ((z ^ (z >> 30)) * 0xBF58476D1CE4E5B9) & _MASK64
+    z = ((z ^ (z >> 27)) * 0x94D049BB133111EB) & _MASK64
+    return z ^ (z >> 31)
+
+
+def _permute(index: int, n: int, seed: int) -> int:
+    """
+    [0, n) 上由 seed 决定的伪随机置换
+
+    在 2^bits (bits为偶数且 2^bits < 4n) 上做4轮Feistel变换,
+    结果落在 [0, n) 之外时继续变换(cycle walking), 平均不超过4次。
+    """
+    bits: int = max(2, (n - 1).bit_length())
+    bits += bits & 1
+    half: int = bits // 2
+    mask: int = (1 << half) - 1
+    x: int = index
+    while True:
+        left, right = x >> half, x & mask
+        for rnd in range(4):
+            left, right = right, left ^ (_mix(right, seed, rnd) & mask)
+        x = (left << half) | right
+        if x < n:
+            return x
+
+
+class SamplerUtil:
+    """
+    商品随机抽样
+
+    每个进程在内存中持有上架商品的ID池 (一次查询 id/cid/is_recommend/is_topping 构建):
+        all          全部上架商品
+        recommend    推荐商品
+        topping      置顶商品
+        cid:{id}     某分类下的商品
+
+    以商品响应缓存标签(cache:tag:commodity)的版本号判断ID池是否过期, 后台增删改商品时已自增该版本;
+    另外最长 max_age 秒整体重建一次, 覆盖直接修改数据库的情况。
+
+    抽样只访问ID池中的k个位置, 再按ID查询这k条记录, 不再对整表执行 ORDER BY RAND()。
+    分页使用由种子决定的伪随机置换: 同一个种子的各页顺序一致且互不重复。
+    """
+
+    ALL: str = "all"
+    RECOMMEND: str = "recommend"
+    TOPPING: str = "topping"
+
+    check_interval: float = 1.0   # 检查版本号的间隔(秒)
+    max_age: float = 600          # ID池最长使用时间(秒)
+
+    _pools: Optional[Dict[str, Tuple[int, ...]]] = None
+    _version: Optional[str] = None
+    _built_at: float = 0
+    _checked_at: float = 0
+    _lock: asyncio.Lock = asyncio.Lock()
+
+    @staticmethod
+    def category(cid: int) -> str:
+        """ 分类的ID池名称 """
+        return f"cid:{cid}"
+
+    @classmethod
+    async def pool(cls, scope: str) -> Tuple[int, ...]:
+        """
+        获取ID池
+
+        Args:
+            scope (str): ID池名称, 见类说明。
+
+        Returns:
+            Tuple[int, ...]: 按ID升序的商品ID, 不存在时为空。
+
+        Author:
+            zero
+        """
+        return (await cls._load()).get(scope, ())
+
+    @classmethod
+    async def sample(cls, scopes: Union[str, Iterable[str]], k: int, exclude: Iterable[int] = ()) -> List[int]:
+        """
+        随机抽取k个商品ID (不重复)
+
+        多个ID池按拼接后的整体抽样, 不实际拼接, 复杂度 O(k·log m)。
+
+        Args:
+            scopes (Union[str, Iterable[str]]): ID池名称。
+            k (int): 抽取数量。
+            exclude (Iterable[int]): 需要排除的商品ID。
+
+        Returns:
+            List[int]: 商品ID, 数量不足时返回全部。
+
+        Author:
+            zero
+        """
+        pools: Dict[str, Tuple[int, ...]] = await cls._load()
+        names: List[str] = [scopes] if isinstance(scopes, str) else list(dict.fromkeys(scopes))
+        parts: List[Tuple[int, ...]] = [pools[s] for s in names if pools.get(s)]
+
+        offsets: List[int] = []
+        total: int = 0
+        for part in parts:
+            offsets.append(total)
+            total += len(part)
+
+        excluded = set(exclude)
+        draw: int = min(total, k + len(excluded))
+        ids: List[int] = []
+        for pos in random.sample(range(total), draw):
+            i: int = bisect.bisect_right(offsets, pos) - 1
+            id_: int = parts[i][pos - offsets[i]]
+            if id_ not in excluded:
+                ids.append(id_)
+        return ids[:k]
+
+    @classmethod
+    async def page(cls, scope: str, seed: int, page_no: int, page_size: int) -> Tuple[List[int], int]:
+        """
+        按种子随机排列后的一页商品ID
+
+        Args:
+            scope (str): ID池名称。
+            seed (int): 随机种子, 同一个种子的各页顺序一致且互不重复。
+            page_no (int): 页码。
+            page_size (int): 每页数量。
+
+        Returns:
+            Tuple[List[int], int]: (当前页的商品ID, ID池总数)
+
+        Author:
+            zero
+        """
+        pool: Tuple[int, ...] = await cls.pool(scope)
+        n: int = len(pool)
+        start: int = max(page_no - 1, 0) * page_size
+        end: int = min(start + page_size, n)
+        return [pool[_permute(i, n, seed)] for i in range(start, end)], n
+
+    @classmethod
+    async def paginate(cls,
+                       scope: str,
+                       seed: int,
+                       page_no: int,
+                       page_size: int,
+                       fields: Sequence[str]) -> PagingResult[dict]:
+        """
+        随机排列的商品分页 (与 DbModel.paginate 的返回格式一致)
+
+        Args:
+            scope (str): ID池名称。
+            seed (int): 随机种子。
+            page_no (int): 页码。
+            page_size (int): 每页数量。
+            fields (Sequence[str]): 查询的字段。
+
+        Returns:
+            PagingResult[dict]: 分页结果。
+
+        Author:
+            zero
+        """
+        ids, total = await cls.page(scope, seed, page_no, page_size)
+        rows: List[dict] = await cls.values(ids, fields)
+        return CommodityModel.paginate_rows(rows, total, page_no, page_size)
+
+    @classmethod
+    async def values(cls, ids: List[int], fields: Sequence[str]) -> List[dict]:
+        """
+        按ID查询上架商品, 保持传入ID的顺序
+
+        Args:
+            ids (List[int]): 商品ID。
+            fields (Sequence[str]): 查询的字段。
+
+        Returns:
+            List[dict]: 商品记录, ID池构建后下架或删除的商品会被跳过。
+
+        Author:
+            zero
+        """
+        if not ids:
+            return []
+        fields = list(fields) if "id" in fields else ["id", *fields]
+        rows = await CommodityModel.filter(id__in=ids, is_show=1, is_delete=0).values(*fields)
+        mapping: Dict[int, dict] = {r["id"]: r for r in rows}
+        return [mapping[i] for i in ids if i in mapping]
+
+    @classmethod
+    def session_seed(cls, request: Request, seed: Optional[int] = None) -> int:
+        """
+        获取会话的随机种子
+
+        客户端传入种子时直接使用; 否则由用户ID(未登录为IP)、UA和日期生成,
+        同一访客当天翻页得到一致的随机顺序。
+
+        Args:
+            request (Request): 请求对象。
+            seed (Optional[int]): 客户端传入的种子。
+
+        Returns:
+            int: 随机种子。
+
+        Author:
+            zero
+        """
+        if seed is not None:
+            return seed
+        user_id: int = getattr(request.state, "user_id", 0) or 0
+        visitor: str = f"u{user_id}" if user_id else f"ip{request.client.host if request.client else ''}"
+        agent: str = request.headers.get("user-agent", "")
+        return zlib.crc32(f"{visitor}|{agent}|{time.strftime('%Y-%m-%d')}".encode("utf-8"))
+
+    @classmethod
+    async def _load(cls) -> Dict[str, Tuple[int, ...]]:
+        """ 获取当前的ID池, 版本变化或超过 max_age 时重建 """
+        now: float = time.monotonic()
+        if cls._pools is not None and now - cls._checked_at < cls.check_interval:
+            return cls._pools
+
+        async with cls._lock:
+            now = time.monotonic()
+            if cls._pools is not None and now - cls._checked_at < cls.check_interval:
+                return cls._pools
+
+            version: str = await ResponseCache.versions((CacheTagEnum.COMMODITY,))
+            if cls._pools is None or version != cls._version or now - cls._built_at >= cls.max_age:
+                cls._pools = await cls._build()
+                cls._version = version
+                cls._built_at = now
+            cls._checked_at = now
+        return cls._pools
+
+    @classmethod
+    async def _build(cls) -> Dict[str, Tuple[int, ...]]:
+        """ 从数据库构建全部ID池 """
+        rows = await (CommodityModel
+                      .filter(is_show=1, is_delete=0)
+                      .order_by("id")
+                      .values_list("id", "cid", "is_recommend", "is_topping"))
+
+        pools: Dict[str, List[int]] = {cls.ALL: [], cls.RECOMMEND: [], cls.TOPPING: []}
+        for id_, cid, is_recommend, is_topping in rows:
+            pools[cls.ALL].append(id_)
+            pools.setdefault(cls.category(cid), []).append(id_)
+            if is_recommend:
+                pools[cls.RECOMMEND].append(id_)
+            if is_topping:
+                pools[cls.TOPPING].append(id_)
+        return {scope: tuple(ids) for scope, ids in pools.items()}
@@ -0,0 +1,304 @@
+# +----------------------------------------------------------------------
+# | WaitAdmin(fastapi)快速开发后台管理系统
+# +----------------------------------------------------------------------
+# | 欢迎阅读学习程序代码,建议反馈是我们前进的动力
+# | 程序完全开源可支持商用,允许去除界面版权信息
+# | gitee:   https://gitee.com/wafts/waitadmin-python
+# | github:  https://github.com/topwait/waitadmin-python
+# | 官方网站: https://www.waitadmin.cn
+# | WaitAdmin团队版权所有并拥有最终解释权
+# +----------------------------------------------------------------------
+# | Author: WaitAdmin Team <2474369941@qq.com>
+# +----------------------------------------------------------------------
+import re
+import sys
+import json
+import math
+import time
+import asyncio
+import logging
+from collections import Counter
+from typing import Dict, List, Tuple, Type, Union, Iterable, Optional
+from tortoise import Model
+from tortoise.expressions import Q
+from common.models.article import ArticleModel
+from common.models.commodity import Commodity as CommodityModel
+from common.utils.cache import RedisUtil, SingleFlight
+
+logger = logging.getLogger(__name__)
+
+__all__ = ["SearchUtil", "SearchSource"]
+
+# CJK统一表意文字(含扩展A/兼容)、假名、谚文 按字切分, 其余按字母数字词切分
+_TOKEN_RE = re.compile(r"[\u3040-\u30ff\u3400-\u4dbf\u4e00-\u9fff\uac00-\ud7af\uf900-\ufaff]+|[a-z0-9]+")
+
+
+class SearchSource:
+    """
+    可搜索的数据源
+
+    Args:
+        model (Type[Model]): 模型。
+        fields (Dict[str, int]): 参与索引的文本字段及权重(词频按权重累加)。
+        where (Q): 进入索引的记录条件(如已上架、未删除)。
+        attrs (Tuple[str, ...]): 随倒排记录保存的过滤字段, 检索时无需回表即可过滤。
+    """
+
+    def __init__(self, model: Type[Model], fields: Dict[str, int], where: Q, attrs: Tuple[str, ...] = ()):
+        self.model = model
+        self.fields = fields
+        self.where = where
+        self.attrs = attrs
+
+
+class SearchUtil:
+    """
+    全文检索 (倒排索引 + BM25排序)
+
+    缓存结构 (name为数据源名称):
+        search:{name}:t:{term}  = Hash{id: "词频:文档长度:过滤字段..."}   倒排记录
+        search:{name}:doc       = Hash{id: json{"l": 长度, "t": [词项]}}   正排记录, 用于增量更新时删除旧词项
+        search:{name}:meta      = Hash{docs, length, built}              文档数、总长度、构建时间
+
+    分词: 中日韩文字按连续片段切分为单字和二元组(查询时片段超过1个字只用二元组),
+    拉丁字母和数字按词切分并转为小写。
+    后台增删改记录后调用 refresh 增量更新; 首次检索时若索引尚未构建, 从数据库整体构建。
+    """
+
+    SOURCES: Dict[str, SearchSource] = {
+        "commodity": SearchSource(
+            model=CommodityModel,
+            fields={"title": 2, "intro": 1},
+            where=Q(is_show=1, is_delete=0),
+            attrs=("cid", "price")
+        ),
+        "article": SearchSource(
+            model=ArticleModel,
+            fields={"title": 2, "intro": 1},
+            where=Q(is_delete=0),
+            attrs=("cid",)
+        ),
+    }
+
+    KEY: str = "search:"
+
+    k1: float = 1.2
+    b: float = 0.75
+    min_match: float = 0.75     # 文档至少包含的查询词项比例
+    max_results: int = 1000     # 单次检索返回的最大数量
+    batch_size: int = 1000      # 构建索引时每批读取的记录数
+
+    @classmethod
+    def tokenize(cls, text: str, query: bool = False) -> List[str]:
+        """
+        分词
+
+        Args:
+            text (str): 文本。
+            query (bool): 是否为查询词(查询时多字片段只取二元组)。
+
+        Returns:
+            List[str]: 词项(可重复)。
+
+        Author:
+            zero
+        """
+        terms: List[str] = []
+        for run in _TOKEN_RE.findall((text or "").lower()):
+            if run[0] < "\u3040":
+                terms.append(run)
+                continue
+            if not query or len(run) == 1:
+                terms.extend(run)
+            terms.extend(run[i:i + 2] for i in range(len(run) - 1))
+        return terms
+
+    @classmethod
+    async def search(cls,
+                     name: str,
+                     keyword: str,
+                     cid: Union[int, Iterable[int], None] = None,
+                     min_price: Optional[float] = None,
+                     max_price: Optional[float] = None,
+                     limit: int = None) -> List[int]:
+        """
+        检索
+
+        Args:
+            name (str): 数据源名称, 见 SOURCES。
+            keyword (str): 关键词。
+            cid (Union[int, Iterable[int], None]): 分类ID。
+            min_price (Optional[float]): 最低价格(数据源带price字段时有效)。
+            max_price (Optional[float]): 最高价格(数据源带price字段时有效)。
+            limit (int): 返回的最大数量, 默认 max_results。
+
+        Returns:
+            List[int]: 按相关度降序的记录ID。
+
+        Author:
+            zero
+        """
+        source: SearchSource = cls.SOURCES[name]
+        terms: List[str] = list(dict.fromkeys(cls.tokenize(keyword, query=True)))
+        if not terms:
+            return []
+        prefix: str = cls.KEY + name
+        for _ in range(2):
+            async with RedisUtil.pipeline() as pipe:
+                pipe.hmget(f"{prefix}:meta", ["docs", "length", "built"])
+                for term in terms:
+                    pipe.hgetall(f"{prefix}:t:{term}")
+                (docs, length, built), *postings = await pipe.execute()
+            if built:
+                break
+            await cls.ensure(name)
+
+        n: int = int(docs or 0)
+        avg_len: float = (int(length or 0) / n) if n else 1.0
+        cids = None if cid is None else ({int(cid)} if isinstance(cid, int) else {int(c) for c in cid})
+        cid_at: int = source.attrs.index("cid") + 2 if "cid" in source.attrs else -1
+        price_at: int = source.attrs.index("price") + 2 if "price" in source.attrs else -1
+
+        scores: Dict[int, float] = {}
+        matched: Counter = Counter()
+        for posting in postings:
+            if not posting:
+                continue
+            idf: float = math.log(1 + (n - len(posting) + 0.5) / (len(posting) + 0.5))
+            for doc_id, value in posting.items():
+                parts: List[str] = value.split(":")
+                if cids is not None and cid_at > 0 and int(parts[cid_at]) not in cids:
+                    continue
+                if price_at > 0 and (min_price is not None or max_price is not None):
+                    price: float = float(parts[price_at])
+                    if (min_price is not None and price < min_price) or (max_price is not None and price > max_price):
+                        continue
+                tf, dl = int(parts[0]), int(parts[1])
+                id_: int = int(doc_id)
+                scores[id_] = scores.get(id_, 0.0) + idf * tf * (cls.k1 + 1) / (
+                    tf + cls.k1 * (1 - cls.b + cls.b * dl / avg_len))
+                matched[id_] += 1
+
+        need: int = max(1, math.ceil(len(terms) * cls.min_match))
+        ranked = sorted((i for i in scores if matched[i] >= need), key=lambda i: (-scores[i], -i))
+        return ranked[:limit or cls.max_results]
+
+    @classmethod
+    async def refresh(cls, name: str, *ids: int):
+        """
+        增量更新记录的索引 (记录不存在或不满足条件时从索引删除)
+
+        Args:
+            name (str): 数据源名称。
+            ids (int): 记录ID。
+
+        Author:
+            zero
+        """
+        prefix: str = cls.KEY + name
+        try:
+            if not await RedisUtil.redis.hexists(RedisUtil.get_key(f"{prefix}:meta"), "built"):
+                return  # 尚未构建: 首次检索时整体构建
+            source: SearchSource = cls.SOURCES[name]
+            fields = ["id", *source.fields, *source.attrs]
+            rows = await source.model.filter(source.where, id__in=ids).values(*fields)
+            found: Dict[int, dict] = {r["id"]: r for r in rows}
+            olds = await RedisUtil.redis.hmget(RedisUtil.get_key(f"{prefix}:doc"), [str(i) for i in ids])
+
+            async with RedisUtil.pipeline(transaction=True) as pipe:
+                for id_, old in zip(ids, olds):
+                    if old:
+                        old = json.loads(old)
+                        for term in old["t"]:
+                            pipe.hdel(f"{prefix}:t:{term}", str(id_))
+                        pipe.hdel(f"{prefix}:doc", str(id_))
+                        pipe.hincrby(f"{prefix}:meta", "docs", -1)
+                        pipe.hincrby(f"{prefix}:meta", "length", -old["l"])
+                    if id_ in found:
+                        cls._write(pipe, prefix, source, found[id_])
+                await pipe.execute()
+        except Exception as e:
+            logger.warning("SearchUtil refresh %s %s failed: %s", name, ids, e)
+
+    @classmethod
+    async def ensure(cls, name: str):
+        """ 索引尚未构建时从数据库构建 (多进程只构建一次) """
+        meta_key: str = RedisUtil.get_key(f"{cls.KEY}{name}:meta")
+        if await RedisUtil.redis.hexists(meta_key, "built"):
+            return
+
+        async def build():
+            if not await RedisUtil.redis.hexists(meta_key, "built"):
+                await cls.rebuild(name)
+
+        await SingleFlight.do(f"search:build:{name}", build, distributed=True, ttl=120)
+
+    @classmethod
+    async def rebuild(cls, name: str) -> int:
+        """
+        从数据库整体重建索引
+
+        Args:
+            name (str): 数据源名称。
+
+        Returns:
+            int: 索引的记录数。
+
+        Author:
+            zero
+        """
+        source: SearchSource = cls.SOURCES[name]
+        prefix: str = cls.KEY + name
+        fields = ["id", *source.fields, *source.attrs]
+        await RedisUtil.unlink_pattern(f"{prefix}:*")
+
+        total: int = 0
+        last_id: int = 0
+        while True:
+            rows = await (source.model
+                          .filter(source.where, id__gt=last_id)
+                          .order_by("id")
+                          .limit(cls.batch_size)
+                          .values(*fields))
+            if not rows:
+                break
+            async with RedisUtil.pipeline() as pipe:
+                for row in rows:
+                    cls._write(pipe, prefix, source, row)
+                await pipe.execute()
+            total += len(rows)
+            last_id = rows[-1]["id"]
+
+        await RedisUtil.redis.hset(RedisUtil.get_key(f"{prefix}:meta"), "built", int(time.time()))
+        logger.info("SearchUtil rebuilt %s: %d documents", name, total)
+        return total
+
+    @classmethod
+    def _write(cls, pipe, prefix: str, source: SearchSource, row: dict):
+        """ 写入一条记录的倒排/正排记录 """
+        counts: Counter = Counter()
+        for field, weight in source.fields.items():
+            for term in cls.tokenize(row.get(field) or ""):
+                counts[term] += weight
+        length: int = sum(counts.values())
+        attrs: str = "".join(f":{row.get(a) or 0}" for a in source.attrs)
+        for term, tf in counts.items():
+            pipe.hset(f"{prefix}:t:{term}", str(row["id"]), f"{tf}:{length}{attrs}")
+        pipe.hset(f"{prefix}:doc", str(row["id"]), json.dumps({"l": length, "t": list(counts)}, ensure_ascii=False))
+        pipe.hincrby(f"{prefix}:meta", "docs", 1)
+        pipe.hincrby(f"{prefix}:meta", "length", length)
+
+
+async def __main(names: List[str]):
+    from tortoise import Tortoise
+    from kernels.database import db_configs
+    await Tortoise.init(config=db_configs())
+    try:
+        for name in names or list(SearchUtil.SOURCES):
+            print(f"{name}: {await SearchUtil.rebuild(name)} documents")
+    finally:
+        await Tortoise.close_connections()
+
+
+if __name__ == "__main__":
+    asyncio.run(__main(sys.argv[1:]))
@@ -0,0 +1,327 @@
+# +----------------------------------------------------------------------
+# | WaitAdmin(fastapi)快速开发后台管理系统
+# +----------------------------------------------------------------------
+# | 欢迎阅读学习程序代码,建议反馈是我们前进的动力
+# | 程序完全开源可支持商用,允许去除界面版权信息
+# | gitee:   https://gitee.com/wafts/waitadmin-python
+# | github:  https://github.com/topwait/waitadmin-python
+# | 官方网站: https://www.waitadmin.cn
+# | WaitAdmin团队版权所有并拥有最终解释权
+# +----------------------------------------------------------------------
+# | Author: WaitAdmin Team <2474369941@qq.com>
+# +----------------------------------------------------------------------
+import time
+import asyncio
+import logging
+from decimal import Decimal
+from typing import Dict, List, Set, Optional
+from tortoise.functions import Count, Min, Sum
+from common.enums.market import PayStatusEnum
+from common.models.stat import StatDailyModel
+from common.models.users import UserModel, UserVisitorModel
+from common.models.article import ArticleModel
+from common.models.market import MainOrderModel
+from common.utils.cache import RedisUtil
+from common.utils.times import TimeUtil
+
+logger = logging.getLogger(__name__)
+
+__all__ = ["StatsUtil"]
+
+
+class StatsUtil:
+    """
+    访问统计
+
+    缓存结构:
+        stats:visit:{Y-m-d}  = Hash{pv, chrome, firefox, ...}   当日访问量及各UA访问量
+        stats:uv:{Y-m-d}     = HyperLogLog                     当日访客 (用户ID, 未登录为IP)
+
+    记录访问时只在进程内累加, 每 flush_interval 秒一次管道写入Redis;
+    定时任务(crontab.stats, 迁移 v0002 登记)将Redis计数和数据库的新增用户/文章/成交额压缩到 StatDailyModel,
+    控制台只读取统计行和今天的Redis计数, 与访问记录的数量无关。
+    """
+
+    UA_LIST = ("chrome", "firefox", "ie", "safari", "wechat", "other")
+    VISIT_KEY: str = "stats:visit:"
+    UV_KEY: str = "stats:uv:"
+
+    keep_days: int = 8            # Redis计数保留天数
+    flush_interval: float = 2.0   # 进程内计数写入间隔(秒)
+
+    _counts: Dict[str, Dict[str, int]] = {}
+    _visitors: Dict[str, Set[str]] = {}
+    _task: Optional[asyncio.Task] = None
+
+    @classmethod
+    def record_visit(cls, user_id: int, ip: str, ua: str, timestamp: int = None):
+        """
+        记录一次访问 (不等待写入)
+
+        Args:
+            user_id (int): 用户ID, 未登录为0。
+            ip (str): 访问IP。
+            ua (str): 浏览器类型, 见 ToolsUtil.to_user_agent。
+            timestamp (int): 访问时间, 默认为当前时间。
+
+        Author:
+            zero
+        """
+        date: str = TimeUtil.timestamp_to_date(timestamp or int(time.time()), "%Y-%m-%d")
+        counts: Dict[str, int] = cls._counts.setdefault(date, {})
+        counts["pv"] = counts.get("pv", 0) + 1
+        ua = ua if ua in cls.UA_LIST else "other"
+        counts[ua] = counts.get(ua, 0) + 1
+        cls._visitors.setdefault(date, set()).add(f"u{user_id}" if user_id else f"ip{ip}")
+
+        if cls._task is None or cls._task.done():
+            cls._task = asyncio.create_task(cls._flush_later())
+
+    @classmethod
+    async def _flush_later(cls):
+        await asyncio.sleep(cls.flush_interval)
+        await cls.flush()
+
+    @classmethod
+    async def flush(cls):
+        """ 进程内的计数写入Redis (一次往返) """
+        counts, visitors = cls._counts, cls._visitors
+        if not counts and not visitors:
+            return
+        cls._counts, cls._visitors = {}, {}
+
+        ttl: int = cls.keep_days * 86400
+        try:
+            async with RedisUtil.pipeline() as pipe:
+                for date, values in counts.items():
+                    for field, amount in values.items():
+                        pipe.hincrby(cls.VISIT_KEY + date, field, amount)
+                    pipe.expire(cls.VISIT_KEY + date, ttl)
+                for date, members in visitors.items():
+                    pipe.pfadd(cls.UV_KEY + date, *members)
+                    pipe.expire(cls.UV_KEY + date, ttl)
+                await pipe.execute()
+        except Exception as e:
+            logger.warning("StatsUtil flush failed: %s", e)
+
+    @classmethod
+    async def live(cls, date: str) -> Optional[dict]:
+        """
+        读取Redis中某天的访问计数
+
+        Args:
+            date (str): 日期 (Y-m-d)。
+
+        Returns:
+            Optional[dict]: {"pv": int, "uv": int, "ua": {ua: int}}, 没有计数时返回None。
+
+        Author:
+            zero
+        """
+        async with RedisUtil.pipeline() as pipe:
+            pipe.hgetall(cls.VISIT_KEY + date)
+            pipe.pfcount(cls.UV_KEY + date)
+            values, uv = await pipe.execute()
+
+        if not values:
+            return None
+        return {
+            "pv": int(values.get("pv", 0)),
+            "uv": int(uv or 0),
+            "ua": {ua: int(values.get(ua, 0)) for ua in cls.UA_LIST}
+        }
+
+    @classmethod
+    async def compact(cls, date: str) -> StatDailyModel:
+        """
+        汇总某天的统计行 (已存在时更新)
+
+        访问计数取自Redis, 计数已过期(或功能上线前)的日期从访问记录表补算;
+        新增用户/文章和成交额按当天的时间范围从数据库汇总。
+
+        Args:
+            date (str): 日期 (Y-m-d)。
+
+        Returns:
+            StatDailyModel: 统计行。
+
+        Author:
+            zero
+        """
+        start_time: int = TimeUtil.date_to_timestamp(date, "%Y-%m-%d")
+        end_time: int = start_time + 86400 - 1
+
+        visit = await cls.live(date) or await cls._visit_from_logs(start_time, end_time)
+        new_users: int = await UserModel.filter(create_time__gte=start_time, create_time__lte=end_time).count()
+        new_articles: int = await ArticleModel.filter(create_time__gte=start_time, create_time__lte=end_time).count()
+        paid = await (MainOrderModel
+                      .filter(pay_status=PayStatusEnum.PAID, pay_time__gte=start_time, pay_time__lte=end_time)
+                      .annotate(orders=Count("id"), gmv=Sum("actual_pay_amount"))
+                      .first()
+                      .values("orders", "gmv"))
+
+        values = {
+            "pv": visit["pv"],
+            "uv": visit["uv"],
+            **{f"ua_{ua}": visit["ua"][ua] for ua in cls.UA_LIST},
+            "new_users": new_users,
+            "new_articles": new_articles,
+            "orders": int((paid or {}).get("orders") or 0),
+            "gmv": Decimal(str((paid or {}).get("gmv") or 0)),
+            "update_time": int(time.time())
+        }
+        row, _ = await StatDailyModel.update_or_create(
+            defaults=values,
+            date=date
+        )
+        if not row.create_time:
+            row.create_time = row.update_time
+            await row.save(update_fields=["create_time"])
+        return row
+
+    @classmethod
+    async def compact_recent(cls, days: int = 2) -> int:
+        """
+        汇总最近几天的统计行 (定时任务调用)
+
+        Args:
+            days (int): 天数, 包含今天。
+
+        Returns:
+            int: 汇总的天数。
+
+        Author:
+            zero
+        """
+        await cls.flush()
+        dates: List[str] = TimeUtil.near_to_date(days)
+        for date in dates:
+            await cls.compact(date)
+        return len(dates)
+
+    @classmethod
+    async def daily(cls, days: int = 7) -> List[dict]:
+        """
+        最近几天的统计 (按日期升序)
+
+        只读取统计行, 不在请求中汇总: 统计行由定时任务(crontab.stats)汇总, 尚未汇总的日期为0;
+        今天的访问量/访客/UA实时读取Redis, 其余字段为最近一次汇总的值。
+
+        Args:
+            days (int): 天数, 包含今天。
+
+        Returns:
+            List[dict]: 每天一条, 字段同 StatDailyModel。
+
+        Author:
+            zero
+        """
+        dates: List[str] = TimeUtil.near_to_date(days)
+        today: str = dates[-1]
+        fields = [f for f in StatDailyModel._meta.db_fields if f not in ("id", "create_time")]
+        rows: Dict[str, dict] = {
+            r["date"]: r for r in await StatDailyModel.filter(date__in=dates).values(*fields)
+        }
+        for date in dates:
+            if date not in rows:
+                rows[date] = cls._empty_row(date)
+
+        visit = await cls.live(today)
+        if visit is not None:
+            rows[today].update({"pv": visit["pv"], "uv": visit["uv"]})
+            rows[today].update({f"ua_{ua}": visit["ua"][ua] for ua in cls.UA_LIST})
+        return [rows[d] for d in dates]
+
+    @classmethod
+    def _empty_row(cls, date: str) -> dict:
+        """ 尚未汇总的日期 """
+        row: dict = {f: 0 for f in StatDailyModel._meta.db_fields if f not in ("id", "create_time")}
+        row.update({"date": date, "gmv": Decimal(0)})
+        return row
+
+    @classmethod
+    async def backfill(cls, limit: int = 90) -> int:
+        """
+        补齐历史统计行 (定时任务调用)
+
+        从最早的用户/访问/文章/支付记录所在日期到昨天, 汇总没有统计行或在当天结束前汇总的日期,
+        每次最多 limit 天(从最早的开始), 多次执行后历史全部补齐, 之后只是几条索引查询。
+
+        Args:
+            limit (int): 本次最多汇总的天数。
+
+        Returns:
+            int: 汇总的天数。
+
+        Author:
+            zero
+        """
+        firsts = [
+            await UserModel.annotate(t=Min("create_time")).first().values("t"),
+            await UserVisitorModel.annotate(t=Min("create_time")).first().values("t"),
+            await ArticleModel.annotate(t=Min("create_time")).first().values("t"),
+            await (MainOrderModel
+                   .filter(pay_status=PayStatusEnum.PAID)
+                   .annotate(t=Min("pay_time"))
+                   .first()
+                   .values("t")),
+        ]
+        starts: List[int] = [int(r["t"]) for r in firsts if r and r.get("t")]
+        today_start: int = TimeUtil.today()[0]
+        if not starts or min(starts) >= today_start:
+            return 0
+
+        first_date: str = TimeUtil.timestamp_to_date(min(starts), "%Y-%m-%d")
+        done: Dict[str, int] = {
+            r["date"]: r["update_time"]
+            for r in await StatDailyModel.filter(date__gte=first_date).values("date", "update_time")
+        }
+
+        count: int = 0
+        day: int = TimeUtil.date_to_timestamp(first_date, "%Y-%m-%d")
+        while day < today_start and count < limit:
+            date: str = TimeUtil.timestamp_to_date(day, "%Y-%m-%d")
+            if done.get(date, 0) < day + 86400:
+                await cls.compact(date)
+                count += 1
+            day += 86400
+        return count
+
+    @classmethod
+    async def totals(cls, before: str) -> dict:
+        """
+        统计行的累计值 (历史由 backfill 补齐, 只汇总统计表)
+
+        Args:
+            before (str): 只汇总该日期(Y-m-d)之前的统计行, 一般为今天, 今天的值由调用方加上。
+
+        Returns:
+            dict: {"pv": int, "new_users": int, "gmv": Decimal}
+
+        Author:
+            zero
+        """
+        row = await (StatDailyModel
+                     .filter(date__lt=before)
+                     .annotate(sum_pv=Sum("pv"), sum_users=Sum("new_users"), sum_gmv=Sum("gmv"))
+                     .first()
+                     .values("sum_pv", "sum_users", "sum_gmv"))
+        row = row or {}
+        return {
+            "pv": int(row.get("sum_pv") or 0),
+            "new_users": int(row.get("sum_users") or 0),
+            "gmv": Decimal(str(row.get("sum_gmv") or 0))
+        }
+
+    @classmethod
+    async def _visit_from_logs(cls, start_time: int, end_time: int) -> dict:
+        """ 从访问记录表补算访问计数 """
+        query = UserVisitorModel.filter(create_time__gte=start_time, create_time__lte=end_time)
+        ua_rows = await query.annotate(c=Count("id")).group_by("ua").values("ua", "c")
+        uv_row = await query.annotate(uv=Count("ip", distinct=True)).first().values("uv")
+
+        ua: Dict[str, int] = {u: 0 for u in cls.UA_LIST}
+        for r in ua_rows:
+            key: str = r["ua"] if r["ua"] in cls.UA_LIST else "other"
+            ua[key] += r["c"]
+        return {"pv": sum(ua.values()), "uv": int((uv_row or {}).get("uv") or 0), "ua": ua}
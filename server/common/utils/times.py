@@ -13,7 +13,9 @@
 import time
 import datetime
 import calendar
-from typing import List
+from typing import List, Dict, Iterable, Union
+
+_MINUTE_SECOND: List[str] = ["%02d:%02d" % divmod(i, 60) for i in range(3600)]
 
 
 class TimeUtil:
@@ -310,6 +312,46 @@ class TimeUtil:
         time_array = time.localtime(t)
         return time.strftime(formats, time_array)
 
+    @classmethod
+    def timestamps_to_dates(cls, values: Iterable[Union[int, float]], formats: str = "%Y-%m-%d %H:%M:%S") -> List[str]:
+        """
+        批量将时间戳转换为日期时间字符串 (结果与逐个调用 timestamp_to_date 一致)。
+
+        默认格式下每个整点小时只调用一次 localtime/strftime, 分秒部分查表拼接;
+        其他格式按不同的时间戳缓存结果。列表数据通常集中在少数几个小时内, 比逐个转换快数倍。
+
+        Args:
+            values (Iterable[Union[int, float]]): 时间戳,单位为秒。
+            formats (str, optional): 日期时间格式字符串,默认为"%Y-%m-%d %H:%M:%S"。
+
+        Returns:
+            List[str]: 转换后的日期时间字符串。
+
+        Author:
+            zero
+        """
+        results: List[str] = []
+        hours: Dict[int, str] = {}
+        memo: Dict[Union[int, float], str] = {}
+        fast: bool = formats == "%Y-%m-%d %H:%M:%S"
+        for t in values:
+            if fast and type(t) is int:
+                base: int = t - t % 3600
+                head = hours.get(base)
+                if head is None:
+                    lt = time.localtime(base)
+                    # 时区偏移不是整小时的(如+05:30), 整点与本地小时不对齐, 改用逐个转换
+                    head = hours[base] = time.strftime("%Y-%m-%d %H:", lt) if not (lt.tm_min or lt.tm_sec) else ""
+                if head:
+                    results.append(head + _MINUTE_SECOND[t - base])
+                    continue
+
+            value = memo.get(t)
+            if value is None:
+                value = memo[t] = time.strftime(formats, time.localtime(t))
+            results.append(value)
+        return results
+
     @classmethod
     def date_to_timestamp(cls, d: str, formats: str = "%Y-%m-%d %H:%M:%S") -> int:
         """
@@ -10,9 +10,14 @@
 # +----------------------------------------------------------------------
 # | Author: WaitAdmin Team <2474369941@qq.com>
 # +----------------------------------------------------------------------
+from contextvars import ContextVar
+from typing import Optional, Sequence
 from common.utils.config import ConfigUtil
 from kernels.utils import RequestUtil
 
+# 当前请求已解析的资源域名
+_resource_domain: ContextVar[Optional[str]] = ContextVar("resource_domain", default=None)
+
 
 class UrlUtil:
     """ Url工具 """
@@ -34,13 +39,86 @@ class UrlUtil:
         if url.startswith("http:") or url.startswith("https:"):
             return url
 
+        return await UrlUtil.resource_domain() + "/" + url
+
+    @staticmethod
+    async def to_absolute_urls(data: any, fields: Sequence[str] = None) -> any:
+        """
+        批量将相对URL转换为绝对URL, 同一请求内存储域名只解析一次。
+
+        Args:
+            data (any): 待转换数据, 支持: str、List[str]、dict/对象、以及它们组成的列表。
+            fields (Sequence[str], optional): 需转换的字段名, 对dict或对象生效, 字段值可为str或List[str]。
+
+        Returns:
+            any: 转换后的数据(dict与对象原地修改)。
+
+        Example:
+            await UrlUtil.to_absolute_urls(rows, ["main_image", "image"])
+        """
+        domain: str = await UrlUtil.resource_domain()
+        return UrlUtil.absolute_with(domain, data, fields)
+
+    @staticmethod
+    def absolute_with(domain: str, data: any, fields: Sequence[str] = None) -> any:
+        """
+        使用已解析的域名同步转换URL, 规则同 to_absolute_urls。
+
+        Args:
+            domain (str): 资源域名, 由 resource_domain() 获得。
+            data (any): 待转换数据。
+            fields (Sequence[str], optional): 需转换的字段名。
+
+        Returns:
+            any: 转换后的数据。
+        """
+        if data is None or isinstance(data, str):
+            if not data:
+                return ""
+            if data.startswith("http:") or data.startswith("https:"):
+                return data
+            return domain + "/" + data
+
+        if isinstance(data, (list, tuple)):
+            if fields:
+                for item in data:
+                    UrlUtil.absolute_with(domain, item, fields)
+                return data
+            return [UrlUtil.absolute_with(domain, url) for url in data]
+
+        if fields:
+            if isinstance(data, dict):
+                for field in fields:
+                    if field in data:
+                        data[field] = UrlUtil.absolute_with(domain, data[field])
+            else:
+                for field in fields:
+                    if hasattr(data, field):
+                        setattr(data, field, UrlUtil.absolute_with(domain, getattr(data, field)))
+
+        return data
+
+    @staticmethod
+    async def resource_domain() -> str:
+        """
+        获取当前请求的资源域名(本地存储为站点域名, 否则为存储引擎的域名)。
+
+        Returns:
+            str: 资源域名。
+        """
+        domain: Optional[str] = _resource_domain.get()
+        if domain is not None:
+            return domain
+
         engine: str = await ConfigUtil.get("storage", "engine", "local")
         if engine == "local":
-            return RequestUtil.domain + "/" + url
+            domain = RequestUtil.domain
         else:
             config: dict = await ConfigUtil.get("storage", engine, {})
-            domain: str = config.get("domain", "")
-            return domain + "/" + url
+            domain = config.get("domain", "")
+
+        _resource_domain.set(domain)
+        return domain
 
     @staticmethod
     def to_relative_url(url) -> str:
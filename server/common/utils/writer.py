@@ -0,0 +1,170 @@
+# +----------------------------------------------------------------------
+# | WaitAdmin(fastapi)快速开发后台管理系统
+# +----------------------------------------------------------------------
+# | 欢迎阅读学习程序代码,建议反馈是我们前进的动力
+# | 程序完全开源可支持商用,允许去除界面版权信息
+# | gitee:   https://gitee.com/wafts/waitadmin-python
+# | github:  https://github.com/topwait/waitadmin-python
+# | 官方网站: https://www.waitadmin.cn
+# | WaitAdmin团队版权所有并拥有最终解释权
+# +----------------------------------------------------------------------
+# | Author: WaitAdmin Team <2474369941@qq.com>
+# +----------------------------------------------------------------------
+import random
+import asyncio
+import logging
+from collections import deque
+from typing import Dict, List, Type, Deque, Optional
+from tortoise import Model
+
+logger = logging.getLogger(__name__)
+
+__all__ = ["BatchWriter"]
+
+
+class BatchWriter:
+    """
+    批量写入器 (每个进程每个模型一个)
+
+    请求中只把记录放入有界队列, 由后台任务按数量(batch_size)或时间(interval)阈值 bulk_create 写入。
+    队列超过 sample_level 时按 sample_rate 抽样保留, 队列满时丢弃新记录, 保证请求不被日志拖慢。
+
+    Example:
+        BatchWriter.of(SysLogModel).put(admin_id=1, url="/spi/login/check", ...)
+    """
+
+    writers: Dict[Type[Model], "BatchWriter"] = {}
+
+    def __init__(self,
+                 model: Type[Model],
+                 max_size: int = 10000,
+                 batch_size: int = 200,
+                 interval: float = 1.0,
+                 sample_level: float = 0.8,
+                 sample_rate: float = 0.1):
+        """
+        Args:
+            model (Type[Model]): 要写入的模型。
+            max_size (int): 队列容量, 满时丢弃新记录。
+            batch_size (int): 每批写入的数量, 达到时立即写入。
+            interval (float): 最长写入间隔(秒)。
+            sample_level (float): 队列占用超过该比例后开始抽样, 为1时不抽样。
+            sample_rate (float): 抽样时保留记录的比例。
+        """
+        self.model = model
+        self.max_size = max_size
+        self.batch_size = batch_size
+        self.interval = interval
+        self.sample_level = sample_level
+        self.sample_rate = sample_rate
+        self.stats: Dict[str, int] = {"queued": 0, "flushed": 0, "dropped": 0, "sampled": 0, "failed": 0}
+
+        self._queue: Deque[dict] = deque()
+        self._wake: asyncio.Event = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self._lock: asyncio.Lock = asyncio.Lock()
+
+    @classmethod
+    def of(cls, model: Type[Model], **kwargs) -> "BatchWriter":
+        """
+        获取模型的写入器 (首次获取时创建)
+
+        Args:
+            model (Type[Model]): 要写入的模型。
+            **kwargs: 创建写入器的参数, 见 __init__。
+
+        Returns:
+            BatchWriter: 写入器。
+
+        Author:
+            zero
+        """
+        writer = cls.writers.get(model)
+        if writer is None:
+            writer = cls.writers[model] = cls(model, **kwargs)
+        return writer
+
+    def put(self, **row) -> bool:
+        """
+        记录放入队列 (不等待写入)
+
+        Args:
+            **row: 模型字段。
+
+        Returns:
+            bool: 是否已放入队列, 被抽样或丢弃时返回False。
+
+        Author:
+            zero
+        """
+        size: int = len(self._queue)
+        if size >= self.max_size:
+            self.stats["dropped"] += 1
+            return False
+        if size >= self.max_size * self.sample_level and random.random() >= self.sample_rate:
+            self.stats["sampled"] += 1
+            return False
+
+        self._queue.append(row)
+        self.stats["queued"] += 1
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+        if len(self._queue) >= self.batch_size:
+            self._wake.set()
+        return True
+
+    async def flush(self) -> int:
+        """
+        写入队列中的全部记录
+
+        Returns:
+            int: 写入的记录数量。
+
+        Author:
+            zero
+        """
+        total: int = 0
+        async with self._lock:
+            while self._queue:
+                batch: List[dict] = [self._queue.popleft() for _ in range(min(self.batch_size, len(self._queue)))]
+                try:
+                    await self.model.bulk_create([self.model(**row) for row in batch])
+                    self.stats["flushed"] += len(batch)
+                    total += len(batch)
+                except Exception as e:
+                    self.stats["failed"] += len(batch)
+                    logger.warning("BatchWriter %s flush failed: %s", self.model.__name__, e)
+        return total
+
+    async def stop(self):
+        """ 停止后台任务并写入剩余记录 """
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        self._task = None
+        await self.flush()
+
+    @classmethod
+    async def stop_all(cls):
+        """ 停止全部写入器 (应用关闭时调用) """
+        for writer in list(cls.writers.values()):
+            await writer.stop()
+
+    @classmethod
+    def all_stats(cls) -> Dict[str, Dict[str, int]]:
+        """ 全部写入器的计数 (含当前队列长度) """
+        return {m.__name__: {**w.stats, "pending": len(w._queue)} for m, w in cls.writers.items()}
+
+    async def _run(self):
+        """ 后台写入循环 """
+        while True:
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=self.interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+            if self._queue:
+                await asyncio.shield(self.flush())
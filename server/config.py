@@ -51,6 +51,8 @@ class GlobalSetting(BaseSettings):
     SERVER_PORT: int = int(os.getenv("SERVER_PORT", 8100))
     SERVER_WORKERS: int = int(os.getenv("SERVER_WORKERS", 1))
     SERVER_RELOAD: bool = True if os.getenv("SERVER_RELOAD", "False") == "True" else False
+    # 进程启动耗时预算(秒), 超出时输出警告
+    BOOT_BUDGET: float = float(os.getenv("BOOT_BUDGET", 10))
 
     # 跨域请求
     CORS_ORIGINS: List[str] = ["*"]
@@ -107,6 +109,16 @@ class GlobalSetting(BaseSettings):
         "timezone": "Asia/Shanghai"
     }
 
+    # 迁移配置
+    MIGRATIONS: Dict[str, object] = {
+        # 迁移文件所在包
+        "package": "common.migrations",
+        # 启动时自动建表并执行待处理的迁移 (多进程同时启动时由数据库锁串行执行; 关闭后需在发布时执行 python -m kernels.migrate upgrade)
+        "auto_upgrade": os.getenv("DB_AUTO_UPGRADE", "True") == "True",
+        # 等待迁移锁的秒数
+        "lock_timeout": int(os.getenv("DB_MIGRATE_LOCK_TIMEOUT", 60))
+    }
+
     # 缓存配置
     REDIS: Dict[str, object] = {
         # 主机
@@ -129,8 +141,30 @@ class GlobalSetting(BaseSettings):
         "decode_responses": bool(os.getenv("REDIS_DECODE_RESPONSES", True))
     }
 
+    # 指标配置
+    METRICS: Dict[str, object] = {
+        # 启用请求指标
+        "enable": os.getenv("METRICS_ENABLE", "True") == "True",
+        # 访问令牌 (Authorization: Bearer <token>), 为空时 /metrics 返回404 (接口关闭, 仍收集指标)
+        "token": os.getenv("METRICS_TOKEN", ""),
+        # 进程快照推送间隔(秒)
+        "push_interval": float(os.getenv("METRICS_PUSH_INTERVAL", 5))
+    }
+
+    # 查询分析配置
+    PROFILER: Dict[str, object] = {
+        # 启用查询分析
+        "enable": os.getenv("PROFILER_ENABLE", "False") == "True",
+        # 单个请求的查询次数预算, 超出时警告
+        "query_budget": int(os.getenv("PROFILER_QUERY_BUDGET", 30)),
+        # 同一结构的查询重复次数达到该值时警告(疑似N+1)
+        "repeat_threshold": int(os.getenv("PROFILER_REPEAT_THRESHOLD", 5))
+    }
+
     # Milvus配置
     MILVUS: Dict[str, object] = {
+        # 启用以图搜图 (关闭后不加载torch/pymilvus)
+        "enable": os.getenv("MILVUS_ENABLE", "True") == "True",
         # 数据库
         "db": os.getenv("MILVUS_DB", "db/moq_milvus.db"),
         # 集合名称
@@ -19,7 +19,14 @@ from apscheduler.schedulers.asyncio import AsyncIOScheduler
 from apscheduler.triggers.interval import IntervalTrigger
 from apscheduler.triggers.cron import CronTrigger
 from apscheduler.triggers.date import DateTrigger
+from config import get_settings
 from common.models.sys import SysCrontabModel
+from common.utils.config import ConfigUtil
+from common.utils.cache import TieredCache
+from common.utils.writer import BatchWriter
+from common.utils.stats import StatsUtil
+from common.utils.metrics import MetricsUtil
+from plugins.safe.driver import SecurityDriver
 
 
 scheduler = AsyncIOScheduler()
@@ -30,10 +37,21 @@ class AppEvents:
     async def startup(cls, _app: FastAPI):
         scheduler.add_job(cls._inject_crontab, DateTrigger(run_date=datetime.now()))
         scheduler.start()
+        await ConfigUtil.subscribe()
+        await TieredCache.subscribe()
+        if get_settings().METRICS.get("enable"):
+            MetricsUtil.push_interval = get_settings().METRICS.get("push_interval", 5.0)
+            MetricsUtil.start()
 
     @classmethod
     async def shutdown(cls, _app: FastAPI):
         scheduler.shutdown()
+        await ConfigUtil.unsubscribe()
+        await TieredCache.unsubscribe()
+        await MetricsUtil.stop()
+        await SecurityDriver.flush_activity()
+        await BatchWriter.stop_all()
+        await StatsUtil.flush()
 
     @classmethod
     async def _inject_crontab(cls):
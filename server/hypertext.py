@@ -11,13 +11,16 @@
 # | Author: WaitAdmin Team <2474369941@qq.com>
 # +----------------------------------------------------------------------
 import math
+import hashlib
 import inspect
 from functools import wraps
-from typing import Generic, TypeVar, Sequence, Callable, Any
+from typing import Generic, TypeVar, Sequence, Callable, Optional, Any
+from fastapi import Request
 from fastapi.encoders import jsonable_encoder
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, Response
 from pydantic import BaseModel, Field
 from common.enums.errors import ErrorEnum
+from common.utils.cache import ResponseCache
 
 T = TypeVar("T")
 
@@ -47,13 +50,36 @@ class PagingResult(BaseModel, Generic[T]):
     last_page: int = Field(default=1, description="最后页码")
     per_page: int = Field(default=20, description="每页数据")
     total: int = Field(default=1, description="数据总量")
+    approximate: bool = Field(default=False, description="总数是否为估算值(超过上限时为上限值, 可显示为\"10000+\")")
     extend: Sequence[T] = Field(default=[], description="扩展信息")
     lists: Sequence[T] = Field(description="分页数据")
 
     @classmethod
-    def create(cls, data: Sequence[T], total: int, page_no: int, page_size: int) -> "PagingResult[T]":
+    def create(cls,
+               data: Sequence[T],
+               total: int,
+               page_no: int,
+               page_size: int,
+               approximate: bool = False) -> "PagingResult[T]":
         last_page = math.ceil(total / page_size)
-        return cls(lists=data, total=total, current_page=page_no, per_page=page_size, last_page=last_page)
+        if approximate:
+            # 估算的总数可能偏小: 不早于当前页结束, 当前页已满时至少还能翻到下一页
+            last_page = max(last_page, page_no + 1 if len(data) >= page_size else page_no)
+        return cls(lists=data, total=total, current_page=page_no, per_page=page_size, last_page=last_page,
+                   approximate=approximate)
+
+
+class CursorResult(BaseModel, Generic[T]):
+    """ 游标分页结果封装 """
+    per_page: int = Field(default=20, description="每页数据")
+    total: int = Field(default=0, description="数据总量(按筛选条件缓存, 可能略有滞后)")
+    next_cursor: Optional[str] = Field(default=None, description="下一页游标, 为空表示没有更多数据")
+    extend: Sequence[T] = Field(default=[], description="扩展信息")
+    lists: Sequence[T] = Field(description="分页数据")
+
+    @classmethod
+    def create(cls, data: Sequence[T], total: int, page_size: int, next_cursor: Optional[str]) -> "CursorResult[T]":
+        return cls(lists=data, total=total, per_page=page_size, next_cursor=next_cursor)
 
 
 def response_json(func: Callable[..., T]) -> Callable[..., T]:
@@ -73,3 +99,48 @@ def response_json(func: Callable[..., T]) -> Callable[..., T]:
         )
 
     return wrapper
+
+
+def response_cache(*tags: str, expire: int = 300):
+    """
+    响应缓存 (置于 response_json 之上)
+
+    以 请求方法+域名+路径+排序后的查询参数 为键缓存响应体,
+    写操作通过 ResponseCache.purge(*tags) 使其失效。
+
+    Args:
+        tags (str): 缓存标签, 见 CacheTagEnum。
+        expire (int): 过期时间(秒)。
+    """
+    def decorator(func: Callable[..., T]) -> Callable[..., T]:
+        sig = inspect.signature(func)
+        req_name = next((n for n, p in sig.parameters.items() if p.annotation is Request), None)
+        inject = req_name is None
+        if inject:
+            req_name = "__cache_request"
+            sig = sig.replace(parameters=[
+                *sig.parameters.values(),
+                inspect.Parameter(req_name, inspect.Parameter.KEYWORD_ONLY, annotation=Request)
+            ])
+
+        @wraps(func)
+        async def wrapper(*args, **kwargs) -> T:
+            request: Request = kwargs.pop(req_name) if inject else kwargs[req_name]
+            query = "&".join(f"{k}={v}" for k, v in sorted(request.query_params.multi_items()))
+            ident = f"{request.method}:{request.base_url}{request.url.path}?{query}"
+            versions = await ResponseCache.versions(tags)
+            key = hashlib.sha1(f"{ident}#{versions}".encode("utf-8")).hexdigest()
+
+            body = await ResponseCache.get(key)
+            if body is not None:
+                return Response(content=body, media_type="application/json;charset=utf-8")
+
+            resp = await func(*args, **kwargs)
+            if isinstance(resp, Response) and resp.status_code == 200:
+                await ResponseCache.set(key, bytes(resp.body).decode("utf-8"), expire)
+            return resp
+
+        wrapper.__signature__ = sig
+        return wrapper
+
+    return decorator
@@ -0,0 +1,98 @@
+# +----------------------------------------------------------------------
+# | WaitAdmin(fastapi)快速开发后台管理系统
+# +----------------------------------------------------------------------
+# | 欢迎阅读学习程序代码,建议反馈是我们前进的动力
+# | 程序完全开源可支持商用,允许去除界面版权信息
+# | gitee:   https://gitee.com/wafts/waitadmin-python
+# | github:  https://github.com/topwait/waitadmin-python
+# | 官方网站: https://www.waitadmin.cn
+# | WaitAdmin团队版权所有并拥有最终解释权
+# +----------------------------------------------------------------------
+# | Author: WaitAdmin Team <2474369941@qq.com>
+# +----------------------------------------------------------------------
+"""
+Middleware stack throughput benchmark (not imported by application code)
+
+    python -m kernels.benchmark_middleware [requests]
+
+Drives a trivial GET endpoint for each router alias through the ASGI
+interface directly, once on a bare FastAPI app and once with the full
+stack installed by configure_middleware(), and prints req/s, p50 and p99.
+Run it on the commit before and after a middleware change to compare.
+"""
+import sys
+import time
+import asyncio
+from typing import List
+from fastapi import FastAPI
+from config import get_settings
+from kernels.middleware import configure_middleware
+
+
+def build(stack: bool) -> FastAPI:
+    """ Build an app with a ping route per alias, optionally with middleware """
+    app = FastAPI()
+    for alias in get_settings().ROUTER_ALIAS.values():
+        app.add_api_route(f"/{alias}/ping", lambda: {"code": 0}, methods=["GET"])
+    if stack:
+        configure_middleware(app)
+    return app
+
+
+async def call(app: FastAPI, path: str) -> int:
+    """ Issue one GET request through the ASGI interface, return the status """
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "root_path": "",
+        "query_string": b"",
+        "headers": [(b"host", b"benchmark"), (b"user-agent", b"benchmark")],
+        "client": ("127.0.0.1", 50000),
+        "server": ("benchmark", 80),
+    }
+    status: List[int] = [0]
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            status[0] = message["status"]
+
+    await app(scope, receive, send)
+    return status[0]
+
+
+async def bench(label: str, app: FastAPI, path: str, n: int):
+    for _ in range(200):
+        await call(app, path)
+    latency: List[float] = []
+    begin: float = time.perf_counter()
+    for _ in range(n):
+        start: float = time.perf_counter()
+        status: int = await call(app, path)
+        latency.append(time.perf_counter() - start)
+    total: float = time.perf_counter() - begin
+    if status != 200:
+        raise RuntimeError(f"{path} returned {status}")
+    latency.sort()
+    p50: float = latency[n // 2] * 1000
+    p99: float = latency[int(n * 0.99)] * 1000
+    print(f"{label:<8}{path:<14}{n / total:>10.0f}{p50:>10.3f}{p99:>10.3f}")
+
+
+async def main(n: int):
+    print(f"{'stack':<8}{'path':<14}{'req/s':>10}{'p50 ms':>10}{'p99 ms':>10}")
+    bare, full = build(False), build(True)
+    for alias in get_settings().ROUTER_ALIAS.values():
+        await bench("bare", bare, f"/{alias}/ping", n)
+        await bench("full", full, f"/{alias}/ping", n)
+
+
+if __name__ == "__main__":
+    asyncio.run(main(int(sys.argv[1]) if len(sys.argv) > 1 else 3000))
@@ -0,0 +1,118 @@
+# +----------------------------------------------------------------------
+# | WaitAdmin(fastapi)快速开发后台管理系统
+# +----------------------------------------------------------------------
+# | 欢迎阅读学习程序代码,建议反馈是我们前进的动力
+# | 程序完全开源可支持商用,允许去除界面版权信息
+# | gitee:   https://gitee.com/wafts/waitadmin-python
+# | github:  https://github.com/topwait/waitadmin-python
+# | 官方网站: https://www.waitadmin.cn
+# | WaitAdmin团队版权所有并拥有最终解释权
+# +----------------------------------------------------------------------
+# | Author: WaitAdmin Team <2474369941@qq.com>
+# +----------------------------------------------------------------------
+"""
+Pagination benchmark on a large visitor table (not imported by application code)
+
+    python -m kernels.benchmark_paginate [db_path] [rows]
+
+Seeds a standalone SQLite file (default runtime/benchmark_visitor.db, 1,000,000
+rows) on first run, never the configured database, then times:
+    - the previous paginate (sequential COUNT + OFFSET + per-row strftime)
+      against DbModel.paginate with count_mode exact and estimate
+    - a deep OFFSET page against the same page reached by paginate_cursor
+    - formatting 100k timestamps per row against TimeUtil.timestamps_to_dates
+Delete the file to reseed with a different row count.
+"""
+import os
+import sys
+import time
+import asyncio
+from typing import Awaitable, Callable
+from tortoise import Tortoise
+from tortoise.queryset import QuerySet
+from hypertext import PagingResult
+from kernels.model import DbModel
+from common.utils.times import TimeUtil
+from common.models.users import UserVisitorModel
+
+FIELDS = ["id", "user_id", "url", "ip", "ua", "create_time"]
+PAGE_SIZE = 200
+
+
+async def seed(rows: int):
+    """ Insert rows visitor records in batches of 10k """
+    db = Tortoise.get_connection("default")
+    table: str = UserVisitorModel._meta.db_table
+    columns = ("user_id,terminal,summary,endpoint,method,url,ip,ua,user_agent,"
+               "params,error,status,start_time,end_time,task_time,create_time")
+    sql: str = f"INSERT INTO {table} ({columns}) VALUES ({','.join('?' * 16)})"
+    now: int = int(time.time())
+    for start in range(0, rows, 10000):
+        batch = [
+            (i % 5000, 1, "", "", "GET", "/api/ping", "127.0.0.1", "Chrome", "benchmark",
+             "", "", 1, "0", "0", 0.01, now - i * 2)
+            for i in range(start, min(start + 10000, rows))
+        ]
+        await db.execute_many(sql, batch)
+
+
+async def legacy_paginate(model: QuerySet, page_no: int, page_size: int):
+    """ The paginate before the change: COUNT then OFFSET, strftime per row """
+    _count = await model.count()
+    _lists = await model.limit(page_size).offset((page_no - 1) * page_size).values(*FIELDS)
+    for item in _lists:
+        if item.get("create_time"):
+            item["create_time"] = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(item["create_time"]))
+    return PagingResult.create(_lists, _count, page_no, page_size)
+
+
+async def bench(label: str, func: Callable[[], Awaitable], n: int = 5):
+    begin: float = time.perf_counter()
+    for _ in range(n):
+        await func()
+    print(f"{label:<36}{(time.perf_counter() - begin) / n * 1000:>10.1f} ms")
+
+
+async def main(path: str, rows: int):
+    fresh: bool = not os.path.exists(path)
+    await Tortoise.init(db_url=f"sqlite://{path}", modules={"models": ["common.models.users"]})
+    try:
+        if fresh:
+            await Tortoise.generate_schemas()
+            await seed(rows)
+        print(f"{await UserVisitorModel.all().count()} rows in {path}")
+
+        query = UserVisitorModel.all().order_by("-id")
+        filtered = UserVisitorModel.filter(user_id=7).order_by("-id")
+        await bench("legacy page 1", lambda: legacy_paginate(query, 1, PAGE_SIZE))
+        await bench("paginate exact page 1", lambda: DbModel.paginate(query, 1, PAGE_SIZE, fields=FIELDS))
+        await bench("paginate estimate page 1", lambda: DbModel.paginate(
+            query, 1, PAGE_SIZE, fields=FIELDS, count_mode="estimate"))
+        await bench("legacy filtered page 1", lambda: legacy_paginate(filtered, 1, PAGE_SIZE))
+        await bench("paginate estimate filtered page 1", lambda: DbModel.paginate(
+            filtered, 1, PAGE_SIZE, fields=FIELDS, count_mode="estimate"))
+
+        deep: int = max(1, await UserVisitorModel.all().count() // PAGE_SIZE * 4 // 5)
+        row = await query.offset((deep - 1) * PAGE_SIZE - 1).limit(1).values("id")
+        cursor: str = DbModel.make_cursor(row[0], ["-id"])
+        await bench(f"legacy offset page {deep}", lambda: legacy_paginate(query, deep, PAGE_SIZE), 3)
+        await bench(f"cursor page {deep}", lambda: DbModel.paginate_cursor(
+            query, cursor=cursor, page_size=PAGE_SIZE, fields=FIELDS, with_total=False), 3)
+
+        stamps = [r["create_time"] for r in await UserVisitorModel.all().limit(100000).values("create_time")]
+        begin: float = time.perf_counter()
+        [time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(v)) for v in stamps]
+        single: float = time.perf_counter() - begin
+        begin = time.perf_counter()
+        TimeUtil.timestamps_to_dates(stamps)
+        batch: float = time.perf_counter() - begin
+        print(f"{f'format {len(stamps)} timestamps per row':<36}{single * 1000:>10.1f} ms")
+        print(f"{f'format {len(stamps)} timestamps batched':<36}{batch * 1000:>10.1f} ms")
+    finally:
+        await Tortoise.close_connections()
+
+
+if __name__ == "__main__":
+    _path = sys.argv[1] if len(sys.argv) > 1 else os.path.join("runtime", "benchmark_visitor.db")
+    _rows = int(sys.argv[2]) if len(sys.argv) > 2 else 1000000
+    asyncio.run(main(_path, _rows))
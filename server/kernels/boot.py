@@ -0,0 +1,153 @@
+# +----------------------------------------------------------------------
+# | WaitAdmin(fastapi)快速开发后台管理系统
+# +----------------------------------------------------------------------
+# | 欢迎阅读学习程序代码,建议反馈是我们前进的动力
+# | 程序完全开源可支持商用,允许去除界面版权信息
+# | gitee:   https://gitee.com/wafts/waitadmin-python
+# | github:  https://github.com/topwait/waitadmin-python
+# | 官方网站: https://www.waitadmin.cn
+# | WaitAdmin团队版权所有并拥有最终解释权
+# +----------------------------------------------------------------------
+# | Author: WaitAdmin Team <2474369941@qq.com>
+# +----------------------------------------------------------------------
+import os
+import json
+import time
+import logging
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, List, Tuple
+
+__all__ = ["Manifest", "BootTimer"]
+
+logger = logging.getLogger(__name__)
+
+
+class Manifest:
+    """
+    Directory scan results cached across worker boots.
+
+    Each entry stores the scanned value together with the mtime of every
+    directory under its roots. Adding, removing or renaming a file changes
+    its directory mtime, so validating an entry only costs one stat per
+    directory instead of listing and filtering every file again.
+    """
+
+    root_path: str = os.path.dirname(os.path.dirname(os.path.abspath(__file__))) + os.sep
+    file_path: str = os.path.join(root_path, "runtime", "manifest.json")
+
+    @classmethod
+    def load(cls, name: str, roots: List[str], build: Callable[[], Any]) -> Any:
+        """
+        Return the cached value of an entry, rebuilding it when any directory changed.
+
+        Args:
+            name (str): Entry name, e.g. "routers".
+            roots (List[str]): Directories (relative to the project root) the value is derived from.
+            build (Callable[[], Any]): Produces a JSON-serializable value by scanning the roots.
+
+        Returns:
+            Any: The cached or freshly built value.
+
+        Author:
+            zero
+        """
+        data: Dict[str, Any] = cls._read()
+        entry = data.get(name)
+        if entry and entry.get("roots") == roots and cls._fresh(entry.get("dirs", {})):
+            return entry["value"]
+
+        value = build()
+        data[name] = {"roots": roots, "dirs": cls._snapshot(roots), "value": value}
+        cls._write(data)
+        return value
+
+    @classmethod
+    def _snapshot(cls, roots: List[str]) -> Dict[str, int]:
+        dirs: Dict[str, int] = {}
+        for root in roots:
+            for path, subdirs, _ in os.walk(os.path.join(cls.root_path, root)):
+                subdirs[:] = [d for d in subdirs if not d.startswith("__") and not d.startswith(".")]
+                dirs[os.path.relpath(path, cls.root_path)] = os.stat(path).st_mtime_ns
+        return dirs
+
+    @classmethod
+    def _fresh(cls, dirs: Dict[str, int]) -> bool:
+        try:
+            return bool(dirs) and all(
+                os.stat(os.path.join(cls.root_path, path)).st_mtime_ns == mtime for path, mtime in dirs.items()
+            )
+        except OSError:
+            return False
+
+    @classmethod
+    def _read(cls) -> Dict[str, Any]:
+        try:
+            with open(cls.file_path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    @classmethod
+    def _write(cls, data: Dict[str, Any]):
+        # Workers may boot concurrently: write a private file, then rename it into place
+        tmp_path: str = f"{cls.file_path}.{os.getpid()}"
+        try:
+            os.makedirs(os.path.dirname(cls.file_path), exist_ok=True)
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(data, f, ensure_ascii=False)
+            os.replace(tmp_path, cls.file_path)
+        except OSError as e:
+            logger.warning("Manifest write failed: %s", e)
+
+
+class BootTimer:
+    """
+    Per-phase timing of worker boot.
+
+    Phases are recorded in order; ``report`` logs them once the application
+    has started and warns when the total exceeds the budget.
+    """
+
+    started: float = time.perf_counter()
+    phases: List[Tuple[str, float]] = []
+    _mark: float = started
+
+    @classmethod
+    @contextmanager
+    def phase(cls, name: str):
+        """ Time a block as a named phase """
+        start: float = time.perf_counter()
+        try:
+            yield
+        finally:
+            cls.phases.append((name, time.perf_counter() - start))
+            cls._mark = time.perf_counter()
+
+    @classmethod
+    def mark(cls, name: str):
+        """ Record the time since the previous phase (or process import) as a phase """
+        now: float = time.perf_counter()
+        cls.phases.append((name, now - cls._mark))
+        cls._mark = now
+
+    @classmethod
+    def report(cls, budget: float = None) -> float:
+        """
+        Log the boot phases.
+
+        Args:
+            budget (float): Expected maximum boot time in seconds, a warning is logged when exceeded.
+
+        Returns:
+            float: Total boot time in seconds.
+
+        Author:
+            zero
+        """
+        total: float = time.perf_counter() - cls.started
+        detail: str = ", ".join(f"{name} {seconds * 1000:.0f}ms" for name, seconds in cls.phases)
+        if budget and total > budget:
+            logger.warning("Worker %d boot took %.0fms (budget %.0fms): %s", os.getpid(), total * 1000, budget * 1000, detail)
+        else:
+            logger.info("Worker %d booted in %.0fms: %s", os.getpid(), total * 1000, detail)
+        return total
@@ -14,7 +14,7 @@ import importlib
 from redis import asyncio
 from fastapi_cache.backends.redis import RedisBackend
 
-__all__ = ["redis_be"]
+__all__ = ["redis_be", "redis_raw"]
 
 
 def __loading_redis_configs():
@@ -33,7 +33,7 @@ def __loading_redis_configs():
         return configs
 
 
-def register_redis():
+def register_redis(decode_responses: bool = None):
     """ Connect Redis """
     c = __loading_redis_configs()
     host: str = c.get("host", "127.0.0.1")
@@ -46,8 +46,11 @@ def register_redis():
         username=c.get("username", ""),
         password=c.get("password", ""),
         max_connections=c.get("max_connections"),
-        decode_responses=c.get("decode_responses", True)
+        decode_responses=c.get("decode_responses", True) if decode_responses is None else decode_responses
     )
 
 
 redis_be: RedisBackend = RedisBackend(register_redis())
+
+# Binary values (see common.utils.codec) are read without response decoding
+redis_raw = register_redis(decode_responses=False)
@@ -14,8 +14,10 @@ import os
 import importlib
 from fastapi import FastAPI
 from tortoise.contrib.fastapi import register_tortoise
+from kernels.boot import Manifest
+from kernels.migrate import Migrator, migrate_configs
 
-__all__ = ["register_db"]
+__all__ = ["register_db", "db_configs"]
 
 
 def __loading_db_configs():
@@ -40,8 +42,11 @@ def __loading_db_configs():
             for k, v in db_config.get("apps").items():
                 # 如果v存在，并且有models配置，并且models是字符串类型
                 if v and v.get("models") and isinstance(v.get("models"), str):
-                    # 加载models文件
-                    db_config["apps"][k]["models"] = __loading_model_files(v.get("models"))
+                    # 加载models文件 (目录未变化时读取缓存的清单)
+                    path: str = v.get("models")
+                    db_config["apps"][k]["models"] = Manifest.load(
+                        "models:" + path, [path.replace(".", os.sep)], lambda: __loading_model_files(path)
+                    )
 
         # 返回db_config
         return db_config
@@ -87,11 +92,22 @@ def __loading_model_files(path: str):
     return all_files
 
 
+def db_configs():
+    """ Tortoise configuration (also used by the migration CLI) """
+    return __loading_db_configs()
+
+
 def register_db(app: FastAPI):
     """ Connect Databases """
     register_tortoise(
         app,
         config=__loading_db_configs(),
-        generate_schemas=True,
+        generate_schemas=False,
         add_exception_handlers=False,
     )
+
+    @app.on_event("startup")
+    async def upgrade():
+        # 建表和索引迁移 (见 kernels.migrate), 生产环境可关闭后在发布时执行 python -m kernels.migrate upgrade
+        if migrate_configs().get("auto_upgrade"):
+            await Migrator.upgrade()
@@ -11,14 +11,16 @@
 # | Author: WaitAdmin Team <2474369941@qq.com>
 # +----------------------------------------------------------------------
 import os
+import re
 import importlib
 import typing
 from typing import List
 from fastapi import FastAPI
-from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.datastructures import Headers
+from starlette.types import ASGIApp, Scope, Receive, Send, Message
 from kernels.utils import RequestUtil
 
-__all__ = ["configure_middleware"]
+__all__ = ["configure_middleware", "BodyCapture"]
 
 
 def __get_configs():
@@ -124,59 +126,95 @@ def configure_middleware(app: FastAPI):
     # 添加基础中间件
 
 
-def to_user_agent(ua: str):
-    ua_dict = {
-        "wechat": "MicroMessenger",
-        "chrome": "Chrome",
-        "firefox": "Firefox",
-        "safari": "Safari",
-        "opera": "Opera",
-        "edge": "Edge"
-    }
-
-    ua = ua.lower()
-    for key, value in ua_dict.items():
-        if value in ua:
-            return key
-
-    if "msie" in ua or "trident/" in ua:
-        return "ie"
-
-    return "other"
-
-
-class BasisMiddleware(BaseHTTPMiddleware):
-    async def dispatch(self, request, call_next):
-        user_agent: str = str(request.headers.get("User-Agent", ""))
-        user_token: str = str(request.headers.get("Authorization", "").split(" ")[-1])
-        req_module: str = str(request.url.path.strip("/").split("/")[0])
-        
-        # 新增：从 X-Forwarded-Proto 获取实际 scheme，并覆盖 scope
-        forwarded_scheme = request.headers.get("X-Forwarded-Proto")
-        actual_scheme = forwarded_scheme if forwarded_scheme else request.scope.get("scheme")
-        
-        # 关键：直接更新 scope 中的 scheme，这样 base_url 会自动使用它
+class BodyCapture:
+    """
+    Receive wrapper that tees the request body for logging.
+
+    The downstream app reads the body as usual; every ``http.request`` chunk it
+    receives is kept by reference (no copy, no parse) until ``limit`` bytes are
+    held. ``text()`` masks sensitive fields with a byte-level scan and appends
+    a truncation marker when the body was larger than the limit.
+    """
+
+    MARKER: str = "...[truncated]"
+    MASK: bytes = b"******"
+    FIELDS: typing.Tuple[str, ...] = ("password", "password_confirm", "password_old")
+
+    _patterns: typing.Dict[typing.Tuple[str, ...], typing.List[re.Pattern]] = {}
+
+    def __init__(self, receive: Receive, limit: int = 4096, fields: typing.Iterable[str] = None):
+        self.receive = receive
+        self.limit = limit
+        self.fields = tuple(fields) if fields is not None else self.FIELDS
+        self.size: int = 0
+        self.truncated: bool = False
+        self._chunks: List[bytes] = []
+        self._held: int = 0
+
+    async def __call__(self) -> Message:
+        message: Message = await self.receive()
+        if message["type"] == "http.request":
+            chunk: bytes = message.get("body", b"")
+            self.size += len(chunk)
+            room: int = self.limit - self._held
+            if len(chunk) > room:
+                self.truncated = True
+                chunk = chunk[:room] if room > 0 else b""
+            if chunk:
+                self._chunks.append(chunk)
+                self._held += len(chunk)
+        return message
+
+    @property
+    def body(self) -> bytes:
+        """ The captured (possibly truncated) raw body """
+        if len(self._chunks) > 1:
+            self._chunks = [b"".join(self._chunks)]
+        return self._chunks[0] if self._chunks else b""
+
+    def text(self) -> str:
+        """ The captured body as masked text, with a marker when truncated """
+        data: bytes = self.body
+        if not data:
+            return ""
+        for pattern in self._compile(self.fields):
+            data = pattern.sub(lambda m: m.group(1) + self.MASK + m.group(m.lastindex), data)
+        text: str = data.decode("utf-8", "ignore" if self.truncated else "replace")
+        return text + self.MARKER if self.truncated else text
+
+    @classmethod
+    def _compile(cls, fields: typing.Tuple[str, ...]) -> typing.List[re.Pattern]:
+        patterns = cls._patterns.get(fields)
+        if patterns is None:
+            names: bytes = b"|".join(re.escape(f.encode()) for f in fields)
+            patterns = cls._patterns[fields] = [
+                # JSON: "password": "value" (value may be cut off by the limit)
+                re.compile(rb'("(?:' + names + rb')"\s*:\s*")((?:[^"\\]|\\.)*)("|$)', re.S),
+                # Form: password=value
+                re.compile(rb"((?:^|&)(?:" + names + rb")=)([^&]*)()"),
+                # XML: <password>value</password>
+                re.compile(rb"(<(?P<n>" + names + rb")>)([^<]*)(</(?P=n)>|$)"),
+            ]
+        return patterns
+
+
+class BasisMiddleware:
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        # 从 X-Forwarded-Proto 获取实际 scheme，并覆盖 scope (base_url 会自动使用它)
+        forwarded_scheme = Headers(scope=scope).get("X-Forwarded-Proto")
         if forwarded_scheme:
-            request.scope["scheme"] = actual_scheme
-        
-        request.state.module = req_module
-        RequestUtil.ua = to_user_agent(user_agent)
-        RequestUtil.port = request.url.port
-        RequestUtil.host = request.client.host
-        RequestUtil.token = user_token
-        RequestUtil.module = req_module
-        RequestUtil.scheme = actual_scheme  # 同时更新你的工具类
-        RequestUtil.method = request.method
-        RequestUtil.userAgent = user_agent
-        RequestUtil.remotePort = request.client.port
-        RequestUtil.url = str(request.url)
-        RequestUtil.path = str(request.url.path)
-        RequestUtil.domain = str(request.base_url).rstrip("/")  # 现在这里会是 https
-        RequestUtil.rootDomain = str(request.base_url.netloc)
-        RequestUtil.pathParams = request.path_params
-        RequestUtil.queryParams = request.query_params
-        RequestUtil.state = request.state
-        RequestUtil.headers = request.headers
-        RequestUtil.cookies = request.cookies
-        
-        return await call_next(request)
+            scope["scheme"] = forwarded_scheme
+
+        # 请求信息绑定到当前上下文, 并发请求互不影响
+        scope.setdefault("state", {})["module"] = scope["path"].strip("/").split("/")[0]
+        token = RequestUtil.bind(scope)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            RequestUtil.reset(token)
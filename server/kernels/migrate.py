@@ -0,0 +1,389 @@
+# +----------------------------------------------------------------------
+# | WaitAdmin(fastapi)快速开发后台管理系统
+# +----------------------------------------------------------------------
+# | 欢迎阅读学习程序代码,建议反馈是我们前进的动力
+# | 程序完全开源可支持商用,允许去除界面版权信息
+# | gitee:   https://gitee.com/wafts/waitadmin-python
+# | github:  https://github.com/topwait/waitadmin-python
+# | 官方网站: https://www.waitadmin.cn
+# | WaitAdmin团队版权所有并拥有最终解释权
+# +----------------------------------------------------------------------
+# | Author: WaitAdmin Team <2474369941@qq.com>
+# +----------------------------------------------------------------------
+"""
+Versioned schema migrations.
+
+    python -m kernels.migrate status          # applied/pending migrations, indexes missing in the database
+    python -m kernels.migrate upgrade         # create missing tables, apply pending migrations
+    python -m kernels.migrate diff <name>     # write a migration adding the missing indexes
+    python -m kernels.migrate explain         # EXPLAIN the hot queries
+
+Migrations are modules named ``v0001_<name>.py`` in the migrations package, each
+defining ``operations`` (a list of ``AddIndex`` / ``RunSQL`` / ``RunPython``). Applied versions are
+recorded in the ``schema_migration`` table. Index DDL is online where the database
+supports it (MySQL ``ALGORITHM=INPLACE, LOCK=NONE``, PostgreSQL ``CONCURRENTLY``),
+and an index that already exists with the same columns is skipped, so databases
+whose tables were created from the model definitions converge to the same state.
+"""
+import os
+import sys
+import time
+import asyncio
+import logging
+import contextlib
+import importlib
+import pkgutil
+from typing import Any, Awaitable, Callable, Dict, List, Sequence, Tuple, Type, Union
+from tortoise import Tortoise, Model, connections
+from tortoise.backends.base.client import BaseDBAsyncClient
+
+__all__ = ["AddIndex", "RunSQL", "RunPython", "Migrator"]
+
+logger = logging.getLogger(__name__)
+
+
+def __loading_migrate_configs():
+    """ Load migration configuration """
+    configs = {"package": "common.migrations", "auto_upgrade": True, "lock_timeout": 60}
+    try:
+        package = importlib.import_module("config")
+        clz = getattr(package, "GlobalSetting", None)
+        if not clz:
+            return configs
+        configs.update(clz().dict().get("MIGRATIONS") or {})
+        return configs
+    except ModuleNotFoundError:
+        return configs
+
+
+def migrate_configs() -> Dict[str, Any]:
+    return __loading_migrate_configs()
+
+
+class Inspector:
+    """ Read the indexes that exist in the database """
+
+    @classmethod
+    async def indexes(cls, client: BaseDBAsyncClient, table: str) -> Dict[str, Tuple[str, ...]]:
+        """
+        Existing indexes of a table.
+
+        Returns:
+            Dict[str, Tuple[str, ...]]: {index name: columns in index order}
+
+        Author:
+            zero
+        """
+        dialect: str = client.capabilities.dialect
+        columns: Dict[str, List[str]] = {}
+        if dialect == "mysql":
+            _, rows = await client.execute_query(
+                "SELECT INDEX_NAME AS name, COLUMN_NAME AS col FROM information_schema.STATISTICS "
+                "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s ORDER BY INDEX_NAME, SEQ_IN_INDEX",
+                [table]
+            )
+            for row in rows:
+                columns.setdefault(row["name"], []).append(row["col"])
+        elif dialect == "postgres":
+            _, rows = await client.execute_query(
+                "SELECT i.relname AS name, a.attname AS col FROM pg_index ix "
+                "JOIN pg_class t ON t.oid = ix.indrelid JOIN pg_class i ON i.oid = ix.indexrelid "
+                "JOIN pg_attribute a ON a.attrelid = t.oid AND a.attnum = ANY(ix.indkey) "
+                "WHERE t.relname = $1 ORDER BY i.relname, array_position(ix.indkey::int2[], a.attnum)",
+                [table]
+            )
+            for row in rows:
+                columns.setdefault(row["name"], []).append(row["col"])
+        else:
+            _, index_list = await client.execute_query(f'PRAGMA index_list("{table}")')
+            for index in index_list:
+                _, info = await client.execute_query(f'PRAGMA index_info("{index["name"]}")')
+                columns[index["name"]] = [r["name"] for r in sorted(info, key=lambda r: r["seqno"])]
+        return {name: tuple(cols) for name, cols in columns.items()}
+
+    @classmethod
+    def declared(cls, model: Type[Model]) -> List[Tuple[str, ...]]:
+        """ Indexes declared on a model (Meta.indexes and fields with index=True) """
+        result: List[Tuple[str, ...]] = []
+        for index in model._meta.indexes:
+            names = index if isinstance(index, (tuple, list)) else getattr(index, "fields", ())
+            result.append(tuple(model._meta.fields_map[f].source_field or f for f in names))
+        for name, field in model._meta.fields_map.items():
+            if getattr(field, "index", False) and not field.pk and not field.unique:
+                result.append((field.source_field or name,))
+        return result
+
+
+class AddIndex:
+    """ Add a secondary index (skipped when an index with the same columns exists) """
+
+    def __init__(self, model: Type[Model], fields: Sequence[str]):
+        self.model = model
+        self.fields: Tuple[str, ...] = tuple(fields)
+
+    def describe(self) -> str:
+        return f"AddIndex {self.model._meta.db_table}({', '.join(self.fields)})"
+
+    async def apply(self, client: BaseDBAsyncClient) -> bool:
+        table: str = self.model._meta.db_table
+        existing = await Inspector.indexes(client, table)
+        if self.fields in existing.values():
+            return False
+
+        name: str = client.schema_generator(client)._generate_index_name("idx", self.model, list(self.fields))
+        dialect: str = client.capabilities.dialect
+        if dialect == "mysql":
+            cols = ", ".join(f"`{f}`" for f in self.fields)
+            sql = f"ALTER TABLE `{table}` ADD INDEX `{name}` ({cols}), ALGORITHM=INPLACE, LOCK=NONE"
+        elif dialect == "postgres":
+            cols = ", ".join(f'"{f}"' for f in self.fields)
+            sql = f'CREATE INDEX CONCURRENTLY IF NOT EXISTS "{name}" ON "{table}" ({cols})'
+        else:
+            cols = ", ".join(f'"{f}"' for f in self.fields)
+            sql = f'CREATE INDEX IF NOT EXISTS "{name}" ON "{table}" ({cols})'
+        await client.execute_script(sql)
+        return True
+
+
+class RunSQL:
+    """ Run raw DDL, optionally per dialect: RunSQL({"mysql": "...", "sqlite": "..."}) """
+
+    def __init__(self, sql: Union[str, Dict[str, str]]):
+        self.sql = sql
+
+    def describe(self) -> str:
+        text = self.sql if isinstance(self.sql, str) else next(iter(self.sql.values()), "")
+        return f"RunSQL {text[:60]}"
+
+    async def apply(self, client: BaseDBAsyncClient) -> bool:
+        sql = self.sql if isinstance(self.sql, str) else self.sql.get(client.capabilities.dialect)
+        if not sql:
+            return False
+        await client.execute_script(sql)
+        return True
+
+
+class RunPython:
+    """ Run an async function for data changes: RunPython(func), func(client) returns False when it did nothing """
+
+    def __init__(self, func: Callable[[BaseDBAsyncClient], Awaitable[Any]]):
+        self.func = func
+
+    def describe(self) -> str:
+        return f"RunPython {self.func.__name__}"
+
+    async def apply(self, client: BaseDBAsyncClient) -> bool:
+        return await self.func(client) is not False
+
+
+class Migrator:
+    """ Apply versioned migrations and compare model indexes with the database """
+
+    TABLE: str = "schema_migration"
+
+    @classmethod
+    def client(cls) -> BaseDBAsyncClient:
+        """ The connection the models are bound to """
+        models = cls.models()
+        return models[0]._meta.db if models else connections.get("default")
+
+    @classmethod
+    def models(cls) -> List[Type[Model]]:
+        return [m for app in Tortoise.apps.values() for m in app.values() if not m._meta.abstract]
+
+    @classmethod
+    def migrations(cls, package: str = None) -> List[Tuple[str, str, Any]]:
+        """
+        Migration modules in version order.
+
+        Returns:
+            List[Tuple[str, str, Any]]: [(version, module name, module)]
+
+        Author:
+            zero
+        """
+        package = package or migrate_configs()["package"]
+        try:
+            pkg = importlib.import_module(package)
+        except ModuleNotFoundError:
+            return []
+        result = []
+        for info in pkgutil.iter_modules(pkg.__path__):
+            if info.name.startswith("v") and "_" in info.name:
+                version = info.name[1:].split("_", 1)[0]
+                result.append((version, info.name, importlib.import_module(f"{package}.{info.name}")))
+        return sorted(result, key=lambda r: r[0])
+
+    @classmethod
+    async def applied(cls) -> Dict[str, int]:
+        """ Applied versions: {version: applied time} """
+        client = cls.client()
+        await client.execute_script(
+            f"CREATE TABLE IF NOT EXISTS {cls._table(client)} ("
+            f"version VARCHAR(32) NOT NULL PRIMARY KEY, name VARCHAR(255) NOT NULL, applied_at INT NOT NULL)"
+        )
+        _, rows = await client.execute_query(f"SELECT version, applied_at FROM {cls._table(client)}")
+        return {row["version"]: row["applied_at"] for row in rows}
+
+    @classmethod
+    async def upgrade(cls) -> List[str]:
+        """
+        Create missing tables, then apply pending migrations in order.
+
+        Everything runs on one connection holding the migration lock: MySQL GET_LOCK and
+        PostgreSQL advisory locks belong to the session that took them.
+
+        Returns:
+            List[str]: Names of the migrations applied.
+
+        Author:
+            zero
+        """
+        async with cls._locked(cls.client()) as client:
+            await Tortoise.generate_schemas(safe=True)
+            done = await cls.applied()
+            applied: List[str] = []
+            for version, name, module in cls.migrations():
+                if version in done:
+                    continue
+                start = time.perf_counter()
+                for operation in getattr(module, "operations", []):
+                    changed = await operation.apply(client)
+                    logger.info("%s %s: %s", name, operation.describe(), "applied" if changed else "skipped")
+                await client.execute_query(
+                    f"INSERT INTO {cls._table(client)} (version, name, applied_at) VALUES ({cls._marks(client, 3)})",
+                    [version, name, int(time.time())]
+                )
+                applied.append(name)
+                logger.info("Migration %s applied in %.0fms", name, (time.perf_counter() - start) * 1000)
+            return applied
+
+    @classmethod
+    async def missing_indexes(cls) -> List[AddIndex]:
+        """ Indexes declared on models that do not exist in the database """
+        client = cls.client()
+        missing: List[AddIndex] = []
+        for model in cls.models():
+            declared = Inspector.declared(model)
+            if not declared:
+                continue
+            existing = set((await Inspector.indexes(client, model._meta.db_table)).values())
+            missing.extend(AddIndex(model, cols) for cols in declared if cols not in existing)
+        return missing
+
+    @classmethod
+    def write(cls, name: str, operations: List[AddIndex], package: str = None) -> str:
+        """
+        Write a migration module for the given index operations.
+
+        Returns:
+            str: The file path written.
+
+        Author:
+            zero
+        """
+        package = package or migrate_configs()["package"]
+        versions = [int(v) for v, _, _ in cls.migrations(package) if v.isdigit()]
+        version = f"{(max(versions) if versions else 0) + 1:04d}"
+        path = os.path.join(*package.split("."), f"v{version}_{name}.py")
+
+        imports = sorted({(m.model.__module__, m.model.__name__) for m in operations})
+        lines = ['""" ' + name.replace("_", " ") + ' """', "from kernels.migrate import AddIndex"]
+        lines += [f"from {module} import {clz}" for module, clz in imports]
+        lines += ["", "operations = ["]
+        lines += [f"    AddIndex({m.model.__name__}, {m.fields!r})," for m in operations]
+        lines += ["]", ""]
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            f.write("\n".join(lines))
+        return path
+
+    @classmethod
+    async def explain(cls, sql: str) -> List[dict]:
+        """ The query plan of a statement """
+        client = cls.client()
+        prefix = "EXPLAIN QUERY PLAN" if client.capabilities.dialect == "sqlite" else "EXPLAIN"
+        _, rows = await client.execute_query(f"{prefix} {sql}")
+        return [dict(row) for row in rows]
+
+    @classmethod
+    def _table(cls, client: BaseDBAsyncClient) -> str:
+        quote = "`" if client.capabilities.dialect == "mysql" else '"'
+        return f"{quote}{cls.TABLE}{quote}"
+
+    @classmethod
+    def _marks(cls, client: BaseDBAsyncClient, n: int) -> str:
+        dialect: str = client.capabilities.dialect
+        if dialect == "postgres":
+            return ", ".join(f"${i + 1}" for i in range(n))
+        return ", ".join(["%s" if dialect == "mysql" else "?"] * n)
+
+    @classmethod
+    @contextlib.asynccontextmanager
+    async def _locked(cls, client: BaseDBAsyncClient):
+        """ Serialize upgrades of workers that boot at the same time (yields the pinned connection) """
+        dialect: str = client.capabilities.dialect
+        if dialect not in ("mysql", "postgres"):
+            yield client
+            return
+
+        timeout: int = int(migrate_configs().get("lock_timeout", 60))
+        async with client.acquire_connection() as conn:
+            # The dialect's transaction wrapper bound to this connection, used without BEGIN (autocommit)
+            pinned = client._in_transaction().connection
+            pinned._connection = conn
+            token = connections.set(client.connection_name, pinned)
+            try:
+                if dialect == "mysql":
+                    _, rows = await pinned.execute_query("SELECT GET_LOCK('schema_migration', %s) AS ok", [timeout])
+                    if not rows or not rows[0]["ok"]:
+                        raise RuntimeError("Timed out waiting for the schema migration lock")
+                    try:
+                        yield pinned
+                    finally:
+                        await pinned.execute_query("SELECT RELEASE_LOCK('schema_migration')")
+                else:
+                    await pinned.execute_query("SELECT pg_advisory_lock(hashtext('schema_migration'))")
+                    try:
+                        yield pinned
+                    finally:
+                        await pinned.execute_query("SELECT pg_advisory_unlock(hashtext('schema_migration'))")
+            finally:
+                connections.reset(token)
+
+
+async def __main(command: str, args: List[str]):
+    from kernels.database import db_configs
+    await Tortoise.init(config=db_configs())
+    try:
+        if command == "upgrade":
+            applied = await Migrator.upgrade()
+            print(f"Applied {len(applied)} migration(s): {', '.join(applied) or '-'}")
+        elif command == "diff":
+            missing = await Migrator.missing_indexes()
+            if not missing:
+                print("Models and database indexes are in sync")
+            elif args:
+                print(f"Wrote {Migrator.write(args[0], missing)}")
+            else:
+                for operation in missing:
+                    print(operation.describe())
+        elif command == "explain":
+            module = importlib.import_module(migrate_configs()["package"])
+            for title, queryset in getattr(module, "hot_queries", lambda: {})().items():
+                sql = queryset.sql()
+                print(f"== {title}\n{sql}")
+                for row in await Migrator.explain(sql):
+                    print("   ", row)
+        else:
+            done = await Migrator.applied()
+            for version, name, _ in Migrator.migrations():
+                print(f"{'applied' if version in done else 'pending'}  {name}")
+            for operation in await Migrator.missing_indexes():
+                print(f"missing  {operation.describe()}")
+    finally:
+        await Tortoise.close_connections()
+
+
+if __name__ == "__main__":
+    asyncio.run(__main(sys.argv[1] if len(sys.argv) > 1 else "status", sys.argv[2:]))
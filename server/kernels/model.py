@@ -11,16 +11,28 @@
 # | Author: WaitAdmin Team <2474369941@qq.com>
 # +----------------------------------------------------------------------
 import os
+import json
 import time
+import zlib
+import base64
+import asyncio
+import hashlib
 import inspect
+import logging
 import importlib
 import operator
 from functools import reduce
-from typing import Union, TypeVar, Type, Any, List, Tuple
+from typing import Union, TypeVar, Type, Any, List, Tuple, Set, Optional, Sequence
 from pydantic import TypeAdapter
 from tortoise.models import Model
-from tortoise.queryset import Q
-from hypertext import PagingResult
+from tortoise.queryset import Q, QuerySet
+from tortoise.backends.base.client import BaseTransactionWrapper
+from hypertext import PagingResult, CursorResult
+from common.utils.cache import RedisUtil, SingleFlight
+from common.utils.times import TimeUtil
+from exception import AppException
+
+logger = logging.getLogger(__name__)
 
 __all__ = ["DbModel"]
 
@@ -31,6 +43,12 @@ class DbModel(Model):
 
     DB_CONFIGS = {}
 
+    COUNT_PREFIX = "paginate:count:"
+    count_refresh: int = 60     # cached totals older than this are recounted in the background
+    count_ttl: int = 3600       # cached totals are dropped after this
+
+    _refreshing: Set[asyncio.Task] = set()
+
     class Meta:
         abstract = True
 
@@ -44,25 +62,275 @@ class DbModel(Model):
             auto_timestamp: bool = True,
             datetime_field: List = None,
             datetime_format: str = "%Y-%m-%d %H:%M:%S",
+            count_mode: str = "exact",
+            count_cap: int = 10000,
+            concurrent: bool = True,
     ):
+        """
+        Offset pagination
+
+        count_mode:
+            exact     COUNT(*) on every call
+            cached    COUNT(*) cached per filter signature (see cached_count)
+            estimate  count at most count_cap + 1 rows; past the cap the total is the cap
+                      (or the table statistics when the query has no filter) and the
+                      result is flagged approximate
+
+        With concurrent=True the count and the page query run at the same time on
+        separate pool connections; inside a transaction (one connection) they run in turn.
+        """
         fields = [] if not fields else fields
-        _count = await model.count()
-        _lists = await model.limit(page_size).offset((page_no - 1) * page_size).values(*fields)
+        counting = cls.count_of(model, count_mode, count_cap)
+        page = model.limit(page_size).offset((page_no - 1) * page_size).values(*fields)
+        if concurrent and not isinstance(model._choose_db(), BaseTransactionWrapper):
+            (_count, approximate), _lists = await asyncio.gather(counting, page)
+        else:
+            _count, approximate = await counting
+            _lists = await page
+        return cls.paginate_rows(
+            _lists, _count, page_no, page_size,
+            schema=schema,
+            auto_timestamp=auto_timestamp,
+            datetime_field=datetime_field,
+            datetime_format=datetime_format,
+            approximate=approximate
+        )
 
-        for item in _lists:
-            if auto_timestamp:
-                tf = datetime_field if datetime_field else ["create_time", "update_time", "delete_time"]
-                for s in tf:
+    @classmethod
+    def paginate_rows(
+            cls, lists: List[dict],
+            count: int,
+            page_no: int = 1,
+            page_size: int = 15,
+            schema: Any = None,
+            auto_timestamp: bool = True,
+            datetime_field: List = None,
+            datetime_format: str = "%Y-%m-%d %H:%M:%S",
+            approximate: bool = False,
+    ):
+        """ Build a paging result from rows fetched elsewhere (same formatting as paginate) """
+        _lists, _count = lists, count
+        if auto_timestamp:
+            # Column at a time, so the batch formatter can share work between rows
+            tf = datetime_field if datetime_field else ["create_time", "update_time", "delete_time"]
+            for s in tf:
+                rows = [item for item in _lists if item.get(s)]
+                for item in _lists:
                     if item.get(s) is not None and not item.get(s):
                         item[s] = ""
-                    elif item.get(s):
-                        time_array = time.localtime(item.get(s))
-                        item[s] = time.strftime(datetime_format, time_array)
+                for item, value in zip(rows, TimeUtil.timestamps_to_dates([r[s] for r in rows], datetime_format)):
+                    item[s] = value
 
         if schema:
             _lists = [TypeAdapter(schema).validate_python(item) for item in _lists]
 
-        return PagingResult.create(_lists, _count, page_no, page_size)
+        return PagingResult.create(_lists, _count, page_no, page_size, approximate)
+
+    @classmethod
+    async def paginate_ids(
+            cls, model: QuerySet,
+            ids: Sequence[int],
+            page_no: int = 1,
+            page_size: int = 15,
+            schema: Any = None,
+            fields: List = None,
+            auto_timestamp: bool = True,
+            datetime_field: List = None,
+            datetime_format: str = "%Y-%m-%d %H:%M:%S",
+    ):
+        """
+        Paginate an ordered id list (e.g. search results)
+
+        The total is len(ids) and rows keep the order of the list; ids the queryset
+        no longer matches are skipped.
+        """
+        pk = model.model._meta.pk_attr
+        page_ids = list(ids[(page_no - 1) * page_size:page_no * page_size])
+        values = list(fields or [])
+        extra = [pk] if values and pk not in values else []
+
+        _lists = []
+        if page_ids:
+            rows = await model.filter(**{f"{pk}__in": page_ids}).values(*values, *extra)
+            mapping = {r[pk]: r for r in rows}
+            _lists = [mapping[i] for i in page_ids if i in mapping]
+            for item in _lists:
+                for k in extra:
+                    item.pop(k, None)
+
+        return cls.paginate_rows(
+            _lists, len(ids), page_no, page_size,
+            schema=schema,
+            auto_timestamp=auto_timestamp,
+            datetime_field=datetime_field,
+            datetime_format=datetime_format
+        )
+
+    @classmethod
+    async def count_of(cls, model: QuerySet, count_mode: str = "exact", count_cap: int = 10000) -> Tuple[int, bool]:
+        """
+        Count the rows of a queryset
+
+        Returns (total, approximate); see paginate for the modes.
+        """
+        if count_mode == "exact":
+            return await model.count(), False
+        if count_mode == "cached":
+            return await cls.cached_count(model), False
+        if count_mode != "estimate":
+            raise ValueError(f"Unknown count_mode: {count_mode}")
+
+        db = model._choose_db()
+        capped = model.order_by().limit(count_cap + 1).values_list(model.model._meta.pk_attr).sql()
+        rows = await db.execute_query_dict(f"SELECT COUNT(*) AS total FROM ({capped}) AS capped")
+        total = int(rows[0]["total"])
+        if total <= count_cap:
+            return total, False
+        if not model._q_objects:
+            estimated = await cls._table_rows(db, model.model._meta.db_table)
+            if estimated is not None and estimated > count_cap:
+                return estimated, True
+        return count_cap, True
+
+    @staticmethod
+    async def _table_rows(db, table: str) -> Optional[int]:
+        """ Row count from the table statistics (None when the dialect has none) """
+        dialect = db.capabilities.dialect
+        if dialect == "mysql":
+            sql = ("SELECT TABLE_ROWS AS n FROM information_schema.TABLES"
+                   " WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s")
+        elif dialect == "postgres":
+            sql = "SELECT reltuples::bigint AS n FROM pg_class WHERE relname = $1"
+        else:
+            return None
+        rows = await db.execute_query_dict(sql, [table])
+        return int(rows[0]["n"]) if rows and rows[0]["n"] is not None else None
+
+    @classmethod
+    async def paginate_cursor(
+            cls, model: QuerySet,
+            cursor: Optional[str] = None,
+            page_size: int = 15,
+            order_by: Sequence[str] = ("-id",),
+            schema: Any = None,
+            fields: List = None,
+            auto_timestamp: bool = True,
+            datetime_field: List = None,
+            datetime_format: str = "%Y-%m-%d %H:%M:%S",
+            with_total: bool = True,
+    ):
+        """
+        Keyset (cursor) pagination
+
+        Seeks past the last row of the previous page with a (sort key, id) comparison
+        instead of OFFSET, so every page costs the same however deep it is. The total is
+        read through cached_count, so page turns do not repeat the COUNT(*).
+
+        Sort keys must be non-null columns; "-id" (or "id") is appended as the tie-breaker.
+        """
+        query, order = cls.keyset(model, cursor, order_by)
+        keys = [o.lstrip("-") for o in order]
+        values = list(fields or [])
+        extra = [k for k in keys if values and k not in values]
+
+        _total = await cls.cached_count(model) if with_total else 0
+        _lists = await query.limit(page_size + 1).values(*values, *extra)
+
+        next_cursor = None
+        if len(_lists) > page_size:
+            _lists = _lists[:page_size]
+            next_cursor = cls.make_cursor(_lists[-1], order)
+        for item in _lists:
+            for k in extra:
+                item.pop(k, None)
+
+        _pager = cls.paginate_rows(
+            _lists, _total,
+            page_size=page_size,
+            schema=schema,
+            auto_timestamp=auto_timestamp,
+            datetime_field=datetime_field,
+            datetime_format=datetime_format
+        )
+        return CursorResult.create(_pager.lists, _total, page_size, next_cursor)
+
+    @classmethod
+    def keyset(cls, model: QuerySet, cursor: Optional[str], order_by: Sequence[str]) -> Tuple[QuerySet, List[str]]:
+        """
+        Apply a cursor to a queryset
+
+        Returns the queryset filtered past the cursor and ordered by the normalized
+        sort keys, together with those keys (needed by make_cursor).
+        """
+        order = list(order_by)
+        if not any(o.lstrip("-") in ("id", "pk") for o in order):
+            order.append("-id")
+
+        if cursor:
+            values = cls._decode_cursor(cursor, order)
+            branches = []
+            for i, o in enumerate(order):
+                cond = {order[j].lstrip("-"): values[j] for j in range(i)}
+                cond[o.lstrip("-") + ("__lt" if o.startswith("-") else "__gt")] = values[i]
+                branches.append(Q(**cond))
+            model = model.filter(reduce(operator.or_, branches))
+        return model.order_by(*order), order
+
+    @classmethod
+    def make_cursor(cls, row: Union[dict, Model], order: Sequence[str]) -> str:
+        """ Encode the sort key values of a row as an opaque cursor """
+        keys = [o.lstrip("-") for o in order]
+        values = [row[k] if isinstance(row, dict) else getattr(row, k) for k in keys]
+        payload = json.dumps([cls._cursor_sign(order), *values], default=str, separators=(",", ":"))
+        return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii").rstrip("=")
+
+    @classmethod
+    def _decode_cursor(cls, cursor: str, order: Sequence[str]) -> list:
+        try:
+            raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+            sign, *values = json.loads(raw)
+        except Exception:
+            raise AppException("分页游标无效")
+        if sign != cls._cursor_sign(order) or len(values) != len(order):
+            raise AppException("分页游标无效")
+        return values
+
+    @staticmethod
+    def _cursor_sign(order: Sequence[str]) -> int:
+        return zlib.crc32(",".join(order).encode("utf-8")) & 0xFFFF
+
+    @classmethod
+    async def cached_count(cls, model: QuerySet) -> int:
+        """
+        COUNT(*) cached per filter signature
+
+        The signature is the COUNT statement itself. A missing entry is counted in place
+        (concurrent callers share one query); an entry older than count_refresh is
+        returned as is while a background task recounts it.
+        """
+        query = model.count()
+        key = cls.COUNT_PREFIX + hashlib.sha1(query.sql().encode("utf-8")).hexdigest()
+        cached = await RedisUtil.get(key)
+        if cached:
+            total, counted_at = cached.split(":", 1)
+            if time.time() - float(counted_at) >= cls.count_refresh:
+                task = asyncio.create_task(SingleFlight.do(key, lambda: cls._recount(key, model)))
+                cls._refreshing.add(task)
+                task.add_done_callback(cls._refreshed)
+            return int(total)
+        return await SingleFlight.do(key, lambda: cls._recount(key, model))
+
+    @classmethod
+    async def _recount(cls, key: str, model: QuerySet) -> int:
+        total = await model.count()
+        await RedisUtil.set(key, f"{total}:{time.time()}", cls.count_ttl)
+        return total
+
+    @classmethod
+    def _refreshed(cls, task: asyncio.Task):
+        cls._refreshing.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            logger.warning("Paginate recount failed: %s", task.exception())
 
     @classmethod
     def without_field(cls, fields: Union[str, List, Tuple]):
@@ -14,6 +14,7 @@ import os
 import importlib
 from typing import List, Dict
 from fastapi import APIRouter, FastAPI, Depends
+from kernels.boot import Manifest
 
 __all__ = ["configure_router"]
 
@@ -44,15 +45,21 @@ class AutomaticRegRouter:
         # 获取路由配置
         setting = self.__get_config()
 
+        # 应用和控制器列表 (目录未变化时读取缓存的清单)
+        manifest = Manifest.load("routers", [self.app_module], lambda: {
+            "apps": self.__get_apps(),
+            "controllers": self.__get_controller()
+        })
+
         # 获取所有应用名称
         apps = []
-        for app in self.__get_apps():
+        for app in manifest["apps"]:
             # 加载路由拦截器
             self.__router_interceptor(app)
             apps.append(app)
 
         # 遍历所有控制器模块
-        for module_name in self.__get_controller():
+        for module_name in manifest["controllers"]:
             module = importlib.import_module(module_name)
             if "router" not in module.__dict__:
                 continue
@@ -275,8 +282,8 @@ class AutomaticRegRouter:
 
 def configure_router(app: FastAPI):
     """ Configure Router """
+    if not router_register:
+        AutomaticRegRouter().load_reg_api()
+
     for key in router_register:
         app.include_router(router_register[key])
-
-
-AutomaticRegRouter().load_reg_api()
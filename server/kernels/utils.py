@@ -10,7 +10,107 @@
 # +----------------------------------------------------------------------
 # | Author: WaitAdmin Team <2474369941@qq.com>
 # +----------------------------------------------------------------------
-class RequestUtil:
+from contextvars import ContextVar, Token
+from typing import Any, Callable, Dict, Optional
+from starlette.requests import Request
+from starlette.types import Scope
+
+__all__ = ["RequestUtil", "RequestContext", "to_user_agent"]
+
+
+def to_user_agent(ua: str):
+    ua_dict = {
+        "wechat": "MicroMessenger",
+        "chrome": "Chrome",
+        "firefox": "Firefox",
+        "safari": "Safari",
+        "opera": "Opera",
+        "edge": "Edge"
+    }
+
+    ua = ua.lower()
+    for key, value in ua_dict.items():
+        if value in ua:
+            return key
+
+    if "msie" in ua or "trident/" in ua:
+        return "ie"
+
+    return "other"
+
+
+class RequestContext:
+    """ Per-request values, each computed on first access """
+
+    FIELDS: Dict[str, Callable[[Request], Any]] = {
+        "ua": lambda r: to_user_agent(r.headers.get("User-Agent", "")),
+        "host": lambda r: r.client.host if r.client else "",
+        "port": lambda r: r.url.port,
+        "token": lambda r: r.headers.get("Authorization", "").split(" ")[-1],
+        "module": lambda r: r.url.path.strip("/").split("/")[0],
+        "scheme": lambda r: r.scope.get("scheme"),
+        "method": lambda r: r.method,
+        "userAgent": lambda r: r.headers.get("User-Agent", ""),
+        "remotePort": lambda r: r.client.port if r.client else None,
+        "domain": lambda r: str(r.base_url).rstrip("/"),
+        "rootDomain": lambda r: r.base_url.netloc,
+        "url": lambda r: str(r.url),
+        "path": lambda r: r.url.path,
+        "pathParams": lambda r: r.path_params,
+        "queryParams": lambda r: r.query_params,
+        "state": lambda r: r.state,
+        "headers": lambda r: r.headers,
+        "cookies": lambda r: r.cookies,
+    }
+
+    __slots__ = ("scope", "values", "_request")
+
+    def __init__(self, scope: Optional[Scope] = None):
+        self.scope = scope
+        self.values: Dict[str, Any] = {}
+        self._request: Optional[Request] = None
+
+    def get(self, name: str) -> Any:
+        if name in self.values:
+            return self.values[name]
+        if name not in self.FIELDS:
+            raise AttributeError(name)
+        if self.scope is None:
+            return None
+        if self._request is None:
+            self._request = Request(self.scope)
+        value = self.values[name] = self.FIELDS[name](self._request)
+        return value
+
+
+_request_context: ContextVar[Optional[RequestContext]] = ContextVar("request_context", default=None)
+
+
+class _RequestMeta(type):
+    def __getattr__(cls, name: str) -> Any:
+        if name.startswith("__"):
+            raise AttributeError(name)
+        context = _request_context.get()
+        return context.get(name) if context is not None else None
+
+    def __setattr__(cls, name: str, value: Any):
+        if name not in RequestContext.FIELDS:
+            return super().__setattr__(name, value)
+        context = _request_context.get()
+        if context is None:
+            context = RequestContext()
+            _request_context.set(context)
+        context.values[name] = value
+
+
+class RequestUtil(metaclass=_RequestMeta):
+    """
+    Current request information
+
+    Values live in a ContextVar bound by BasisMiddleware, so concurrent
+    requests never see each other's data; outside a request they are None.
+    """
+
     ua: str
     host: str
     port: int
@@ -29,3 +129,17 @@ class RequestUtil:
     state: any
     headers: dict
     cookies: dict
+
+    @staticmethod
+    def bind(scope: Scope) -> Token:
+        """ Bind the request scope to the current context """
+        return _request_context.set(RequestContext(scope))
+
+    @staticmethod
+    def reset(token: Token):
+        """ Restore the context that was active before bind() """
+        _request_context.reset(token)
+
+    @staticmethod
+    def current() -> Optional[RequestContext]:
+        return _request_context.get()
@@ -10,7 +10,10 @@
 # +----------------------------------------------------------------------
 # | Author: WaitAdmin Team <2474369941@qq.com>
 # +----------------------------------------------------------------------
-from fastapi import FastAPI, APIRouter
+import hmac
+from kernels.boot import BootTimer
+from fastapi import FastAPI, APIRouter, Request
+from fastapi.responses import PlainTextResponse
 from fastapi.openapi.docs import get_swagger_ui_html
 from kernels.database import register_db
 from kernels.logger import configure_logger
@@ -19,6 +22,9 @@ from kernels.router import configure_router
 from kernels.statics import configure_static
 from kernels.middleware import configure_middleware
 from exception import configure_exception
+from middleware import MetricsMiddleware
+from common.utils.metrics import MetricsUtil
+from common.utils.profiler import QueryProfiler
 from config import get_settings
 
 
@@ -26,6 +32,7 @@ router = APIRouter()
 
 
 def create_app() -> FastAPI:
+    BootTimer.mark("imports")
     application = FastAPI(
         debug=get_settings().APP_DEBUG,
         version=get_settings().VERSION,
@@ -37,11 +44,25 @@ def create_app() -> FastAPI:
     configure_logger()
     configure_event(application)
     configure_exception(application)
-    configure_middleware(application)
-    configure_router(application)
+    BootTimer.mark("setup")
+    with BootTimer.phase("middleware"):
+        configure_middleware(application)
+        if get_settings().METRICS.get("enable"):
+            # 请求指标 (最外层, 耗时包含全部中间件)
+            application.add_middleware(MetricsMiddleware)
+    with BootTimer.phase("router"):
+        configure_router(application)
     configure_static(application)
-    register_db(application)
+    with BootTimer.phase("database"):
+        register_db(application)
     application.include_router(router)
+    BootTimer.mark("app")
+
+    @application.on_event("startup")
+    async def boot_report():
+        # 在全部启动事件(含数据库连接和建表)之后执行
+        BootTimer.mark("startup")
+        BootTimer.report(get_settings().BOOT_BUDGET)
 
     return application
 
@@ -56,6 +77,23 @@ async def custom_swagger_ui_html():
     )
 
 
+@router.get("/metrics", include_in_schema=False)
+async def metrics(request: Request):
+    token: str = get_settings().METRICS.get("token", "")
+    if not (get_settings().METRICS.get("enable") and token):
+        return PlainTextResponse("Not Found", status_code=404)
+    if not hmac.compare_digest(request.headers.get("Authorization", ""), f"Bearer {token}"):
+        return PlainTextResponse("Unauthorized", status_code=401)
+    return PlainTextResponse(await MetricsUtil.render(), media_type="text/plain; version=0.0.4")
+
+
+@router.get("/debug/queries", include_in_schema=False)
+async def debug_queries():
+    if not (get_settings().APP_DEBUG and get_settings().PROFILER.get("enable")):
+        return PlainTextResponse("Not Found", status_code=404)
+    return {"budget": QueryProfiler.query_budget, "requests": list(reversed(QueryProfiler.history))}
+
+
 app = create_app()
 
 
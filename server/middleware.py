@@ -10,14 +10,16 @@
 # +----------------------------------------------------------------------
 # | Author: WaitAdmin Team <2474369941@qq.com>
 # +----------------------------------------------------------------------
+import time
 import typing
 import asyncio
-from abc import ABC
 from fastapi import FastAPI
 from fastapi.responses import JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
-from starlette.middleware.base import BaseHTTPMiddleware
-from starlette.types import ASGIApp
+from starlette.types import ASGIApp, Scope, Receive, Send, Message
+from config import get_settings
+from common.utils.metrics import MetricsUtil
+from common.utils.profiler import QueryProfiler
 
 
 def init_middlewares(app: FastAPI):
@@ -35,13 +37,94 @@ def init_middlewares(app: FastAPI):
     timeout_middleware: typing.Type[any] = TimeoutMiddleware
     app.add_middleware(timeout_middleware, timeout=500)
 
-class TimeoutMiddleware(BaseHTTPMiddleware, ABC):
+    # 查询分析中间件
+    profiler = get_settings().PROFILER
+    if profiler.get("enable"):
+        QueryProfiler.query_budget = profiler.get("query_budget", 30)
+        QueryProfiler.repeat_threshold = profiler.get("repeat_threshold", 5)
+        QueryProfiler.install(c["engine"] for c in get_settings().DATABASES["connections"].values())
+        profiler_middleware: typing.Type[any] = QueryProfilerMiddleware
+        app.add_middleware(profiler_middleware, debug=get_settings().APP_DEBUG)
+
+
+class TimeoutMiddleware:
     def __init__(self, app: ASGIApp, timeout: int = 15):
-        super().__init__(app)
+        self.app = app
         self.timeout = timeout
 
-    async def dispatch(self, request, call_next):
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        started: bool = False
+
+        async def _send(message: Message):
+            nonlocal started
+            if message["type"] == "http.response.start":
+                started = True
+            await send(message)
+
         try:
-            return await asyncio.wait_for(call_next(request), timeout=self.timeout)
+            await asyncio.wait_for(self.app(scope, receive, _send), timeout=self.timeout)
         except asyncio.TimeoutError:
-            return JSONResponse({"code": 1, "msg": "Request timeout", "data": []})
+            # 响应已开始发送时无法再替换
+            if not started:
+                response = JSONResponse({"code": 1, "msg": "Request timeout", "data": []})
+                await response(scope, receive, send)
+
+
+class QueryProfilerMiddleware:
+    def __init__(self, app: ASGIApp, debug: bool = False):
+        self.app = app
+        self.debug = debug
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        async def _send(message: Message):
+            # 调试模式在响应头附带查询次数和耗时
+            if message["type"] == "http.response.start":
+                profile = QueryProfiler.current()
+                message["headers"] = [
+                    *message.get("headers", []),
+                    (b"x-db-queries", str(profile.count).encode()),
+                    (b"x-db-time", f"{profile.elapsed * 1000:.1f}ms".encode())
+                ]
+            await send(message)
+
+        token = QueryProfiler.begin(scope["method"], scope["path"])
+        try:
+            await self.app(scope, receive, _send if self.debug else send)
+        finally:
+            route = scope.get("route")
+            QueryProfiler.end(token, getattr(route, "path", None))
+
+
+class MetricsMiddleware:
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        status: int = 500
+
+        async def _send(message: Message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        module: str = MetricsUtil.module_of(scope["path"])
+        inflight: typing.Dict[str, int] = MetricsUtil.inflight
+        inflight[module] = inflight.get(module, 0) + 1
+        start_time: float = time.perf_counter()
+        try:
+            await self.app(scope, receive, _send)
+        finally:
+            inflight[module] -= 1
+            # 路由模板在路由匹配后写入scope, 未匹配(404/静态资源)的请求统一归为other
+            route = scope.get("route")
+            MetricsUtil.observe(scope["method"], getattr(route, "path", "other"), status, time.perf_counter() - start_time)
@@ -0,0 +1,60 @@
+# +----------------------------------------------------------------------
+# | WaitAdmin(fastapi)快速开发后台管理系统
+# +----------------------------------------------------------------------
+# | 欢迎阅读学习程序代码,建议反馈是我们前进的动力
+# | 程序完全开源可支持商用,允许去除界面版权信息
+# | gitee:   https://gitee.com/wafts/waitadmin-python
+# | github:  https://github.com/topwait/waitadmin-python
+# | 官方网站: https://www.waitadmin.cn
+# | WaitAdmin团队版权所有并拥有最终解释权
+# +----------------------------------------------------------------------
+# | Author: WaitAdmin Team <2474369941@qq.com>
+# +----------------------------------------------------------------------
+"""
+插件启动耗时和内存基准 (不被业务代码导入)
+
+    python -m plugins.benchmark
+
+分别在关闭以图搜图、开启未使用、开启并加载插件时, 用子进程测量导入商品服务的耗时、加载插件的耗时和最大内存。
+"""
+import os
+import sys
+import json
+import subprocess
+
+PROBE = """
+import json, os, resource, sys, time
+start = time.perf_counter()
+import apps.api.service.commodity_service
+import apps.admin.service.shopping.commodity_service
+boot = time.perf_counter() - start
+from plugins.registry import PluginRegistry
+loaded, error = 0.0, ""
+if sys.argv[1] == "1":
+    start = time.perf_counter()
+    try:
+        PluginRegistry.get("embedding")._ensure_initialized()
+        PluginRegistry.get("milvus")
+    except Exception as e:
+        error = type(e).__name__ + ": " + str(e)[:60]
+    loaded = time.perf_counter() - start
+rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+print(json.dumps({"boot": boot, "loaded": loaded, "rss": rss, "error": error}))
+"""
+
+
+def main():
+    print(f"{'image search':<16}{'import ms':>12}{'plugin ms':>12}{'max rss MB':>12}")
+    for label, enable, use in (("disabled", "False", "0"), ("enabled/idle", "True", "0"), ("enabled/used", "True", "1")):
+        env = {**os.environ, "MILVUS_ENABLE": enable}
+        out = subprocess.run([sys.executable, "-c", PROBE, use], env=env, capture_output=True, text=True)
+        line = out.stdout.strip().splitlines()[-1] if out.stdout.strip() else ""
+        if not line.startswith("{"):
+            print(f"{label:<16}failed: {out.stderr.strip().splitlines()[-1:]}")
+            continue
+        r = json.loads(line)
+        print(f"{label:<16}{r['boot'] * 1000:>12.0f}{r['loaded'] * 1000:>12.0f}{r['rss']:>12.1f}  {r['error']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -163,5 +163,10 @@ class MilvusService:
 
 
 # ==================== 模块级单例实例 ====================
-# 直接导入这个变量使用即可，整个应用只会真正初始化一次
-milvus_service = MilvusService()
\ No newline at end of file
+# 兼容旧的 `from plugins.milvus.milvus_service import milvus_service`:
+# 返回插件注册表中共享的实例(首次访问时创建), 新代码请使用 PluginRegistry.aget("milvus")
+def __getattr__(name: str):
+    if name == "milvus_service":
+        from plugins.registry import PluginRegistry
+        return PluginRegistry.get("milvus")
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -12,10 +12,13 @@
 # +----------------------------------------------------------------------
 import json
 import time
+from typing import Optional
 from exception import AppException
 from common.models.notice import NoticeSetting
 from common.models.notice import NoticeRecord
 from common.enums.notice import NoticeEnum
+from common.enums.cache import CacheTagEnum
+from common.utils.cache import cached
 from plugins.msg.engine.ems import EmsNotice
 from plugins.msg.engine.sms import SmsNotice
 
@@ -37,14 +40,9 @@ class MsgDriver:
         Author:
             zero
         """
-        notice = await NoticeSetting.filter(is_delete=0, scene=scene).first()
-
-        if notice:
-            template = notice.__dict__
-            template["variable"] = json.loads(notice.variable)
-            template["ems_template"] = json.loads(notice.ems_template)
-            template["sms_template"] = json.loads(notice.sms_template)
+        template = await cls.template(scene)
 
+        if template:
             if template["ems_template"].get("status", 0):
                 return await EmsNotice().send(scene, params, template)
 
@@ -53,6 +51,30 @@ class MsgDriver:
         else:
             raise AppException("通知场景不存在")
 
+    @classmethod
+    @cached("notice:scene:{scene}", ttl=3600, tags=[CacheTagEnum.NOTICE])
+    async def template(cls, scene: int) -> Optional[dict]:
+        """
+        获取通知场景的模板配置 (已缓存)。
+
+        Args:
+            scene (int): 通知场景编号。
+
+        Returns:
+            Optional[dict]: 模板配置, 场景不存在时返回None。
+
+        Author:
+            zero
+        """
+        notice = await NoticeSetting.filter(is_delete=0, scene=scene).first().values()
+        if not notice:
+            return None
+
+        notice["variable"] = json.loads(notice["variable"])
+        notice["ems_template"] = json.loads(notice["ems_template"])
+        notice["sms_template"] = json.loads(notice["sms_template"])
+        return notice
+
     @classmethod
     async def check_code(cls, scene: int, code: str, auto_verify: bool = False) -> bool:
         """
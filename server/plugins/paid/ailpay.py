@@ -11,6 +11,7 @@
 # | Author: WaitAdmin Team <2474369941@qq.com>
 # +----------------------------------------------------------------------
 import json
+from typing import Dict
 from alipay import AliPay
 from alipay.utils import AliPayConfig
 from kernels.utils import RequestUtil
@@ -18,6 +19,8 @@ from exception import AppException
 from common.enums.pay import PayEnum
 from common.enums.client import ClientEnum
 from common.models.dev import DevPayConfigModel
+from common.enums.cache import CacheTagEnum
+from common.utils.cache import cached
 
 
 class AlipayService:
@@ -57,10 +60,16 @@ class AlipayService:
         except Exception as e:
             raise AppException(str(e))
 
+    @classmethod
+    @cached("pay:params:{channel}", ttl=3600, tags=[CacheTagEnum.PAYMENT])
+    async def params(cls, channel: int = PayEnum.WAY_ALI) -> Dict[str, str]:
+        """ 支付渠道配置参数 (已缓存) """
+        config = await DevPayConfigModel.filter(channel=channel).get()
+        return json.loads(config.params)
+
     @classmethod
     async def options(cls):
-        config = await DevPayConfigModel.filter(channel=PayEnum.WAY_ALI).get()
-        params = json.loads(config.params)
+        params = await cls.params()
         return {
             "app_id": params.get("app_id", "").strip(),
             "private_key": params.get("private_key", "").strip(),
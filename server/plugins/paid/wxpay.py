@@ -22,6 +22,8 @@ from kernels.utils import RequestUtil
 from common.enums.pay import PayEnum
 from common.enums.client import ClientEnum
 from common.models.dev import DevPayConfigModel
+from common.enums.cache import CacheTagEnum
+from common.utils.cache import cached
 from plugins.wechat.configs import WeChatConfig
 
 
@@ -69,10 +71,16 @@ class WxpayService:
             timeout=(10, 30)
         )
 
+    @classmethod
+    @cached("pay:params:{channel}", ttl=3600, tags=[CacheTagEnum.PAYMENT])
+    async def params(cls, channel: int = PayEnum.WAY_MNP) -> Dict[str, str]:
+        """ 支付渠道配置参数 (已缓存) """
+        config = await DevPayConfigModel.filter(channel=channel).get()
+        return json.loads(config.params)
+
     @classmethod
     async def options(cls) -> Dict[str, str]:
-        config = await DevPayConfigModel.filter(channel=PayEnum.WAY_MNP).get()
-        params = json.loads(config.params)
+        params = await cls.params()
 
         # 证书私钥(兼容处理)
         private_key = str(params.get("apiclient_key", ""))
@@ -0,0 +1,118 @@
+# +----------------------------------------------------------------------
+# | WaitAdmin(fastapi)快速开发后台管理系统
+# +----------------------------------------------------------------------
+# | 欢迎阅读学习程序代码,建议反馈是我们前进的动力
+# | 程序完全开源可支持商用,允许去除界面版权信息
+# | gitee:   https://gitee.com/wafts/waitadmin-python
+# | github:  https://github.com/topwait/waitadmin-python
+# | 官方网站: https://www.waitadmin.cn
+# | WaitAdmin团队版权所有并拥有最终解释权
+# +----------------------------------------------------------------------
+# | Author: WaitAdmin Team <2474369941@qq.com>
+# +----------------------------------------------------------------------
+import asyncio
+import logging
+import threading
+import importlib
+from typing import Any, Callable, Dict, List
+from exception import AppException
+from config import get_settings
+
+logger = logging.getLogger(__name__)
+
+__all__ = ["PluginRegistry"]
+
+
+class PluginRegistry:
+    """
+    插件注册表
+
+    重量级插件(torch模型、Milvus Lite)只登记导入路径, 首次使用时才导入模块并创建实例,
+    不使用以图搜图的进程不会加载torch/pymilvus; 配置关闭时直接拒绝使用。
+
+    Example:
+        milvus = await PluginRegistry.aget("milvus")
+        milvus.search_similar(vector)
+    """
+
+    # {插件名: (导入路径 "模块:属性", 是否启用)}
+    _plugins: Dict[str, tuple] = {}
+    _instances: Dict[str, Any] = {}
+    _lock: threading.Lock = threading.Lock()
+
+    @classmethod
+    def register(cls, name: str, target: str, enabled: Callable[[], bool] = None):
+        """
+        登记插件 (不导入)
+
+        Args:
+            name (str): 插件名。
+            target (str): 导入路径, 如 "plugins.milvus.milvus_service:MilvusService", 属性为类或工厂函数。
+            enabled (Callable[[], bool]): 是否启用, 默认启用。
+
+        Author:
+            zero
+        """
+        cls._plugins[name] = (target, enabled)
+
+    @classmethod
+    def enabled(cls, name: str) -> bool:
+        """ 插件是否已登记并启用 """
+        plugin = cls._plugins.get(name)
+        if plugin is None:
+            return False
+        return plugin[1] is None or bool(plugin[1]())
+
+    @classmethod
+    def get(cls, name: str) -> Any:
+        """
+        获取插件实例 (首次调用时导入并创建)
+
+        Args:
+            name (str): 插件名。
+
+        Returns:
+            Any: 插件实例。
+
+        Raises:
+            AppException: 插件未登记或已关闭。
+
+        Author:
+            zero
+        """
+        instance = cls._instances.get(name)
+        if instance is not None:
+            return instance
+        if not cls.enabled(name):
+            raise AppException(f"插件[{name}]未启用")
+
+        with cls._lock:
+            instance = cls._instances.get(name)
+            if instance is None:
+                module_name, attr = cls._plugins[name][0].split(":")
+                factory = getattr(importlib.import_module(module_name), attr)
+                instance = cls._instances[name] = factory()
+                logger.info("Plugin %s loaded", name)
+        return instance
+
+    @classmethod
+    async def aget(cls, name: str) -> Any:
+        """ 获取插件实例, 首次加载(导入和初始化可能耗时数秒)在线程中执行, 不阻塞事件循环 """
+        instance = cls._instances.get(name)
+        if instance is not None:
+            return instance
+        return await asyncio.to_thread(cls.get, name)
+
+    @classmethod
+    def loaded(cls) -> List[str]:
+        """ 已加载的插件 """
+        return list(cls._instances.keys())
+
+
+def _image_search_enabled() -> bool:
+    return bool(get_settings().MILVUS.get("enable", True))
+
+
+PluginRegistry.register("embedding", "plugins.pyTorch.embedding_extractor:EmbeddingExtractor", _image_search_enabled)
+PluginRegistry.register("milvus", "plugins.milvus.milvus_service:MilvusService", _image_search_enabled)
+
@@ -11,17 +11,62 @@
 # | Author: WaitAdmin Team <2474369941@qq.com>
 # +----------------------------------------------------------------------
 import hashlib
-import json
+import asyncio
+import logging
 import random
 import string
 import time
 import uuid
-from typing import List, Union
+from typing import List, Dict, Set, Union, Optional
 from kernels.utils import RequestUtil
 from common.utils.cache import RedisUtil
+from common.utils.codec import CodecUtil
+
+logger = logging.getLogger(__name__)
+
+# 仅在令牌仍存在时更新字段, 避免已注销的令牌被重新写入
+# ARGV[1] = 新的有效期(秒, 0表示不修改), ARGV[2..] = 字段, 值, ...
+RedisUtil.register_script("safe:token_update", """
+local n = 0
+local ttl = tonumber(ARGV[1])
+for _, key in ipairs(KEYS) do
+    if redis.call('exists', key) == 1 then
+        redis.call('hset', key, unpack(ARGV, 2))
+        if ttl > 0 then
+            redis.call('expire', key, ttl)
+        end
+        n = n + 1
+    end
+end
+return n
+""")
+
+# 批量写入最后活动信息, ARGV 每3个一组对应 KEYS 中的一个令牌
+RedisUtil.register_script("safe:token_touch", """
+local n = 0
+for i, key in ipairs(KEYS) do
+    local j = (i - 1) * 3
+    if redis.call('exists', key) == 1 then
+        redis.call('hset', key, 'last_op_time', ARGV[j + 1], 'last_ip_address', ARGV[j + 2], 'last_ua_browser', ARGV[j + 3])
+        n = n + 1
+    end
+end
+return n
+""")
 
 
 class SecurityBase:
+    """
+    登录会话存储
+
+    缓存结构:
+        login:api_token:{token}  = Hash{uid, key, device, kick_out, expire_time, ...}  每个令牌一个哈希
+        login:api_tokens:{uid}   = ZSet{token: expire_time}                         用户的令牌索引
+
+    校验令牌只需一次HMGET, 注销/踢出单个令牌只修改一个键。
+    旧版的 (login:api_token_{token} = uid, login:api_user_{uid} = 会话JSON) 在首次访问时迁移。
+    """
+
     # 令牌数量限制
     token_limit: int = 100
     # 令牌过期时间 (默认2小时)
@@ -30,112 +75,202 @@ class SecurityBase:
     token_renewal: int = 1800
     # 支持并发登录
     is_concurrent: bool = True
-    # 用户缓存Key
-    cache_user_key: str = "login:api_user_"
+    # 最后活动信息的记录间隔 (秒)
+    activity_interval: int = 60
+    # 最后活动信息的缓冲刷新周期 (秒) 和批量大小
+    activity_flush: float = 5.0
+    activity_batch: int = 500
     # 令牌缓存Key
-    cache_token_key: str = "login:api_token_"
+    cache_token_key: str = "login:api_token:"
+    # 用户令牌索引Key
+    cache_user_key: str = "login:api_tokens:"
+    # 旧版缓存Key
+    legacy_token_key: str = "login:api_token_"
+    legacy_user_key: str = "login:api_user_"
+
+    # 令牌哈希的字段
+    TOKEN_FIELDS = (
+        "uid", "key", "device", "kick_out", "is_disable", "login_host", "expire_time",
+        "create_time", "last_op_time", "last_ip_address", "last_ua_browser", "data"
+    )
+    INT_FIELDS = {"kick_out", "is_disable", "expire_time", "create_time", "last_op_time"}
+
+    # 待写入的最后活动信息 {令牌缓存Key: 字段}
+    _activity: Dict[str, dict] = {}
+    _activity_task: Optional[asyncio.Task] = None
+    _batch_tasks: Set[asyncio.Task] = set()
 
     @classmethod
-    async def _query_uid_by_token(cls, token: str):
-        """ 根据令牌查UID """
-        key: str = cls.cache_token_key + token
-        val = await RedisUtil.get(key)
-        return val if val else 0
-
-    @classmethod
-    async def _query_session_by_uid(cls, uid: Union[int, str], scene: str = "all"):
-        """ 根据UID查会话 """
-        session = None
-        for i in range(3):
-            results = await RedisUtil.get(cls.cache_user_key + str(uid))
-            if results is not None:
-                session = results
-                break
+    def _cache_ttl(cls) -> Optional[int]:
+        """ 缓存有效期 (比令牌多保留60秒) """
+        return cls.token_timeout + 60 if cls.token_timeout else None
 
-        if session is None:
-            session = {
-                "id": uid,
-                "data": {},
-                "create_time": int(time.time()),
-                "update_time": int(time.time()),
-                "token_lists": []
-            }
-        else:
-            session = json.loads(session)
-
-        token_lists = []
-        for item in session["token_lists"]:
-            if scene == "online" and not item.get("kick_out"):
-                token_lists.append(item)
-            elif scene == "kick" and item.get("kick_out"):
-                token_lists.append(item)
+    @classmethod
+    def _parse_token(cls, token: str, values: List[Optional[bytes]]) -> Optional[dict]:
+        """ 解析令牌哈希 (HMGET结果) """
+        if values[0] is None:
+            return None
+
+        item = {"value": token}
+        for field, value in zip(cls.TOKEN_FIELDS, values):
+            if field == "data":
+                item[field] = CodecUtil.decode(value) if value else {}
+            elif field in cls.INT_FIELDS:
+                item[field] = int(value) if value else 0
             else:
-                token_lists.append(item)
+                item[field] = value.decode() if value is not None else ""
 
-        session["token_lists"] = token_lists
-        return session
+        if item["device"].isdigit():
+            item["device"] = int(item["device"])
+        return item
 
     @classmethod
-    async def _write_users_cache(cls, uid: Union[int, str], value: dict):
+    async def _query_token(cls, token: str) -> Optional[dict]:
         """
-        写入用户缓存信息
+        根据令牌查会话 (一次HMGET)
 
-        Example:
-            login:api_user_1 = [{"token_lists": []}]
+        Args:
+            token (str): 令牌字符串
+
+        Returns:
+            Optional[dict]: 令牌信息, 令牌不存在时返回None
+
+        Author:
+            zero
+        """
+        if not token:
+            return None
+        key: str = RedisUtil.get_key(cls.cache_token_key + token)
+        item = cls._parse_token(token, await RedisUtil.raw.hmget(key, cls.TOKEN_FIELDS))
+        if item is None and await cls._migrate_legacy_token(token):
+            item = cls._parse_token(token, await RedisUtil.raw.hmget(key, cls.TOKEN_FIELDS))
+        return item
+
+    @classmethod
+    async def _query_uid_by_token(cls, token: str):
+        """ 根据令牌查UID """
+        if not token:
+            return 0
+        uid = await RedisUtil.hGet(cls.cache_token_key + token, "uid")
+        if uid is None and await cls._migrate_legacy_token(token):
+            uid = await RedisUtil.hGet(cls.cache_token_key + token, "uid")
+        return uid if uid else 0
+
+    @classmethod
+    async def _query_tokens_by_uid(cls, uid: Union[int, str], offset: int = 0, limit: int = None) -> List[dict]:
+        """
+        根据UID查令牌列表 (按过期时间升序)
 
         Args:
-            uid (Union[int, str]): 登录用户ID
-            value (str): json字符串,登录令牌信息
+            uid (Union[int, str]): 用户ID
+            offset (int): 跳过的数量
+            limit (int): 返回的数量, 默认为全部
+
+        Returns:
+            List[dict]: 令牌信息列表
 
         Author:
             zero
         """
-        key: str = cls.cache_user_key + str(uid)
-        ttl: int = cls.token_timeout + 60 if cls.token_timeout else None
-        if value:
-            await RedisUtil.set(key, json.dumps(value), ttl)
-        else:
-            await RedisUtil.delete(key)
+        index_key: str = cls.cache_user_key + str(uid)
+        await cls._prune_index(uid)
+        end: int = -1 if limit is None else offset + limit - 1
+        tokens: List[str] = await RedisUtil.redis.zrange(RedisUtil.get_key(index_key), offset, end)
+        if not tokens:
+            return []
+
+        async with RedisUtil.pipeline(binary=True) as pipe:
+            for token in tokens:
+                pipe.hmget(cls.cache_token_key + token, cls.TOKEN_FIELDS)
+            results = await pipe.execute()
+
+        items, stale = [], []
+        for token, values in zip(tokens, results):
+            item = cls._parse_token(token, values)
+            if item is None:
+                stale.append(token)
+            else:
+                items.append(item)
+        if stale:
+            await RedisUtil.redis.zrem(RedisUtil.get_key(index_key), *stale)
+        return items
+
+    @classmethod
+    async def _count_tokens_by_uid(cls, uid: Union[int, str]) -> int:
+        """ 统计用户的令牌数量 """
+        await cls._prune_index(uid)
+        return await RedisUtil.zCard(cls.cache_user_key + str(uid))
+
+    @classmethod
+    async def _prune_index(cls, uid: Union[int, str]):
+        """ 清理索引中缓存已过期的令牌 """
+        key: str = RedisUtil.get_key(cls.cache_user_key + str(uid))
+        await RedisUtil.redis.zremrangebyscore(key, "-inf", int(time.time()) - 60)
 
     @classmethod
-    async def _write_token_cache(cls, uid: Union[int, str], token: str):
+    async def _write_token_cache(cls, token: str, item: dict):
         """
-        写入令牌缓存信息
+        写入令牌哈希和用户索引 (一次往返)
 
         Example:
-            login:api_token_c95622552786c5 = 1
+            login:api_token:c95622552786c5 = {"uid": 1, "device": 1, "expire_time": 1700000000, ...}
+            login:api_tokens:1 = {"c95622552786c5": 1700000000}
 
         Args:
-            uid (Union[int, str]): 登录用户ID
             token (str): 令牌字符串
+            item (dict): 令牌信息
 
         Author:
             zero
         """
-        key: str = cls.cache_token_key + token
-        ttl: int = cls.token_timeout + 60 if cls.token_timeout else None
-        await RedisUtil.set(key, uid, ttl)
+        token_key: str = cls.cache_token_key + token
+        index_key: str = cls.cache_user_key + str(item["uid"])
+        mapping = {k: "" if item.get(k) is None else item[k] for k in cls.TOKEN_FIELDS if k != "data"}
+        mapping["data"] = RedisUtil.encode(token_key, item.get("data") or {})
+
+        ttl: int = cls._cache_ttl()
+        async with RedisUtil.pipeline(transaction=True) as pipe:
+            pipe.hset(token_key, mapping=mapping)
+            pipe.zadd(index_key, {token: int(item["expire_time"])})
+            if ttl:
+                pipe.expire(token_key, ttl)
+                pipe.expire(index_key, ttl)
+            await pipe.execute()
 
     @classmethod
-    async def _delete_users_cache(cls, uid: Union[int, str]):
+    async def _update_token_cache(cls, tokens: List[str], fields: dict, renew: bool = False) -> int:
         """
-        删除用户缓存
+        更新令牌字段 (令牌已不存在时忽略)
 
         Args:
-            uid (Union[int, str]): 用户ID
+            tokens (List[str]): 令牌列表
+            fields (dict): 要更新的字段
+            renew (bool): 是否同时续期缓存
+
+        Returns:
+            int: 更新的令牌数量
 
         Author:
             zero
         """
-        key: str = cls.cache_user_key + str(uid)
-        await RedisUtil.delete(key)
+        if not tokens or not fields:
+            return 0
+        args = [(cls._cache_ttl() or 0) if renew else 0]
+        for k, v in fields.items():
+            args.extend((k, v))
+        return await RedisUtil.eval_script(
+            "safe:token_update",
+            [cls.cache_token_key + token for token in tokens],
+            args
+        )
 
     @classmethod
-    async def _delete_token_cache(cls, tokens: List[str]):
+    async def _delete_token_cache(cls, uid: Union[int, str], tokens: List[str]):
         """
         删除令牌缓存
 
         Args:
+            uid (Union[int, str]): 用户ID
             tokens (List[str]): 令牌
 
         Author:
@@ -143,36 +278,142 @@ class SecurityBase:
         """
         if not tokens:
             return
-        for token in tokens:
-            key: str = cls.cache_token_key + token
-            await RedisUtil.delete(key)
+        async with RedisUtil.pipeline() as pipe:
+            pipe.unlink(*[cls.cache_token_key + token for token in tokens])
+            pipe.zrem(cls.cache_user_key + str(uid), *tokens)
+            await pipe.execute()
 
     @classmethod
-    async def _refresh_token(cls, uid: int, token: str, expire_time: int):
+    async def _delete_users_cache(cls, uid: Union[int, str]):
         """
-        刷新令牌信息
+        删除用户的全部令牌缓存
+
+        Args:
+            uid (Union[int, str]): 用户ID
+
+        Author:
+            zero
+        """
+        index_key: str = cls.cache_user_key + str(uid)
+        tokens: List[str] = await RedisUtil.redis.zrange(RedisUtil.get_key(index_key), 0, -1)
+        await RedisUtil.unlink(index_key, cls.legacy_user_key + str(uid), *[cls.cache_token_key + t for t in tokens])
+
+    @classmethod
+    async def _migrate_legacy_token(cls, token: str) -> bool:
+        """
+        迁移旧版令牌 (令牌->UID 字符串 + 用户会话JSON)
 
         Args:
-            uid (Union[int, str]): 登录用户ID
             token (str): 令牌字符串
-            expire_time (int): 失效时间
+
+        Returns:
+            bool: 是否已迁移, 旧版缓存中不存在时返回False
 
         Author:
             zero
         """
-        session = await cls._query_session_by_uid(uid)
-        session['update_time'] = int(time.time())
-        for item in session["token_lists"]:
+        uid = await RedisUtil.get(cls.legacy_token_key + token)
+        if not uid:
+            return False
+
+        session = CodecUtil.decode(await RedisUtil.raw.get(RedisUtil.get_key(cls.legacy_user_key + uid)))
+        await RedisUtil.unlink(cls.legacy_token_key + token)
+        for item in (session or {}).get("token_lists", []):
             if item.get("value") == token:
-                surplus_time: int = expire_time - int(time.time())
-                if cls.token_renewal and surplus_time and (surplus_time <= cls.token_renewal):
-                    item["expire_time"] = int(time.time()) + cls.token_timeout
-                item["last_op_time"] = int(time.time())
-                item["last_ip_address"] = RequestUtil.host
-                item["last_ua_browser"] = RequestUtil.ua
-                await cls._write_users_cache(uid, session)
-                await cls._write_token_cache(uid, token)
+                await cls._write_token_cache(token, {**item, "uid": uid, "data": session.get("data") or {}})
+                return True
+        return False
+
+    @classmethod
+    async def _refresh_token(cls, item: dict):
+        """
+        刷新令牌信息
+
+        临近过期(剩余不足 token_renewal)时立即续期;
+        否则只在距上次记录超过 activity_interval 或IP变化时, 将最后活动信息放入缓冲批量写入。
+
+        Args:
+            item (dict): 令牌信息 (_query_token的结果)
+
+        Author:
+            zero
+        """
+        now: int = int(time.time())
+        token: str = item["value"]
+        fields: Dict[str, Union[int, str]] = {
+            "last_op_time": now,
+            "last_ip_address": RequestUtil.host or "",
+            "last_ua_browser": RequestUtil.ua or ""
+        }
+
+        surplus_time: int = item["expire_time"] - now
+        if cls.token_renewal and surplus_time and (surplus_time <= cls.token_renewal):
+            fields["expire_time"] = now + cls.token_timeout
+            cls._activity.pop(cls.cache_token_key + token, None)
+            if await cls._update_token_cache([token], fields, renew=True):
+                index_key: str = cls.cache_user_key + str(item["uid"])
+                async with RedisUtil.pipeline() as pipe:
+                    pipe.zadd(index_key, {token: fields["expire_time"]}, xx=True)
+                    pipe.expire(index_key, cls._cache_ttl())
+                    await pipe.execute()
+        elif (now - item["last_op_time"] >= cls.activity_interval
+              or fields["last_ip_address"] != item["last_ip_address"]):
+            cls._touch_activity(cls.cache_token_key + token, fields)
+
+    @classmethod
+    def _touch_activity(cls, key: str, fields: dict):
+        """ 最后活动信息放入缓冲, 满批量或到刷新周期时写入 """
+        cls._activity[key] = fields
+        if len(cls._activity) >= cls.activity_batch:
+            task = asyncio.create_task(cls._write_activity())
+            cls._batch_tasks.add(task)
+            task.add_done_callback(cls._batch_written)
+        elif cls._activity_task is None or cls._activity_task.done():
+            cls._activity_task = asyncio.create_task(cls._flush_activity_later())
+
+    @classmethod
+    def _batch_written(cls, task: asyncio.Task):
+        cls._batch_tasks.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            logger.warning("SecurityBase flush activity failed: %s", task.exception())
+
+    @classmethod
+    async def _flush_activity_later(cls):
+        await asyncio.sleep(cls.activity_flush)
+        await cls._write_activity()
+
+    @classmethod
+    async def flush_activity(cls) -> int:
+        """
+        写入缓冲中的最后活动信息 (等待进行中的批量写入, 关闭时调用)
+
+        Returns:
+            int: 本次写入的令牌数量
+
+        Author:
+            zero
+        """
+        if cls._batch_tasks:
+            await asyncio.gather(*cls._batch_tasks, return_exceptions=True)
+        return await cls._write_activity()
+
+    @classmethod
+    async def _write_activity(cls) -> int:
+        """ 写入缓冲中的最后活动信息 (每批一次往返) """
+        total: int = 0
+        while cls._activity:
+            keys: List[str] = []
+            args: List[Union[int, str]] = []
+            for key in list(cls._activity)[:cls.activity_batch]:
+                fields = cls._activity.pop(key)
+                keys.append(key)
+                args.extend((fields["last_op_time"], fields["last_ip_address"], fields["last_ua_browser"]))
+            try:
+                total += await RedisUtil.eval_script("safe:token_touch", keys, args)
+            except Exception as e:
+                logger.warning("SecurityBase flush activity failed: %s", e)
                 break
+        return total
 
     @classmethod
     def _make_build_token(cls) -> str:
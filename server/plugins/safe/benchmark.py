@@ -0,0 +1,82 @@
+# +----------------------------------------------------------------------
+# | WaitAdmin(fastapi)快速开发后台管理系统
+# +----------------------------------------------------------------------
+# | 欢迎阅读学习程序代码,建议反馈是我们前进的动力
+# | 程序完全开源可支持商用,允许去除界面版权信息
+# | gitee:   https://gitee.com/wafts/waitadmin-python
+# | github:  https://github.com/topwait/waitadmin-python
+# | 官方网站: https://www.waitadmin.cn
+# | WaitAdmin团队版权所有并拥有最终解释权
+# +----------------------------------------------------------------------
+# | Author: WaitAdmin Team <2474369941@qq.com>
+# +----------------------------------------------------------------------
+"""
+登录校验的Redis命令数基准 (不被业务代码导入)
+
+    python -m plugins.safe.benchmark
+
+使用配置的Redis, 登录一个临时的后台令牌后统计一次已登录的后台写请求发出的Redis命令数:
+    before  中间件/拦截器各自查询 (get_login_id + get_login_data + check_login + 角色权限)
+    after   SecurityDriver.resolve() 每个请求只查询一次, 之后读取 request.state.auth
+结束时注销临时令牌并删除临时的角色权限缓存。
+"""
+import asyncio
+from typing import Dict
+from starlette.requests import Request
+from common.utils.cache import RedisUtil
+from kernels.utils import RequestUtil
+from plugins.safe.driver import SecurityDriver
+from apps.admin.cache.login_cache import LoginCache
+
+ROLE_ID: int = 987654321
+
+
+def _count_commands(counter: Dict[str, int]):
+    """ 统计两个Redis客户端(文本/二进制)发出的命令 """
+    for client in (RedisUtil.redis, RedisUtil.raw):
+        execute = client.execute_command
+
+        async def counted(*args, _execute=execute, **kwargs):
+            counter["n"] += 1
+            return await _execute(*args, **kwargs)
+
+        client.execute_command = counted
+
+
+async def main():
+    counter: Dict[str, int] = {"n": 0}
+    RequestUtil.host = "127.0.0.1"
+    RequestUtil.ua = "benchmark"
+
+    driver = SecurityDriver.module("admin")
+    token: str = await driver.login(uid=0, device="benchmark", data={"role_id": ROLE_ID})
+    await RedisUtil.hset_obj(LoginCache.perms_prefix, str(ROLE_ID), ["benchmark"])
+    _count_commands(counter)
+    try:
+        RequestUtil.token = token
+        counter["n"] = 0
+        await driver.get_login_id(token)
+        await driver.get_login_data(token)
+        await driver.check_login(token)
+        await LoginCache.role_perms_get(ROLE_ID)
+        before: int = counter["n"]
+
+        scope = {"type": "http", "headers": [(b"authorization", f"Bearer {token}".encode())], "state": {}}
+        request = Request(scope)
+        counter["n"] = 0
+        auth = await driver.resolve(request)          # LogsMiddleware
+        await driver.resolve(request)                 # DemoMiddleware
+        await driver.resolve(request, token)          # LoginInterceptor
+        await LoginCache.role_perms_get(auth.role_id)
+        after: int = counter["n"]
+
+        print("Redis commands per authenticated admin write request")
+        print(f"  before (separate lookups): {before}")
+        print(f"  after  (resolve once):     {after}")
+    finally:
+        await driver.logout_by_token(token)
+        await RedisUtil.hDel(LoginCache.perms_prefix, str(ROLE_ID))
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -13,68 +13,109 @@
 import importlib
 import time
 import uuid
-from typing import Union
+from typing import Dict, Type, Union, Optional
+from fastapi import Request
+from pydantic import BaseModel, ConfigDict
 from .basics import SecurityBase
+from common.utils.cache import RedisUtil
 from kernels.utils import RequestUtil
 
 
+class AuthContext(BaseModel):
+    """
+    请求的登录上下文 (只读)
+
+    由 SecurityDriver.resolve() 在请求中首次使用时生成, 中间件/拦截器/路由共用。
+    """
+    model_config = ConfigDict(frozen=True)
+
+    token: str = ""
+    uid: int = 0
+    status: str = "invalid"  # invalid / kick / disable / success
+    device: Union[int, str] = ""
+    data: dict = {}
+
+    @property
+    def is_login(self) -> bool:
+        return self.status == "success"
+
+    @property
+    def role_id(self) -> int:
+        return int(self.data.get("role_id") or 0)
+
+
 class SecurityDriver(SecurityBase):
+    """
+    登录会话驱动
+
+    module(name) 返回该模块专用的驱动 (以模块配置为类属性的子类, 创建后不再修改),
+    不同模块的并发请求互不影响, 例如:
+        await SecurityDriver.module("admin").resolve(request)
+        await SecurityDriver.module("api").logout(uid)
+    """
+
     configs = {}
+    _modules: Dict[str, Type["SecurityDriver"]] = {}
 
     @classmethod
-    def module(cls, name: str = "api", config: dict = None):
+    def module(cls, name: str = "api", config: dict = None) -> Type["SecurityDriver"]:
+        driver = SecurityDriver._modules.get(name)
+        if driver is not None and not config:
+            return driver
+
         if config:
-            cls.configs[name] = config
+            SecurityDriver.configs[name] = config
+        elif SecurityDriver.configs.get(name) is not None:
+            config = SecurityDriver.configs.get(name)
         else:
-            if cls.configs.get(name) is not None:
-                config = cls.configs.get(name)
-            else:
-                try:
-                    config = {}
-                    package = f"apps.{name}.config"
-                    module = importlib.import_module(package)
-                    obstruction = getattr(module, f"{name.capitalize()}Config", None)
-                    config = obstruction.__dict__.get("security") or {} if obstruction else {}
-                    cls.configs[name] = config
-                except ModuleNotFoundError:
-                    pass
-
-        cls.token_limit = int(config.get("token_limit", 100))
-        cls.token_timeout = int(config.get("token_timeout", 7200))
-        cls.token_renewal = int(config.get("token_renewal", 300))
-        cls.is_concurrent = bool(config.get("is_concurrent", True))
-        cls.cache_user_key = config.get("cache_prefix", f"login:{name}_") + "user_"
-        cls.cache_token_key = config.get("cache_prefix", f"login:{name}_") + "token_"
-        return cls
+            config = {}
+            try:
+                package = f"apps.{name}.config"
+                module = importlib.import_module(package)
+                obstruction = getattr(module, f"{name.capitalize()}Config", None)
+                config = obstruction.__dict__.get("security") or {} if obstruction else {}
+                SecurityDriver.configs[name] = config
+            except ModuleNotFoundError:
+                pass
+
+        prefix: str = config.get("cache_prefix", f"login:{name}_")
+        driver = type(f"SecurityDriver[{name}]", (SecurityDriver,), {
+            "token_limit": int(config.get("token_limit", 100)),
+            "token_timeout": int(config.get("token_timeout", 7200)),
+            "token_renewal": int(config.get("token_renewal", 300)),
+            "is_concurrent": bool(config.get("is_concurrent", True)),
+            "cache_user_key": prefix + "tokens:",
+            "cache_token_key": prefix + "token:",
+            "legacy_user_key": prefix + "user_",
+            "legacy_token_key": prefix + "token_",
+        })
+        SecurityDriver._modules[name] = driver
+        return driver
 
     @classmethod
     async def login(cls, uid: Union[str, int], device: Union[str, int] = "", data: dict = None):
         """ 会话登录 """
 
-        # 获取登录信息
-        session = await cls._query_session_by_uid(uid)
-
-        # 更新登录数据
-        session["data"] = data or {}
-
         # 禁止多处登录
         if not cls.is_concurrent:
-            for item in session["token_lists"]:
-                if device and device != item["device"]:
-                    continue
-                item["kick_out"] = 1
-
-        # 令牌数量限制
-        if cls.token_limit and len(session["token_lists"]) > cls.token_limit:
-            num = len(session["token_lists"]) - cls.token_limit
-            session["token_lists"] = session["token_lists"][num:]
-
-        # 令牌登录追加
+            tokens = [
+                item["value"] for item in await cls._query_tokens_by_uid(uid)
+                if not device or device == item["device"]
+            ]
+            await cls._update_token_cache(tokens, {"kick_out": 1})
+
+        # 令牌数量限制 (淘汰最早过期的)
+        if cls.token_limit:
+            num = await cls._count_tokens_by_uid(uid) - cls.token_limit + 1
+            if num > 0:
+                stale = await RedisUtil.redis.zrange(RedisUtil.get_key(cls.cache_user_key + str(uid)), 0, num - 1)
+                await cls._delete_token_cache(uid, stale)
+
+        # 令牌登录写入
         token: str = cls._make_build_token()
-        session["token_lists"].append({
+        await cls._write_token_cache(token, {
             "uid": uid,
             "key": str(uuid.uuid4()),
-            "value": token,
             "device": device,
             "kick_out": 0,
             "login_host": RequestUtil.host,
@@ -82,72 +123,37 @@ class SecurityDriver(SecurityBase):
             "create_time": int(time.time()),
             "last_op_time": int(time.time()),
             "last_ip_address": RequestUtil.host,
-            "last_ua_browser": RequestUtil.ua
+            "last_ua_browser": RequestUtil.ua,
+            "data": data or {}
         })
-
-        # 写入缓存信息
-        await cls._write_token_cache(uid, token)
-        await cls._write_users_cache(uid, session)
         return token
 
     @classmethod
     async def logout(cls, uid: Union[str, int], device: Union[str, int] = ""):
         """ 指定账号注销 """
-        session = await cls._query_session_by_uid(uid)
         if not device:
-            token_lists = []
-            for item in session["token_lists"]:
-                token_lists.append(item["value"])
             await cls._delete_users_cache(uid)
-            await cls._delete_token_cache(token_lists)
         else:
-            token_lists = []
-            stay_delete = []
-            for item in session["token_lists"]:
-                if item["device"] == device:
-                    stay_delete.append(item["value"])
-                else:
-                    token_lists.append(item)
-
-            session["token_lists"] = token_lists
-            await cls._write_users_cache(uid, session)
-            await cls._delete_token_cache(stay_delete)
+            tokens = [item["value"] for item in await cls._query_tokens_by_uid(uid) if item["device"] == device]
+            await cls._delete_token_cache(uid, tokens)
 
     @classmethod
     async def logout_by_token(cls, token: str):
         """ 指定令牌注销 """
         uid = await cls._query_uid_by_token(token)
-        session = await cls._query_session_by_uid(uid)
-
-        token_lists = []
-        stay_delete = []
-        for item in session["token_lists"]:
-            if item["value"] == token:
-                stay_delete.append(item["value"])
-            else:
-                token_lists.append(item)
-
-        session["token_lists"] = token_lists
-        await cls._write_users_cache(uid, session)
-        await cls._delete_token_cache(stay_delete)
+        if uid:
+            await cls._delete_token_cache(uid, [token])
 
     @classmethod
     async def kick_out_by_id(cls, uid: Union[str, int]):
         """ 指定账号踢下线 """
-        session = await cls._query_session_by_uid(uid)
-        for item in session["token_lists"]:
-            item["kick_out"] = 1
-        await cls._write_users_cache(uid, session)
+        tokens = [item["value"] for item in await cls._query_tokens_by_uid(uid)]
+        await cls._update_token_cache(tokens, {"kick_out": 1})
 
     @classmethod
     async def kick_out_by_token(cls, token: str):
         """ 指定令牌踢下线 """
-        uid = await cls._query_uid_by_token(token)
-        session = await cls._query_session_by_uid(uid)
-        for item in session:
-            if item["value"] == token:
-                item["kick_out"] = 1
-        await cls._write_users_cache(uid, session)
+        await cls._update_token_cache([token], {"kick_out": 1})
 
     @classmethod
     async def check_login(cls, token: str = "", device: Union[str, int] = ""):
@@ -155,37 +161,64 @@ class SecurityDriver(SecurityBase):
         if not token:
             token = RequestUtil.token
 
-        uid = await cls._query_uid_by_token(token)
-        session = await cls._query_session_by_uid(uid)
+        item = await cls._query_token(token)
+        return await cls._verify(item, device)
 
-        # 找出有效的
-        valid_session = [
-            item for item in session["token_lists"]
-            if item["value"] == token and int(item.get("expire_time", 0)) >= int(time.time())
-        ]
+    @classmethod
+    async def resolve(cls, request: Request, token: str = None) -> AuthContext:
+        """
+        解析请求的登录状态 (每个请求只查询和校验一次, 结果保存在 request.state.auth)
+
+        Args:
+            request (Request): 请求对象。
+            token (str): 令牌, 默认从Authorization请求头读取。
+
+        Returns:
+            AuthContext: 请求的登录上下文。
+
+        Author:
+            zero
+        """
+        if token is None:
+            token = request.headers.get("Authorization", "").split(" ")[-1]
+
+        auth: Optional[AuthContext] = getattr(request.state, "auth", None)
+        if auth is not None and auth.token == token:
+            return auth
+
+        item = await cls._query_token(token)
+        status = await cls._verify(item)
+        auth = AuthContext(
+            token=token,
+            uid=int(item["uid"]) if item else 0,
+            status=status,
+            device=item["device"] if item else "",
+            data=item["data"] if item else {}
+        )
+        request.state.auth = auth
+        return auth
 
-        # 没有有效的
-        if not valid_session:
+    @classmethod
+    async def _verify(cls, item: Optional[dict], device: Union[str, int] = "") -> str:
+        """ 校验令牌状态: invalid / kick / disable / success """
+        # 找出有效的
+        if not item or item["expire_time"] < int(time.time()):
             return "invalid"
 
         # 指定设备的
-        if device:
-            valid_session = [item for item in valid_session if item["device"] == device]
+        if device and item["device"] != device:
+            return "invalid"
 
         # 校验状态值
-        if valid_session:
-            item = valid_session[0]
-            if item.get("kick_out"):
-                await cls.logout_by_token(token)
-                return "kick"
-            elif item.get("is_disable"):
-                await cls._refresh_token(uid, token, int(item.get("expire_time", 0)))
-                return "disable"
-            else:
-                await cls._refresh_token(uid, token, int(item.get("expire_time", 0)))
-                return "success"
-
-        return "invalid"
+        if item["kick_out"]:
+            await cls._delete_token_cache(item["uid"], [item["value"]])
+            return "kick"
+        elif item["is_disable"]:
+            await cls._refresh_token(item)
+            return "disable"
+        else:
+            await cls._refresh_token(item)
+            return "success"
 
     @classmethod
     async def get_login_id(cls, token: str = ""):
@@ -200,12 +233,20 @@ class SecurityDriver(SecurityBase):
         if not token:
             token = RequestUtil.token
 
-        uid = await cls._query_uid_by_token(token)
-        session = await cls._query_session_by_uid(uid)
-        return session.get("data") or {}
+        item = await cls._query_token(token)
+        return item["data"] if item else {}
+
+    @classmethod
+    async def get_token_count(cls, uid: Union[str, int]) -> int:
+        """ 获取令牌数量 """
+        return await cls._count_tokens_by_uid(uid)
 
     @classmethod
-    async def get_token_list(cls, uid: Union[str, int], scene: str = "all"):
+    async def get_token_list(cls, uid: Union[str, int], scene: str = "all", offset: int = 0, limit: int = None):
         """ 获取令牌列表 """
-        session = await cls._query_session_by_uid(uid, scene)
-        return session["token_lists"]
+        token_lists = await cls._query_tokens_by_uid(uid, offset, limit)
+        if scene == "online":
+            return [item for item in token_lists if not item["kick_out"]]
+        elif scene == "kick":
+            return [item for item in token_lists if item["kick_out"]]
+        return token_lists